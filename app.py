@@ -2,11 +2,17 @@
 
 import streamlit as st
 import pandas as pd
+import sqlite3
 import subprocess
 import sys
 import os
 import time
+import secrets
+import shutil
 from database import *
+import database_async
+from export import EXPORT_FORMATS, available_formats, export_query, export_table
+from importer import detect_format, import_file
 
 def main():
     st.set_page_config(
@@ -130,6 +136,7 @@ def main():
     menu_options = {
         "🏠 Home": "Home",
         "➕ Add Data": "Add Data",
+        "📥 Import Data": "Import Data",
         "📝 Update Data": "Update Data",
         "🗑️ Delete Data": "Delete Data",
         "🔍 Search Movies": "Search Movies",
@@ -144,6 +151,8 @@ def main():
         show_home()
     elif choice == "Add Data":
         show_add_data()
+    elif choice == "Import Data":
+        show_import_data()
     elif choice == "Update Data":
         show_update_data()
     elif choice == "Delete Data":
@@ -186,36 +195,32 @@ def show_home():
 
     st.markdown("### 📈 Database Statistics")
 
+    stats = get_database_stats()
+
     # show some basic stats with enhanced styling
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        movies = get_table_data("Movie")
-        movie_count = len(movies) if movies else 0
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{movie_count}</div>
+            <div class="metric-value">{stats['movies']}</div>
             <div class="metric-label">Total Movies</div>
         </div>
         """, unsafe_allow_html=True)
 
     with col2:
-        actors = get_table_data("Actor")
-        actor_count = len(actors) if actors else 0
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{actor_count}</div>
+            <div class="metric-value">{stats['actors']}</div>
             <div class="metric-label">Total Actors</div>
         </div>
         """, unsafe_allow_html=True)
 
     with col3:
-        reviews = get_table_data("Review")
-        if reviews:
-            avg_rating = sum(r['Rating'] for r in reviews) / len(reviews)
+        if stats['avg_rating'] is not None:
             st.markdown(f"""
             <div class="metric-card">
-                <div class="metric-value">{avg_rating:.1f}</div>
+                <div class="metric-value">{stats['avg_rating']:.1f}</div>
                 <div class="metric-label">Average Rating</div>
             </div>
             """, unsafe_allow_html=True)
@@ -227,6 +232,19 @@ def show_home():
             </div>
             """, unsafe_allow_html=True)
 
+    if st.checkbox("Show genre and release year breakdowns", key="home_breakdowns"):
+        # two independent aggregates: loaded at once unless the read cache has them
+        genres, years = database_async.read_concurrently((get_genre_breakdown,), (get_year_breakdown,))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**🏷️ Movies per Genre**")
+            if genres:
+                st.bar_chart(pd.DataFrame(genres).set_index("Category"))
+        with col2:
+            st.markdown("**📅 Movies per Release Year**")
+            if years:
+                st.bar_chart(pd.DataFrame(years).set_index("Release_year"))
+
 def show_generic_add_form(table_name, field_labels, input_types, insert_func, field_types=None, placeholders=None):
     """generic form for adding data"""
     st.markdown(f"### ➕ Add New {table_name}")
@@ -316,7 +334,7 @@ def show_generic_add_form(table_name, field_labels, input_types, insert_func, fi
                 </div>
                 """, unsafe_allow_html=True)
 
-def show_generic_delete_form(table_name, id_label, delete_func, is_text_id=False):
+def show_generic_delete_form(table_name, id_label, delete_func, placeholder="Type the start of a name or an ID"):
     """generic form for deleting data"""
     st.markdown(f"### 🗑️ Delete {table_name}")
     st.markdown("---")
@@ -326,76 +344,30 @@ def show_generic_delete_form(table_name, id_label, delete_func, is_text_id=False
     </div>
     """, unsafe_allow_html=True)
 
-    with st.form(f"delete_{table_name.lower()}"):
-        # show existing data for reference
-        data = get_table_data(table_name)
-        if data:
-            st.markdown(f"**📋 Existing {table_name}s:**")
-            df = pd.DataFrame(data)
-            st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
-            st.dataframe(df, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        else:
+    record_id = entity_picker(table_name, f"{table_name} to Delete", f"delete_{table_name.lower()}",
+                              table_name.lower(), placeholder=placeholder)
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        submitted = st.button(f"🗑️ Delete {table_name}", use_container_width=True, disabled=record_id is None)
+
+    if submitted:
+        success, error_msg = delete_func(record_id)
+        if success:
             st.markdown(f"""
-            <div class="info-message">
-                ℹ️ No {table_name.lower()}s found in the database.
+            <div class="success-message">
+                ✅ <strong>{table_name} with {id_label} {record_id} deleted successfully!</strong>
             </div>
             """, unsafe_allow_html=True)
-
-        placeholder = f"e.g., 12345 (existing {id_label.lower()})" if not is_text_id else f"e.g., username (existing {id_label.lower()})"
-
-        if is_text_id:
-            record_id = st.text_input(f"{id_label} to Delete", placeholder=placeholder, help=f"Enter the {id_label.lower()} of the record to delete")
+            st.balloons()
+            time.sleep(1)  # Brief pause for user to see success message
+            st.rerun()
         else:
-            record_id = st.number_input(f"{id_label} to Delete", min_value=1, step=1, placeholder=placeholder, help=f"Enter the {id_label.lower()} of the record to delete")
-
-        col1, col2, col3 = st.columns([1, 1, 2])
-        with col1:
-            submitted = st.form_submit_button(f"🗑️ Delete {table_name}", use_container_width=True)
-
-        if submitted:
-            if record_id:
-                result = delete_func(record_id)
-                if isinstance(result, tuple):
-                    success, error_msg = result
-                    if success:
-                        st.markdown(f"""
-                        <div class="success-message">
-                            ✅ <strong>{table_name} with ID {record_id} deleted successfully!</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.balloons()
-                        time.sleep(1)  # Brief pause for user to see success message
-                        st.rerun()
-                    else:
-                        st.markdown(f"""
-                        <div class="error-message">
-                            ❌ <strong>Failed to delete {table_name}:</strong> {error_msg}
-                        </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    # Backward compatibility
-                    if result:
-                        st.markdown(f"""
-                        <div class="success-message">
-                            ✅ <strong>{table_name} with ID {record_id} deleted successfully!</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.balloons()
-                        time.sleep(1)  # Brief pause for user to see success message
-                        st.rerun()
-                    else:
-                        st.markdown(f"""
-                        <div class="error-message">
-                            ❌ <strong>Failed to delete {table_name}.</strong> Record may not exist or has related records.
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div class="warning-message">
-                    ⚠️ <strong>Please enter a valid {id_label}.</strong>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown(f"""
+            <div class="error-message">
+                ❌ <strong>Failed to delete {table_name}:</strong> {error_msg}
+            </div>
+            """, unsafe_allow_html=True)
 
 def show_add_data():
     """show forms to add data to tables"""
@@ -411,7 +383,8 @@ def show_add_data():
         "👤 User": "User",
         "🔗 Actor-Movie (Acts_in)": "Acts_in",
         "🔗 Genre-Movie (Belongs_to)": "Belongs_to",
-        "🔗 Director-Movie (Directed_by)": "Directed_by"
+        "🔗 Director-Movie (Directed_by)": "Directed_by",
+        "🎬 Movie with Credits": "Movie_with_credits"
     }
 
     table_choice = st.selectbox("Select Table to Add Data:", list(table_options.keys()))
@@ -435,6 +408,87 @@ def show_add_data():
         show_belongs_to_form()
     elif table == "Directed_by":
         show_directed_by_form()
+    elif table == "Movie_with_credits":
+        show_movie_with_credits_form()
+
+def show_import_data():
+    """bulk import records from an uploaded file"""
+    st.markdown("## 📥 Import Data")
+    st.markdown("Upload a CSV, JSON or JSON Lines file to add many records to a table at once.")
+
+    table_options = {
+        "🎭 Actor": "Actor",
+        "🎬 Director": "Director",
+        "🏷️ Genre": "Genre",
+        "🎪 Movie": "Movie",
+        "⭐ Review": "Review",
+        "👤 User": "User",
+        "🔗 Actor-Movie (Acts_in)": "Acts_in",
+        "🔗 Genre-Movie (Belongs_to)": "Belongs_to",
+        "🔗 Director-Movie (Directed_by)": "Directed_by"
+    }
+
+    table_choice = st.selectbox("Select Table to Import Into:", list(table_options.keys()))
+    table = table_options[table_choice]
+    columns = INSERT_SPECS[table][2]
+
+    st.markdown(f"""
+    <div class="info-message">
+        ℹ️ <strong>File format:</strong> CSV with a header row, a JSON array of objects, or one JSON object per
+        line (.jsonl), using the columns
+        <code>{', '.join(columns)}</code>. Rows are validated like the Add Data forms, and links to movies,
+        actors, genres, directors or reviews must point at existing IDs. Invalid rows are skipped and listed below.
+        For very large files use <code>python importer.py {table} FILE</code>.
+    </div>
+    """, unsafe_allow_html=True)
+
+    uploaded_file = st.file_uploader("Choose a file", type=["csv", "jsonl", "ndjson", "json"])
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        start_import = st.button("📥 Import", use_container_width=True, disabled=uploaded_file is None)
+
+    if start_import and uploaded_file is not None:
+        total_bytes = uploaded_file.size or 1
+        progress_bar = st.progress(0.0, text="Starting import...")
+
+        def show_progress(rows_read, inserted, failed):
+            progress_bar.progress(
+                min(1.0, uploaded_file.tell() / total_bytes),
+                text=f"Read {rows_read:,} rows - {inserted:,} inserted, {failed:,} failed"
+            )
+
+        summary = import_file(table, uploaded_file, detect_format(uploaded_file.name), progress=show_progress)
+        progress_bar.progress(1.0, text="Import finished")
+
+        if summary["error"]:
+            st.error(f"Import stopped: {summary['error']}")
+
+        if summary["inserted"]:
+            st.markdown(f"""
+            <div class="success-message">
+                ✅ <strong>Imported {summary['inserted']:,} of {summary['rows']:,} rows into {table}.</strong>
+            </div>
+            """, unsafe_allow_html=True)
+        if summary["failed"]:
+            st.markdown(f"""
+            <div class="warning-message">
+                ⚠️ <strong>{summary['failed']:,} rows were skipped.</strong>
+            </div>
+            """, unsafe_allow_html=True)
+            failures_df = pd.DataFrame(
+                [(index + 1 if index is not None else None, error) for index, error in summary["failures"]],
+                columns=["Row", "Error"]
+            )
+            st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
+            st.dataframe(failures_df, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+        elif not summary["rows"] and not summary["error"]:
+            st.markdown("""
+            <div class="info-message">
+                ℹ️ The file did not contain any rows.
+            </div>
+            """, unsafe_allow_html=True)
 
 def show_delete_data():
     """show forms to delete data from tables"""
@@ -461,13 +515,14 @@ def show_delete_data():
     elif table == "Director":
         show_generic_delete_form("Director", "Director ID", delete_director)
     elif table == "Genre":
-        show_generic_delete_form("Genre", "Genre ID", delete_genre)
+        show_generic_delete_form("Genre", "Genre ID", delete_genre, "Type the start of a category or an ID")
     elif table == "Movie":
-        show_generic_delete_form("Movie", "Movie ID", delete_movie)
+        show_generic_delete_form("Movie", "Movie ID", delete_movie, "Type the start of a title or an ID")
     elif table == "Review":
-        show_generic_delete_form("Review", "Review ID", delete_review)
+        show_generic_delete_form("Review", "Review ID", delete_review,
+                                 "Type the start of the movie title or a review ID")
     elif table == "User":
-        show_generic_delete_form("User", "User ID", delete_user, is_text_id=True)
+        show_generic_delete_form("User", "User ID", delete_user, "Type the start of a user ID")
     elif table == "Acts_in":
         show_delete_acts_in_form()
     elif table == "Belongs_to":
@@ -476,6 +531,10 @@ def show_delete_data():
         show_delete_directed_by_form()
 
 
+def results_frame(results):
+    """DataFrame from a columnar database.py result, empty for an error result"""
+    return pd.DataFrame(results) if isinstance(results, dict) else pd.DataFrame()
+
 def show_search_movies():
     """search movies functionality"""
     st.markdown("## 🔍 Search Movies")
@@ -485,6 +544,7 @@ def show_search_movies():
         "📝 Title": "Title",
         "📅 Year": "Year",
         "🎭 Actor": "Actor",
+        "🎬 Director": "Director",
         "🏷️ Genre": "Genre"
     }
 
@@ -494,17 +554,16 @@ def show_search_movies():
     if search_option == "Title":
         col1, col2 = st.columns([3, 1])
         with col1:
-            title = st.text_input("Enter movie title (partial match allowed)", help="Type part of the movie title")
+            title = st.text_input("Enter movie title (partial match allowed)", help="Type the start of any words in the title, best matches are listed first")
         with col2:
             search_title = st.button("🔍 Search by Title", use_container_width=True)
 
         if search_title:
             if title.strip():
                 with st.spinner("Searching movies..."):
-                    results = search_movies_by_title(title.strip())
-                if results:
-                    st.markdown(f"### 🎬 Found {len(results)} movie{'s' if len(results) != 1 else ''}")
-                    df = pd.DataFrame(results)
+                    df = results_frame(search_movies_fulltext(title.strip(), columnar=True))
+                if len(df):
+                    st.markdown(f"### 🎬 Found {len(df)} movie{'s' if len(df) != 1 else ''}")
                     st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
                     st.dataframe(df, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
@@ -530,10 +589,9 @@ def show_search_movies():
 
         if search_year:
             with st.spinner("Searching movies..."):
-                results = search_movies_by_year(year)
-            if results:
-                st.markdown(f"### 🎬 Found {len(results)} movie{'s' if len(results) != 1 else ''} from {year}")
-                df = pd.DataFrame(results)
+                df = results_frame(search_movies_by_year(year, columnar=True))
+            if len(df):
+                st.markdown(f"### 🎬 Found {len(df)} movie{'s' if len(df) != 1 else ''} from {year}")
                 st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
                 st.dataframe(df, use_container_width=True)
                 st.markdown('</div>', unsafe_allow_html=True)
@@ -547,17 +605,16 @@ def show_search_movies():
     elif search_option == "Actor":
         col1, col2 = st.columns([3, 1])
         with col1:
-            actor_name = st.text_input("Enter actor name (partial match allowed)", help="Type part of the actor's name")
+            actor_name = st.text_input("Enter actor name (partial match allowed)", help="Type the start of the actor's first and/or last name")
         with col2:
             search_actor = st.button("🔍 Search by Actor", use_container_width=True)
 
         if search_actor:
             if actor_name.strip():
                 with st.spinner("Searching movies by actor..."):
-                    results = search_movies_by_actor(actor_name.strip())
-                if results:
-                    st.markdown(f"### 🎬 Found {len(results)} movie{'s' if len(results) != 1 else ''} with '{actor_name}'")
-                    df = pd.DataFrame(results)
+                    df = results_frame(search_movies_by_actor_fulltext(actor_name.strip(), columnar=True))
+                if len(df):
+                    st.markdown(f"### 🎬 Found {len(df)} movie{'s' if len(df) != 1 else ''} with '{actor_name}'")
                     st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
                     st.dataframe(df, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
@@ -574,20 +631,48 @@ def show_search_movies():
                 </div>
                 """, unsafe_allow_html=True)
 
+    elif search_option == "Director":
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            director_name = st.text_input("Enter director name (partial match allowed)", help="Type the start of the director's first and/or last name")
+        with col2:
+            search_director = st.button("🔍 Search by Director", use_container_width=True)
+
+        if search_director:
+            if director_name.strip():
+                with st.spinner("Searching movies by director..."):
+                    df = results_frame(search_movies_by_director_fulltext(director_name.strip(), columnar=True))
+                if len(df):
+                    st.markdown(f"### 🎬 Found {len(df)} movie{'s' if len(df) != 1 else ''} directed by '{director_name}'")
+                    st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
+                    st.dataframe(df, use_container_width=True)
+                    st.markdown('</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f"""
+                    <div class="info-message">
+                        ℹ️ No movies found directed by '{director_name}'. Try a different name.
+                    </div>
+                    """, unsafe_allow_html=True)
+            else:
+                st.markdown("""
+                <div class="warning-message">
+                    ⚠️ Please enter a director name to search.
+                </div>
+                """, unsafe_allow_html=True)
+
     elif search_option == "Genre":
         col1, col2 = st.columns([3, 1])
         with col1:
-            genre = st.text_input("Enter genre (partial match allowed)", help="Type part of the genre name")
+            genre = st.text_input("Enter genre (partial match allowed)", help="Type the start of the genre name")
         with col2:
             search_genre = st.button("🔍 Search by Genre", use_container_width=True)
 
         if search_genre:
             if genre.strip():
                 with st.spinner("Searching movies by genre..."):
-                    results = search_movies_by_genre(genre.strip())
-                if results:
-                    st.markdown(f"### 🎬 Found {len(results)} movie{'s' if len(results) != 1 else ''} in '{genre}' genre")
-                    df = pd.DataFrame(results)
+                    df = results_frame(search_movies_by_genre_fulltext(genre.strip(), columnar=True))
+                if len(df):
+                    st.markdown(f"### 🎬 Found {len(df)} movie{'s' if len(df) != 1 else ''} in '{genre}' genre")
                     st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
                     st.dataframe(df, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
@@ -607,7 +692,7 @@ def show_search_movies():
 def show_view_data():
     """view data from tables"""
     st.markdown("## 📊 View Database Tables")
-    st.markdown("Select a table below to view all records in your movie database.")
+    st.markdown("Select a table below to browse its records page by page.")
 
     table_options = {
         "🎭 Actors": "Actor",
@@ -624,33 +709,179 @@ def show_view_data():
     table_choice = st.selectbox("Select Table to View:", list(table_options.keys()))
     table = table_options[table_choice]
 
+    columns, primary_key = get_table_columns(table)
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+    with col2:
+        sort_by = st.selectbox("Sort by", ["(primary key)"] + [c for c in columns if c not in primary_key])
+        sort_by = None if sort_by == "(primary key)" else sort_by
+    with col3:
+        descending = st.checkbox("Descending", value=False)
+
     col1, col2, col3 = st.columns([1, 1, 2])
     with col1:
         load_data = st.button("📊 Load Data", use_container_width=True)
 
+    # pages are fetched on demand; keep the start key of every visited page
+    # so Previous can seek back without re-reading the table
+    view_key = (table, page_size, sort_by, descending)
+    if load_data or st.session_state.get("view_key") != view_key:
+        st.session_state["view_key"] = view_key
+        st.session_state["view_pages"] = [None]
     if load_data:
-        with st.spinner(f"Loading {table} data..."):
-            data = get_table_data(table)
-        if data:
-            st.markdown(f"### 📋 {table} Table")
-            st.markdown(f"**Total Records:** {len(data)}")
-            df = pd.DataFrame(data)
-            st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
-            st.dataframe(df, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+        st.session_state["view_loaded"] = table
 
-            # Add download button
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download as CSV",
-                data=csv,
-                file_name=f"{table.lower()}_data.csv",
-                mime="text/csv"
-            )
-        else:
+    if st.session_state.get("view_loaded") != table:
+        return
+
+    page_starts = st.session_state["view_pages"]
+    with st.spinner(f"Loading {table} data..."):
+        data, next_key = get_table_page(table, page_size, page_starts[-1], sort_by, descending, columnar=True)
+    df = results_frame(data)
+
+    if len(df):
+        page_number = len(page_starts)
+        total = count_table_rows(table)
+        st.markdown(f"### 📋 {table} Table")
+        st.markdown(f"**Total Records:** ~{total:,} &nbsp;|&nbsp; **Page {page_number}** "
+                    f"(rows {(page_number - 1) * page_size + 1:,}–{(page_number - 1) * page_size + len(df):,})")
+        st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
+        st.dataframe(df, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            if st.button("⬅️ Previous", use_container_width=True, disabled=page_number == 1):
+                page_starts.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next ➡️", use_container_width=True, disabled=next_key is None):
+                page_starts.append(next_key)
+                st.rerun()
+
+        # Add download button
+        csv = df.to_csv(index=False)
+        st.download_button(
+            label="📥 Download Page as CSV",
+            data=csv,
+            file_name=f"{table.lower()}_page{page_number}.csv",
+            mime="text/csv"
+        )
+
+        st.markdown("#### 📦 Export Full Table")
+        fmt = st.selectbox("Export format", available_formats(), key="view_export_format")
+        show_export_download(lambda export_file: export_table(table, export_file, fmt), fmt,
+                             f"{table.lower()}_data", f"{fmt.upper()} Export", key="view_export_prepare")
+    else:
+        st.markdown(f"""
+        <div class="info-message">
+            ℹ️ No data found in {table} table. Try adding some records first.
+        </div>
+        """, unsafe_allow_html=True)
+
+# Exports are written to files under ./static, which Streamlit's static file
+# server (server.enableStaticServing) streams to the browser from disk, so a
+# result is never held in memory. Each export gets an unguessable folder and
+# is removed after EXPORT_MAX_AGE.
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "exports")
+EXPORT_URL = "app/static/exports"
+EXPORT_MAX_AGE = 3600  # seconds
+EXPORT_MAX_BYTES = 200 * 1024 * 1024  # largest file the static file server sends
+
+def clean_exports():
+    """remove exported files older than EXPORT_MAX_AGE"""
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    for name in os.listdir(EXPORT_DIR):
+        folder = os.path.join(EXPORT_DIR, name)
+        if time.time() - os.path.getmtime(folder) > EXPORT_MAX_AGE:
+            shutil.rmtree(folder, ignore_errors=True)
+
+@st.fragment
+def show_export_download(export, fmt, file_stem, label, key):
+    """Prepare button that streams an export to a file and links to it for download.
+
+    export(binary_file) writes the data and returns the row count. As a
+    fragment, the button only reruns this part of the page, so results shown
+    above it stay.
+    """
+    mime, suffix = EXPORT_FORMATS[fmt]
+    if not st.button(f"📦 Prepare {label}", key=key):
+        return
+    clean_exports()
+    folder = os.path.join(EXPORT_DIR, secrets.token_urlsafe(16))
+    os.makedirs(folder)
+    file_name = f"{file_stem}{suffix}"
+    path = os.path.join(folder, file_name)
+    try:
+        with st.spinner("Preparing export..."):
+            with open(path, "wb") as export_file:
+                count = export(export_file)
+    except (sqlite3.Error, ValueError, RuntimeError) as e:
+        shutil.rmtree(folder, ignore_errors=True)
+        st.error(f"Export failed: {e}")
+        return
+
+    size = os.path.getsize(path)
+    if size > EXPORT_MAX_BYTES:
+        shutil.rmtree(folder, ignore_errors=True)
+        st.error(f"The export is {size / 2**20:,.0f} MB, more than the {EXPORT_MAX_BYTES // 2**20} MB the app "
+                 f"can serve. Use the command line instead (python export.py --help).")
+        return
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f"""
+        <div class="success-message">
+            ✅ <a href="{EXPORT_URL}/{os.path.basename(folder)}/{file_name}" download="{file_name}"><strong>📥 Download
+            {file_name}</strong></a> ({count:,} rows, {size / 2**20:,.1f} MB)
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        # without static serving the file can only go through download_button, which reads it into memory
+        with open(path, "rb") as export_file:
+            st.download_button(f"📥 Download {file_name} ({count:,} rows)", data=export_file,
+                               file_name=file_name, mime=mime)
+        shutil.rmtree(folder, ignore_errors=True)
+
+def show_query_plan(query, info):
+    """timing, EXPLAIN QUERY PLAN tree and index hints for a SQL Query Tool run"""
+    plan, error = explain_custom_query(query)
+    if error:
+        return
+    hints = query_plan_hints(query, plan)
+
+    with st.expander("🔍 Query Plan & Timing", expanded=bool(hints)):
+        # steps are counted in PROGRESS_INTERVAL increments by the progress handler
+        steps = f"{info['steps']:,}" if info["steps"] else f"< {PROGRESS_INTERVAL:,}"
+        per_row = f"{info['steps'] / info['rows']:,.0f}" if info["steps"] and info["rows"] else "-"
+        col1, col2, col3, col4 = st.columns(4)
+        for col, value, label in ((col1, f"{info['seconds'] * 1000:,.1f} ms", "Execution Time"),
+                                  (col2, f"{info['rows']:,}", "Rows Returned"),
+                                  (col3, steps, "VM Steps"),
+                                  (col4, per_row, "Steps per Row")):
+            with col:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-value">{value}</div>
+                    <div class="metric-label">{label}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+        st.code(format_query_plan(plan), language="text")
+
+        for hint in hints:
             st.markdown(f"""
-            <div class="info-message">
-                ℹ️ No data found in {table} table. Try adding some records first.
+            <div class="warning-message">
+                ⚠️ {hint['warning']}
+            </div>
+            """, unsafe_allow_html=True)
+            if hint["suggestion"]:
+                st.markdown("**💡 Suggested index:**")
+                st.code(hint["suggestion"], language="sql")
+        if not hints:
+            st.markdown("""
+            <div class="success-message">
+                ✅ <strong>No full scans of large tables.</strong> The query uses indexes where it filters.
             </div>
             """, unsafe_allow_html=True)
 
@@ -658,9 +889,9 @@ def show_sql_query_tool():
     """sql query tool for custom queries"""
     st.markdown("## ⚡ SQL Query Tool")
     st.markdown("Execute custom SELECT queries on your movie database. Only SELECT statements are allowed for security.")
-    st.markdown("""
+    st.markdown(f"""
     <div class="info-message">
-        ℹ️ <strong>Safe Querying:</strong> Only SELECT statements are permitted. Dangerous operations like DROP, DELETE, UPDATE, INSERT, ALTER, CREATE, and TRUNCATE are blocked.
+        ℹ️ <strong>Safe Querying:</strong> Only SELECT statements (including WITH ... SELECT) are permitted. Dangerous operations like DROP, DELETE, UPDATE, INSERT, ALTER, and CREATE are refused by the database engine. Queries run read-only and are stopped after {CUSTOM_QUERY_TIMEOUT:g} seconds; at most {CUSTOM_QUERY_MAX_ROWS:,} rows are shown.
     </div>
     """, unsafe_allow_html=True)
 
@@ -735,8 +966,7 @@ GROUP BY g.Category;""",
             """, unsafe_allow_html=True)
         else:
             with st.spinner("Executing query..."):
-                from database import execute_custom_query
-                results, error = execute_custom_query(query.strip())
+                results, error, info = run_custom_query(query.strip(), columnar=True)
 
                 if error:
                     st.markdown(f"""
@@ -745,14 +975,19 @@ GROUP BY g.Category;""",
                     </div>
                     """, unsafe_allow_html=True)
                 elif results:
+                    # create dataframe straight from the result columns
+                    df = results_frame(results)
                     st.markdown(f"""
                     <div class="success-message">
-                        ✅ <strong>Query executed successfully!</strong> Found {len(results)} row{'s' if len(results) != 1 else ''}.
+                        ✅ <strong>Query executed successfully!</strong> Found {len(df)} row{'s' if len(df) != 1 else ''}.
                     </div>
                     """, unsafe_allow_html=True)
-
-                    # create dataframe and display
-                    df = pd.DataFrame(results)
+                    if info["truncated"]:
+                        st.markdown(f"""
+                        <div class="warning-message">
+                            ⚠️ Only the first {len(df):,} rows are shown. Add a LIMIT or filters, or download the full result below.
+                        </div>
+                        """, unsafe_allow_html=True)
 
                     # display results
                     st.markdown("### 📊 Query Results:")
@@ -760,14 +995,10 @@ GROUP BY g.Category;""",
                     st.dataframe(df, use_container_width=True)
                     st.markdown('</div>', unsafe_allow_html=True)
 
-                    # Add download button for results
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Results as CSV",
-                        data=csv,
-                        file_name="query_results.csv",
-                        mime="text/csv"
-                    )
+                    # the full result is only exported on request, under the same limits
+                    show_export_download(
+                        lambda export_file, query=query.strip(): export_query(query, export_file, "csv", sandboxed=True),
+                        "csv", "query_results", "Full Results as CSV", key="sql_export_prepare")
                 else:
                     st.markdown("""
                     <div class="info-message">
@@ -775,164 +1006,187 @@ GROUP BY g.Category;""",
                     </div>
                     """, unsafe_allow_html=True)
 
-def show_acts_in_form():
-    """form to add actor-movie relationship"""
-    st.subheader("Add Actor to Movie")
+            show_query_plan(query.strip(), info)
 
-    with st.form("add_acts_in"):
-        # show existing data for reference
-        st.write("Existing Actors:")
-        actors = get_table_data("Actor")
-        if actors:
-            actor_df = pd.DataFrame(actors)
-            st.dataframe(actor_df)
+def entity_picker(table_name, label, key, noun, placeholder="Type the start of a name or an ID"):
+    """searchable picker - type the start of a name (or an ID), pick from the matches.
+    Returns the chosen ID, or None when nothing matches."""
+    text = st.text_input(f"Search {noun}s", key=f"{key}_search", placeholder=placeholder)
+    matches = lookup_entities(table_name, text)
+    if not matches:
+        message = f"No {noun}s match '{text.strip()}'." if text.strip() else f"No {noun}s found in the database. Add some {noun}s first."
+        st.markdown(f"""
+        <div class="info-message">
+            ℹ️ {message}
+        </div>
+        """, unsafe_allow_html=True)
+        return None
+
+    key_column = LOOKUP_SPECS[table_name][1]
+    options = {f"{m['Label']} (ID: {m[key_column]})": m[key_column] for m in matches}
+    if len(matches) == LOOKUP_LIMIT:
+        st.caption(f"Showing the first {LOOKUP_LIMIT} matches, keep typing to narrow them down.")
+    selected = st.selectbox(label, list(options.keys()), key=f"{key}_choice")
+    return options[selected]
+
+def entity_multi_picker(table_name, label, key, noun, placeholder="Type the start of a name or an ID"):
+    """searchable multi-select - picks are kept while searching for the next one.
+    Returns the chosen IDs."""
+    chosen = st.session_state.setdefault(f"{key}_chosen", {})
+    text = st.text_input(f"Search {noun}s", key=f"{key}_search", placeholder=placeholder)
+
+    key_column = LOOKUP_SPECS[table_name][1]
+    options = dict(chosen)
+    for m in lookup_entities(table_name, text):
+        options.setdefault(f"{m['Label']} (ID: {m[key_column]})", m[key_column])
+    selected = st.multiselect(label, list(options.keys()), default=list(chosen.keys()), key=f"{key}_choice")
+    st.session_state[f"{key}_chosen"] = {s: options[s] for s in selected}
+    return [options[s] for s in selected]
+
+def show_movie_with_credits_form():
+    """form to add a movie with its genres, cast and directors in one transaction"""
+    st.markdown("### 🎬 Add Movie with Credits")
+    st.markdown("The movie and all of its relationships are saved together - if any part fails, nothing is saved.")
+    st.markdown("---")
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        movie_id = st.number_input("Movie ID", min_value=1, step=1, key="credits_movie_id",
+                                   help="Enter unique movie id")
+    with col2:
+        title = st.text_input("Title", key="credits_title", placeholder="e.g., Movie Title (max 45 chars)")
+    with col3:
+        release_year = st.number_input("Release Year", min_value=1900, max_value=2030, value=2024, step=1,
+                                       key="credits_release_year")
 
-        st.write("Existing Movies:")
-        movies = get_table_data("Movie")
-        if movies:
-            movie_df = pd.DataFrame(movies)
-            st.dataframe(movie_df)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        genre_ids = entity_multi_picker("Genre", "Genres", "credits_genres", "genre",
+                                        placeholder="Type the start of a category or an ID")
+    with col2:
+        actor_ids = entity_multi_picker("Actor", "Cast", "credits_actors", "actor")
+    with col3:
+        director_ids = entity_multi_picker("Director", "Directors", "credits_directors", "director")
+
+    if st.button("✅ Add Movie with Credits", disabled=not title.strip()):
+        success, error_msg = add_movie_with_credits(movie_id, title, release_year, genre_ids, actor_ids, director_ids)
+        if success:
+            for key in ("credits_genres", "credits_actors", "credits_directors"):
+                st.session_state.pop(f"{key}_chosen", None)
+            st.success(f"Movie {movie_id} added with {len(genre_ids)} genres, {len(actor_ids)} actors "
+                       f"and {len(director_ids)} directors!")
+        else:
+            st.error(f"Nothing was saved: {error_msg}")
 
-        actor_id = st.number_input("Actor ID", min_value=1, step=1)
-        movie_id = st.number_input("Movie ID", min_value=1, step=1)
+def show_acts_in_form():
+    """form to add actor-movie relationship"""
+    st.subheader("Add Actor to Movie")
 
-        submitted = st.form_submit_button("Add Actor to Movie")
+    col1, col2 = st.columns(2)
+    with col1:
+        actor_id = entity_picker("Actor", "Actor", "acts_in_actor", "actor")
+    with col2:
+        movie_id = entity_picker("Movie", "Movie", "acts_in_movie", "movie",
+                                 placeholder="Type the start of a title or an ID")
 
-        if submitted:
-            if insert_acts_in(actor_id, movie_id):
-                st.success(f"Actor {actor_id} added to Movie {movie_id} successfully!")
-            else:
-                st.error("Failed to add relationship. Check if Actor ID and Movie ID exist.")
+    if st.button("Add Actor to Movie", disabled=actor_id is None or movie_id is None):
+        success, error_msg = insert_acts_in(actor_id, movie_id)
+        if success:
+            st.success(f"Actor {actor_id} added to Movie {movie_id} successfully!")
+        else:
+            st.error(f"Failed to add relationship: {error_msg}")
 
 def show_belongs_to_form():
     """form to add genre-movie relationship"""
     st.subheader("Add Genre to Movie")
 
-    with st.form("add_belongs_to"):
-        # show existing data for reference
-        st.write("Existing Genres:")
-        genres = get_table_data("Genre")
-        if genres:
-            genre_df = pd.DataFrame(genres)
-            st.dataframe(genre_df)
-
-        st.write("Existing Movies:")
-        movies = get_table_data("Movie")
-        if movies:
-            movie_df = pd.DataFrame(movies)
-            st.dataframe(movie_df)
-
-        genre_id = st.number_input("Genre ID", min_value=1, step=1)
-        movie_id = st.number_input("Movie ID", min_value=1, step=1)
-
-        submitted = st.form_submit_button("Add Genre to Movie")
+    col1, col2 = st.columns(2)
+    with col1:
+        genre_id = entity_picker("Genre", "Genre", "belongs_to_genre", "genre",
+                                 placeholder="Type the start of a category or an ID")
+    with col2:
+        movie_id = entity_picker("Movie", "Movie", "belongs_to_movie", "movie",
+                                 placeholder="Type the start of a title or an ID")
 
-        if submitted:
-            if insert_belongs_to(genre_id, movie_id):
-                st.success(f"Genre {genre_id} added to Movie {movie_id} successfully!")
-            else:
-                st.error("Failed to add relationship. Check if Genre ID and Movie ID exist.")
+    if st.button("Add Genre to Movie", disabled=genre_id is None or movie_id is None):
+        success, error_msg = insert_belongs_to(genre_id, movie_id)
+        if success:
+            st.success(f"Genre {genre_id} added to Movie {movie_id} successfully!")
+        else:
+            st.error(f"Failed to add relationship: {error_msg}")
 
 def show_directed_by_form():
     """form to add director-movie relationship"""
     st.subheader("Add Director to Movie")
 
-    with st.form("add_directed_by"):
-        # show existing data for reference
-        st.write("Existing Directors:")
-        directors = get_table_data("Director")
-        if directors:
-            director_df = pd.DataFrame(directors)
-            st.dataframe(director_df)
-
-        st.write("Existing Movies:")
-        movies = get_table_data("Movie")
-        if movies:
-            movie_df = pd.DataFrame(movies)
-            st.dataframe(movie_df)
-
-        movie_id = st.number_input("Movie ID", min_value=1, step=1)
-        director_id = st.number_input("Director ID", min_value=1, step=1)
-
-        submitted = st.form_submit_button("Add Director to Movie")
+    col1, col2 = st.columns(2)
+    with col1:
+        movie_id = entity_picker("Movie", "Movie", "directed_by_movie", "movie",
+                                 placeholder="Type the start of a title or an ID")
+    with col2:
+        director_id = entity_picker("Director", "Director", "directed_by_director", "director")
 
-        if submitted:
-            if insert_directed_by(movie_id, director_id):
-                st.success(f"Director {director_id} added to Movie {movie_id} successfully!")
-            else:
-                st.error("Failed to add relationship. Check if Director ID and Movie ID exist.")
+    if st.button("Add Director to Movie", disabled=movie_id is None or director_id is None):
+        success, error_msg = insert_directed_by(movie_id, director_id)
+        if success:
+            st.success(f"Director {director_id} added to Movie {movie_id} successfully!")
+        else:
+            st.error(f"Failed to add relationship: {error_msg}")
 
 def show_delete_acts_in_form():
     """form to delete actor-movie relationship"""
     st.subheader("Remove Actor from Movie")
 
-    with st.form("delete_acts_in"):
-        # show existing relationships for reference
-        st.write("Existing Actor-Movie Relationships:")
-        acts_in = get_table_data("Acts_in")
-        if acts_in:
-            acts_df = pd.DataFrame(acts_in)
-            st.dataframe(acts_df)
-
-        actor_id = st.number_input("Actor ID", min_value=1, step=1)
-        movie_id = st.number_input("Movie ID", min_value=1, step=1)
-
-        submitted = st.form_submit_button("Remove Actor from Movie", type="secondary")
+    col1, col2 = st.columns(2)
+    with col1:
+        actor_id = entity_picker("Actor", "Actor", "delete_acts_in_actor", "actor")
+    with col2:
+        movie_id = entity_picker("Movie", "Movie", "delete_acts_in_movie", "movie",
+                                 placeholder="Type the start of a title or an ID")
 
-        if submitted:
-            if delete_acts_in(actor_id, movie_id):
-                st.success(f"Actor {actor_id} removed from Movie {movie_id} successfully!")
-                st.rerun()
-            else:
-                st.error("Failed to remove relationship. Check if relationship exists.")
+    if st.button("Remove Actor from Movie", type="secondary", disabled=actor_id is None or movie_id is None):
+        success, error_msg = delete_acts_in(actor_id, movie_id)
+        if success:
+            st.success(f"Actor {actor_id} removed from Movie {movie_id} successfully!")
+        else:
+            st.error(f"Failed to remove relationship: {error_msg}")
 
 def show_delete_belongs_to_form():
     """form to delete genre-movie relationship"""
     st.subheader("Remove Genre from Movie")
 
-    with st.form("delete_belongs_to"):
-        # show existing relationships for reference
-        st.write("Existing Genre-Movie Relationships:")
-        belongs_to = get_table_data("Belongs_to")
-        if belongs_to:
-            belongs_df = pd.DataFrame(belongs_to)
-            st.dataframe(belongs_df)
-
-        genre_id = st.number_input("Genre ID", min_value=1, step=1)
-        movie_id = st.number_input("Movie ID", min_value=1, step=1)
-
-        submitted = st.form_submit_button("Remove Genre from Movie", type="secondary")
+    col1, col2 = st.columns(2)
+    with col1:
+        genre_id = entity_picker("Genre", "Genre", "delete_belongs_to_genre", "genre",
+                                 placeholder="Type the start of a category or an ID")
+    with col2:
+        movie_id = entity_picker("Movie", "Movie", "delete_belongs_to_movie", "movie",
+                                 placeholder="Type the start of a title or an ID")
 
-        if submitted:
-            if delete_belongs_to(genre_id, movie_id):
-                st.success(f"Genre {genre_id} removed from Movie {movie_id} successfully!")
-                st.rerun()
-            else:
-                st.error("Failed to remove relationship. Check if relationship exists.")
+    if st.button("Remove Genre from Movie", type="secondary", disabled=genre_id is None or movie_id is None):
+        success, error_msg = delete_belongs_to(genre_id, movie_id)
+        if success:
+            st.success(f"Genre {genre_id} removed from Movie {movie_id} successfully!")
+        else:
+            st.error(f"Failed to remove relationship: {error_msg}")
 
 def show_delete_directed_by_form():
     """form to delete director-movie relationship"""
     st.subheader("Remove Director from Movie")
 
-    with st.form("delete_directed_by"):
-        # show existing relationships for reference
-        st.write("Existing Director-Movie Relationships:")
-        directed_by = get_table_data("Directed_by")
-        if directed_by:
-            directed_df = pd.DataFrame(directed_by)
-            st.dataframe(directed_df)
-
-        movie_id = st.number_input("Movie ID", min_value=1, step=1)
-        director_id = st.number_input("Director ID", min_value=1, step=1)
-
-        submitted = st.form_submit_button("Remove Director from Movie", type="secondary")
+    col1, col2 = st.columns(2)
+    with col1:
+        movie_id = entity_picker("Movie", "Movie", "delete_directed_by_movie", "movie",
+                                 placeholder="Type the start of a title or an ID")
+    with col2:
+        director_id = entity_picker("Director", "Director", "delete_directed_by_director", "director")
 
-        if submitted:
-            if delete_directed_by(movie_id, director_id):
-                st.success(f"Director {director_id} removed from Movie {movie_id} successfully!")
-                st.rerun()
-            else:
-                st.error("Failed to remove relationship. Check if relationship exists.")
+    if st.button("Remove Director from Movie", type="secondary", disabled=movie_id is None or director_id is None):
+        success, error_msg = delete_directed_by(movie_id, director_id)
+        if success:
+            st.success(f"Director {director_id} removed from Movie {movie_id} successfully!")
+        else:
+            st.error(f"Failed to remove relationship: {error_msg}")
 
 def show_update_data():
     """show forms to update data in tables"""
@@ -969,22 +1223,11 @@ def show_update_actor_form():
     st.markdown("### 📝 Update Actor")
     st.markdown("---")
 
-    # Get existing actors for selection
-    actors = get_table_data("Actor")
-    if not actors:
-        st.markdown("""
-        <div class="info-message">
-            ℹ️ No actors found in the database. Add some actors first.
-        </div>
-        """, unsafe_allow_html=True)
+    actor_id = entity_picker("Actor", "Select Actor to Update:", "update_actor", "actor")
+    if actor_id is None:
         return
 
-    actor_options = {f"{a['First_name']} {a['Last_name']} (ID: {a['Actor_id']})": a['Actor_id'] for a in actors}
-    selected_actor = st.selectbox("Select Actor to Update:", list(actor_options.keys()))
-    actor_id = actor_options[selected_actor]
-
-    # Get current actor data
-    current_actor = next((a for a in actors if a['Actor_id'] == actor_id), None)
+    current_actor = fetch_actor(actor_id)
     if not current_actor:
         st.error("Actor not found.")
         return
@@ -1046,20 +1289,11 @@ def show_update_director_form():
     st.markdown("### 📝 Update Director")
     st.markdown("---")
 
-    directors = get_table_data("Director")
-    if not directors:
-        st.markdown("""
-        <div class="info-message">
-            ℹ️ No directors found in the database. Add some directors first.
-        </div>
-        """, unsafe_allow_html=True)
+    director_id = entity_picker("Director", "Select Director to Update:", "update_director", "director")
+    if director_id is None:
         return
 
-    director_options = {f"{d['First_name']} {d['Last_name']} (ID: {d['Director_id']})": d['Director_id'] for d in directors}
-    selected_director = st.selectbox("Select Director to Update:", list(director_options.keys()))
-    director_id = director_options[selected_director]
-
-    current_director = next((d for d in directors if d['Director_id'] == director_id), None)
+    current_director = fetch_director(director_id)
     if not current_director:
         st.error("Director not found.")
         return
@@ -1121,20 +1355,12 @@ def show_update_genre_form():
     st.markdown("### 📝 Update Genre")
     st.markdown("---")
 
-    genres = get_table_data("Genre")
-    if not genres:
-        st.markdown("""
-        <div class="info-message">
-            ℹ️ No genres found in the database. Add some genres first.
-        </div>
-        """, unsafe_allow_html=True)
+    genre_id = entity_picker("Genre", "Select Genre to Update:", "update_genre", "genre",
+                             placeholder="Type the start of a category or an ID")
+    if genre_id is None:
         return
 
-    genre_options = {f"{g['Category']} (ID: {g['Genre_id']})": g['Genre_id'] for g in genres}
-    selected_genre = st.selectbox("Select Genre to Update:", list(genre_options.keys()))
-    genre_id = genre_options[selected_genre]
-
-    current_genre = next((g for g in genres if g['Genre_id'] == genre_id), None)
+    current_genre = fetch_genre(genre_id)
     if not current_genre:
         st.error("Genre not found.")
         return
@@ -1191,20 +1417,12 @@ def show_update_movie_form():
     st.markdown("### 📝 Update Movie")
     st.markdown("---")
 
-    movies = get_table_data("Movie")
-    if not movies:
-        st.markdown("""
-        <div class="info-message">
-            ℹ️ No movies found in the database. Add some movies first.
-        </div>
-        """, unsafe_allow_html=True)
+    movie_id = entity_picker("Movie", "Select Movie to Update:", "update_movie", "movie",
+                             placeholder="Type the start of a title or an ID")
+    if movie_id is None:
         return
 
-    movie_options = {f"{m['Title']} ({m['Release_year']}) (ID: {m['Movie_id']})": m['Movie_id'] for m in movies}
-    selected_movie = st.selectbox("Select Movie to Update:", list(movie_options.keys()))
-    movie_id = movie_options[selected_movie]
-
-    current_movie = next((m for m in movies if m['Movie_id'] == movie_id), None)
+    current_movie = fetch_movie(movie_id)
     if not current_movie:
         st.error("Movie not found.")
         return
@@ -1266,24 +1484,12 @@ def show_update_review_form():
     st.markdown("### 📝 Update Review")
     st.markdown("---")
 
-    reviews = get_table_data("Review")
-    if not reviews:
-        st.markdown("""
-        <div class="info-message">
-            ℹ️ No reviews found in the database. Add some reviews first.
-        </div>
-        """, unsafe_allow_html=True)
+    review_id = entity_picker("Review", "Select Review to Update:", "update_review", "review",
+                              placeholder="Type the start of the movie title or a review ID")
+    if review_id is None:
         return
 
-    # Get movie titles for better display
-    movies = get_table_data("Movie")
-    movie_dict = {m['Movie_id']: m['Title'] for m in movies} if movies else {}
-
-    review_options = {f"Review ID {r['Review_id']} - Movie: {movie_dict.get(r['Movie_Movie_id'], f'ID {r['Movie_Movie_id']}')} - Rating: {r['Rating']}": r['Review_id'] for r in reviews}
-    selected_review = st.selectbox("Select Review to Update:", list(review_options.keys()))
-    review_id = review_options[selected_review]
-
-    current_review = next((r for r in reviews if r['Review_id'] == review_id), None)
+    current_review = fetch_review(review_id)
     if not current_review:
         st.error("Review not found.")
         return
@@ -1294,7 +1500,9 @@ def show_update_review_form():
         with col1:
             st.info(f"Rating: {current_review['Rating']}")
         with col2:
-            st.info(f"Movie ID: {current_review['Movie_Movie_id']}")
+            current_movie = fetch_movie(current_review['Movie_Movie_id'])
+            st.info(f"Movie: {current_movie['Title']} (ID: {current_review['Movie_Movie_id']})" if current_movie
+                    else f"Movie ID: {current_review['Movie_Movie_id']}")
 
         st.markdown("**New Values:**")
         new_rating = st.slider("Rating", min_value=1, max_value=100, value=current_review['Rating'], step=1, help="Rate from 1-100")
@@ -1338,20 +1546,12 @@ def show_update_user_form():
     st.markdown("### 📝 Update User")
     st.markdown("---")
 
-    users = get_table_data("User")
-    if not users:
-        st.markdown("""
-        <div class="info-message">
-            ℹ️ No users found in the database. Add some users first.
-        </div>
-        """, unsafe_allow_html=True)
+    user_id = entity_picker("User", "Select User to Update:", "update_user", "user",
+                            placeholder="Type the start of a user ID")
+    if user_id is None:
         return
 
-    user_options = {f"{u['User_id']} - {u['email']}": u['User_id'] for u in users}
-    selected_user = st.selectbox("Select User to Update:", list(user_options.keys()))
-    user_id = selected_user.split(' - ')[0]  # Extract user_id from the display string
-
-    current_user = next((u for u in users if u['User_id'] == user_id), None)
+    current_user = fetch_user(user_id)
     if not current_user:
         st.error("User not found.")
         return
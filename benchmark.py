@@ -0,0 +1,1296 @@
+# database benchmarks
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import database
+
+def use_scratch_database():
+    """point database.py at a throwaway copy of MovieDatabase.db"""
+    scratch_dir = Path(tempfile.mkdtemp(prefix="moviedb_bench_"))
+    scratch_path = scratch_dir / "MovieDatabase.db"
+    shutil.copy(Path(__file__).parent / "MovieDatabase.db", scratch_path)
+    database.DB_PATH = scratch_path
+    database.close_connections()
+    return scratch_path
+
+def use_generated_database(rows, seed=42):
+    """point database.py at a scratch copy of a generated dataset of about `rows` rows.
+
+    Generated files are cached per (rows, seed) in the temp directory, the
+    sample data is included so the fixed IDs used below still resolve.
+    """
+    import data_generator
+    cache_path = Path(tempfile.gettempdir()) / "moviedb_bench_cache" / f"generated_{rows}_{seed}.db"
+    if not cache_path.exists():
+        cache_path.parent.mkdir(exist_ok=True)
+        partial_path = cache_path.with_suffix(".partial")
+        partial_path.unlink(missing_ok=True)
+        print(f"generating {rows:,}-row dataset (seed {seed}), cached in {cache_path}")
+        data_generator.generate_database(partial_path, rows, seed, with_sample_data=True)
+        # fold the WAL back into the file so a plain copy is complete
+        with sqlite3.connect(partial_path) as conn:
+            conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+        partial_path.rename(cache_path)
+
+    scratch_dir = Path(tempfile.mkdtemp(prefix="moviedb_bench_"))
+    scratch_path = scratch_dir / "MovieDatabase.db"
+    shutil.copy(cache_path, scratch_path)
+    database.DB_PATH = scratch_path
+    database.close_connections()
+    return scratch_path
+
+def ops_per_second(func, iterations):
+    """run func the given number of times and return calls per second"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed if elapsed else float("inf")
+
+# every reported number, written out with --json for regression comparison
+RESULTS = []
+_current = {"benchmark": None, "rows": None}
+
+# units where a larger number is better, everything else is a cost
+HIGHER_IS_BETTER = {"ops/sec", "rows/sec", "%"}
+
+def report(name, value, unit="ops/sec"):
+    print(f"{name:<45} {value:>12,.0f} {unit}")
+    RESULTS.append({**_current, "name": name, "value": value, "unit": unit})
+
+def measure(name, func, iterations):
+    """time func(i) for i in range(iterations) and report latency, throughput and peak memory"""
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    # one extra traced call; tracemalloc slows everything down so it is kept out of the timings
+    tracemalloc.start()
+    func(iterations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report(f"{name} ops/sec", iterations / elapsed if elapsed else float("inf"))
+    for pct in (50, 95, 99):
+        report(f"{name} p{pct}", percentile(latencies, pct) * 1e6, "us")
+    report(f"{name} peak memory", peak / 1024, "KiB")
+
+def bench_connection(iterations, rows=None):
+    """per-call sqlite3.connect versus the pooled get_connection"""
+    db_path = use_scratch_database()
+    query = "SELECT * FROM Movie WHERE Movie_id = ?"
+
+    def unpooled():
+        with sqlite3.connect(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (585388,))
+            cursor.fetchall()
+        conn.close()
+
+    def pooled():
+        database.execute_query(query, (585388,))
+
+    print("## connection")
+    report("point lookup, new connection per call", ops_per_second(unpooled, iterations))
+    report("point lookup, pooled connection", ops_per_second(pooled, iterations))
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+# a read slower than this waited on a lock; WAL readers never should
+READ_STALL_SECONDS = 1.0
+# how long the write transaction in bench_concurrency is held open
+WRITE_HOLD_SECONDS = 0.5
+
+def bench_concurrency(iterations, rows=None, readers=8, writers=4):
+    """readers and writers hammering the same file; readers must never fail or stall"""
+    use_scratch_database()
+    database.READ_CACHE_ENABLED = False  # readers must reach SQLite, not the read cache
+    read_latencies = []
+    failures = []
+    lock = threading.Lock()
+    writes_per_thread = max(1, iterations // (10 * writers))
+
+    def reader():
+        local = []
+        for _ in range(iterations // readers):
+            start = time.perf_counter()
+            result = database.get_table_data("Review")  # the table the writers insert into
+            local.append(time.perf_counter() - start)
+            if not isinstance(result, list):
+                failures.append(("read", result))
+        with lock:
+            read_latencies.extend(local)
+
+    def writer(worker):
+        base = 10_000_000 + worker * writes_per_thread
+        for i in range(writes_per_thread):
+            result = database.insert_review(base + i, 50, 585388)
+            if result != (True, None):
+                failures.append(("write", result))
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # readers while a write transaction holds the lock a commit takes: under
+    # WAL they finish without waiting for it, and do not see its row
+    reviews_before = database.count_table_rows("Review", exact=True)
+    opened, committing, committed = threading.Event(), threading.Event(), threading.Event()
+
+    def open_writer():
+        conn = sqlite3.connect(database.DB_PATH, isolation_level=None)
+        try:
+            conn.execute("BEGIN EXCLUSIVE")
+            conn.execute("INSERT INTO Review (Review_id, Rating, Movie_Movie_id) VALUES (?, ?, ?)",
+                         (19_999_999, 50, 585388))
+            opened.set()
+            time.sleep(WRITE_HOLD_SECONDS)
+            committing.set()
+            conn.execute("COMMIT")
+        finally:
+            committed.set()
+            conn.close()
+
+    holder = threading.Thread(target=open_writer)
+    holder.start()
+    opened.wait()
+    held_latencies = []
+    reads_while_open = seen_uncommitted = 0
+    while not committed.is_set():
+        start_read = time.perf_counter()
+        count = database.count_table_rows("Review", exact=True)
+        held_latencies.append(time.perf_counter() - start_read)
+        if not committing.is_set():
+            reads_while_open += 1
+            seen_uncommitted += count != reviews_before
+    holder.join()
+
+    print(f"## concurrency ({readers} readers, {writers} writers, profile {database.STORAGE_PROFILE})")
+    report("reads", len(read_latencies) / elapsed)
+    report("writes", writes_per_thread * writers / elapsed)
+    report("read latency p50", percentile(read_latencies, 50) * 1e6, "us")
+    report("read latency p99", percentile(read_latencies, 99) * 1e6, "us")
+    report("read latency max", max(read_latencies) * 1e6, "us")
+    report("reads during an open write transaction", reads_while_open, "")
+    report("read latency max, write transaction open", max(held_latencies) * 1e6, "us")
+    report("failed operations", len(failures), "")
+    for kind, result in failures[:5]:
+        print(f"  {kind}: {result}")
+    if failures:
+        raise SystemExit("concurrency benchmark saw failed operations")
+    if max(read_latencies) > READ_STALL_SECONDS:
+        raise SystemExit(f"a reader stalled for {max(read_latencies):.2f}s alongside the writers")
+    if database.STORAGE_PROFILES[database.STORAGE_PROFILE]["journal_mode"] == "WAL" and (
+            reads_while_open < 2 or max(held_latencies) > WRITE_HOLD_SECONDS / 2):
+        raise SystemExit("readers waited on an open write transaction")
+    if seen_uncommitted:
+        raise SystemExit(f"{seen_uncommitted} reads saw an uncommitted row")
+
+# hot queries from database.py with the index each one must use
+PLAN_EXPECTATIONS = [
+    ("movies by actor", database.QUERIES["movies_by_actor"], ("%Tan%",), "sqlite_autoindex_Acts_in_1"),
+    ("movies by genre", database.QUERIES["movies_by_genre"], ("%Sci%",), "sqlite_autoindex_Belongs_to_1"),
+    ("movies by director", database.QUERIES["movies_by_director"], ("%Nolan%",), "idx_directed_by_director"),
+    ("cast of a movie", "SELECT * FROM Acts_in WHERE Movie_Movie_id = ?", (585388,), "idx_acts_in_movie"),
+    ("genres of a movie", "SELECT * FROM Belongs_to WHERE Movie_Movie_id = ?", (585388,), "idx_belongs_to_movie"),
+    ("films of a director", "SELECT * FROM Directed_by WHERE Director_Director_id = ?", (113579,), "idx_directed_by_director"),
+    ("reviews of a movie", "SELECT * FROM Review WHERE Movie_Movie_id = ?", (585388,), "idx_review_movie"),
+    ("users of a review", "SELECT * FROM User WHERE Review_Review_id = ?", (123456,), "idx_user_review"),
+    ("movies by year", "SELECT * FROM Movie WHERE Release_year = ?", (2009,), "idx_movie_release_year"),
+    ("movie title prefix", "SELECT * FROM Movie WHERE Title LIKE ?", ("Toy%",), "idx_movie_title"),
+    ("genre category prefix", "SELECT * FROM Genre WHERE Category LIKE ?", ("Sci%",), "idx_genre_category"),
+    ("actor lookup prefix",
+     """SELECT * FROM Actor WHERE Last_name >= ? COLLATE NOCASE AND Last_name < ? COLLATE NOCASE
+        ORDER BY Last_name COLLATE NOCASE LIMIT 20""", ("Tan", "Tan\U0010ffff"), "idx_actor_last_name"),
+    ("user lookup prefix",
+     """SELECT * FROM User WHERE User_id >= ? COLLATE NOCASE AND User_id < ? COLLATE NOCASE
+        ORDER BY User_id COLLATE NOCASE LIMIT 20""", ("user10", "user10\U0010ffff"), "idx_user_id_nocase"),
+]
+
+# a '%name%' search cannot use an index: the one table (as named in the plan) it may scan
+PLAN_SCANS = {
+    "movies by actor": "a",
+    "movies by genre": "g",
+    "movies by director": "d",
+}
+
+def bench_query_plans(iterations, rows=1_000_000):
+    """assert every hot query seeks an index instead of scanning, then time it"""
+    use_generated_database(rows)
+    problems = []
+    print(f"## query plans (~{rows:,} rows)")
+    with database.get_connection() as conn:
+        for name, query, params, index in PLAN_EXPECTATIONS:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+            allowed = PLAN_SCANS.get(name)
+            scans = [step for step in plan if step.startswith("SCAN") and step.split()[1] != allowed]
+            if scans or (index and not any(index in step for step in plan)):
+                problems.append((name, plan))
+            report(name, ops_per_second(lambda: conn.execute(query, params).fetchall(), iterations // 10 or 1))
+    for name, plan in problems:
+        print(f"  {name}: {' | '.join(plan)}")
+    if problems:
+        raise SystemExit("query plan check found table scans")
+
+def _export_peak_rss(mode, db_path, table, result_queue):
+    """child process: run one export path and report its peak RSS growth in KiB"""
+    import export
+    database.DB_PATH = Path(db_path)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "buffered":
+        # the previous app path: list of dicts -> DataFrame -> one CSV string
+        rows = database.get_table_data(table)
+        try:
+            import pandas as pd
+            data = pd.DataFrame(rows).to_csv(index=False).encode("utf-8")
+        except ImportError:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+            data = buffer.getvalue().encode("utf-8")
+        with tempfile.TemporaryFile() as out:
+            out.write(data)
+    else:
+        with tempfile.TemporaryFile() as out:
+            export.export_table(table, out, mode)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result_queue.put((peak - baseline, elapsed))
+
+def bench_export(iterations, rows=1_000_000):
+    """peak memory of exporting the Review table, buffered versus streamed"""
+    db_path = use_generated_database(rows)
+    context = multiprocessing.get_context("spawn")
+    print(f"## export (Review, {database.count_table_rows('Review', exact=True):,} rows)")
+    import export
+    for mode in ["buffered"] + export.available_formats():
+        result_queue = context.Queue()
+        child = context.Process(target=_export_peak_rss, args=(mode, str(db_path), "Review", result_queue))
+        child.start()
+        rss_kib, elapsed = result_queue.get()
+        child.join()
+        report(f"{mode} peak RSS growth", rss_kib, "KiB")
+        report(f"{mode} time", elapsed * 1000, "ms")
+    if "parquet" in export.available_formats():
+        # a column whose type changes after the first chunk must still export
+        import pyarrow.parquet as pq
+        mixed = "SELECT 1 AS value UNION ALL SELECT 2.5 UNION ALL SELECT 'n/a' UNION ALL SELECT NULL"
+        output = io.BytesIO()
+        export.export_query(mixed, output, "parquet", chunk_size=1)
+        output.seek(0)
+        if pq.read_table(output).column("value").to_pylist() != ["1", "2.5", "n/a", None]:
+            raise SystemExit("parquet export of a mixed-type query changed its values")
+
+def bench_bulk_insert(iterations, rows=1_000_000):
+    """rows/sec for per-row insert_* calls versus bulk_insert"""
+    use_scratch_database()
+    single_rows = min(rows, iterations)
+    print("## bulk insert (Review)")
+
+    start = time.perf_counter()
+    for i in range(single_rows):
+        database.insert_review(20_000_000 + i, 1 + i % 100, 585388)
+    report(f"insert_review x {single_rows:,}", single_rows / (time.perf_counter() - start), "rows/sec")
+
+    for batch_size in (1_000, database.BULK_BATCH_SIZE, 100_000):
+        base = 30_000_000 + batch_size * 1000
+        generated = ((base + i, 1 + i % 100, 585388) for i in range(rows))
+        start = time.perf_counter()
+        inserted, failures = database.bulk_insert("Review", generated, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        report(f"bulk_insert {rows:,} rows, batch {batch_size:,}", inserted / elapsed, "rows/sec")
+        if failures:
+            raise SystemExit(f"bulk insert reported failures: {failures[:5]}")
+
+def bench_operations(iterations, rows=1_000_000):
+    """latency, throughput and memory of every database.py operation on a generated dataset"""
+    import data_generator
+    use_generated_database(rows)
+    counts = data_generator.plan_counts(rows)
+    base = data_generator.ID_BASE
+    movies = counts["movies"]
+    light = iterations
+    heavy = max(5, iterations // 500)  # operations that read whole tables or large result sets
+    print(f"## operations (~{rows:,} rows, {light:,} / {heavy:,} iterations)")
+    database.READ_CACHE_ENABLED = False  # time the queries, not the read cache (see bench_cache)
+
+    reads = [
+        ("get_table_data Genre", lambda i: database.get_table_data("Genre"), light),
+        ("get_table_data Movie", lambda i: database.get_table_data("Movie"), heavy),
+        ("get_table_page Review", lambda i: database.get_table_page("Review", 50), light),
+        ("count_table_rows Review", lambda i: database.count_table_rows("Review"), light),
+        ("get_database_stats", lambda i: database.get_database_stats(), light),
+        ("get_genre_breakdown", lambda i: database.get_genre_breakdown(), heavy),
+        ("get_year_breakdown", lambda i: database.get_year_breakdown(), heavy),
+        ("search_movies_by_title", lambda i: database.search_movies_by_title("Storm"), heavy),
+        ("search_movies_by_year", lambda i: database.search_movies_by_year(1990 + i % 30), heavy),
+        ("search_movies_by_actor", lambda i: database.search_movies_by_actor("Akira Tanaka"), heavy),
+        ("search_movies_by_director", lambda i: database.search_movies_by_director("Nora"), heavy),
+        ("search_movies_by_genre", lambda i: database.search_movies_by_genre("Western"), heavy),
+        ("search_movies_fulltext", lambda i: database.search_movies_fulltext("storm"), light // 10 or 1),
+        ("search_movies_by_actor_fulltext", lambda i: database.search_movies_by_actor_fulltext("akira tanaka"), light // 10 or 1),
+        ("search_movies_by_genre_fulltext", lambda i: database.search_movies_by_genre_fulltext("west"), light // 10 or 1),
+        ("lookup_entities Actor", lambda i: database.lookup_entities(
+            "Actor", data_generator.FIRST_NAMES[i % len(data_generator.FIRST_NAMES)][:1 + i % 3]), light),
+        ("lookup_entities Movie (uncached)", lambda i: database._run_lookup(
+            "Movie", data_generator.TITLE_WORDS[0][i % len(data_generator.TITLE_WORDS[0])], database.LOOKUP_LIMIT), light),
+        ("fetch_movie", lambda i: database.fetch_movie(base + i * 7919 % movies), light),
+        ("fetch_movies 500 ids", lambda i: database.fetch_movies(
+            [base + (i * 500 + j) * 7919 % movies for j in range(500)]), heavy),
+        ("get_table_data Movie + scan for one row", lambda i: next(
+            (m for m in database.get_table_data("Movie") if m['Movie_id'] == base + i % movies), None), heavy),
+        ("execute_custom_query", lambda i: database.execute_custom_query("SELECT COUNT(*) AS n FROM Review"), heavy),
+    ]
+    writes = [
+        ("insert_actor", lambda i: database.insert_actor(90_000_000 + i, "Bench", f"Actor{i}"), light),
+        ("update_actor", lambda i: database.update_actor(90_000_000 + i, "Bench", f"Updated{i}"), light),
+        ("delete_actor", lambda i: database.delete_actor(90_000_000 + i), light),
+        ("insert_review", lambda i: database.insert_review(90_000_000 + i, 50, base + i % movies), light),
+        ("update_review", lambda i: database.update_review(90_000_000 + i, 60, base + i % movies), light),
+        ("delete_review", lambda i: database.delete_review(90_000_000 + i), light),
+        ("insert_acts_in", lambda i: database.insert_acts_in(90_000_000 + i % 1000, base + i % movies), light),
+        ("delete_movie (cascade)", lambda i: database.delete_movie(base + movies - 1 - i), min(light, movies // 4)),
+        ("bulk_insert 1,000 reviews", lambda i: database.bulk_insert(
+            "Review", ((91_000_000 + i * 1000 + j, 50, base + j % movies) for j in range(1000))), heavy),
+    ]
+    for name, func, count in reads + writes:
+        measure(name, func, count)
+
+def bench_streaming(iterations, rows=1_000_000):
+    """time and peak memory of reading the Review table: execute_query versus the streaming readers"""
+    use_generated_database(rows)
+    query = "SELECT * FROM Review"
+    count = database.count_table_rows("Review", exact=True)
+    print(f"## streaming (Review, {count:,} rows)")
+    paths = [
+        ("execute_query", lambda: database.execute_query(query)),
+        ("iter_query dicts", lambda: sum(1 for _ in database.iter_query(query))),
+        ("iter_query tuples", lambda: sum(1 for _ in database.iter_query(query, as_tuples=True))),
+        ("query_columns", lambda: database.query_columns(query)),
+    ]
+    try:
+        import pandas as pd
+        paths += [
+            ("DataFrame(execute_query)", lambda: pd.DataFrame(database.execute_query(query))),
+            ("query_dataframe", lambda: database.query_dataframe(query)),
+        ]
+    except ImportError:
+        print("DataFrame paths skipped: pandas is not installed")
+    runs = max(3, iterations // 1000)
+    for name, func in paths:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report(f"{name} time", percentile(timings, 50) * 1000, "ms")
+        report(f"{name} rows/sec", count / percentile(timings, 50), "rows/sec")
+        report(f"{name} peak memory", peak / 1024, "KiB")
+
+def bench_frames(iterations, rows=1_000_000):
+    """DataFrames for the app's tables: built from lists of dicts versus columnar results"""
+    try:
+        import pandas as pd
+    except ImportError:
+        print("## frames skipped: pandas is not installed")
+        return
+    use_generated_database(rows)
+    database.READ_CACHE_ENABLED = False  # time building the results, not the read cache
+    heavy = max(3, iterations // 1000)
+    print(f"## frames (~{rows:,} rows, {iterations:,} / {heavy:,} iterations)")
+    reads = [
+        ("get_table_page Review 500", lambda **kw: database.get_table_page("Review", 500, **kw)[0], iterations),
+        ("search_movies_by_title", lambda **kw: database.search_movies_by_title("Storm", **kw), heavy),
+        ("execute_custom_query Review", lambda **kw: database.execute_custom_query("SELECT * FROM Review", **kw)[0], heavy),
+    ]
+    for name, read, count in reads:
+        measure(f"{name} list of dicts", lambda i: pd.DataFrame(read()), count)
+        measure(f"{name} columnar", lambda i: pd.DataFrame(read(columnar=True)), count)
+
+    # keyset paging on a sort column with NULLs: every row exactly once, in order
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("UPDATE Movie SET Release_year = NULL WHERE Movie_id % 7 = 0")
+        expected = {
+            descending: [r[0] for r in conn.execute(
+                f"SELECT Movie_id FROM Movie ORDER BY Release_year {direction}, Movie_id {direction}")]
+            for descending, direction in ((False, "ASC"), (True, "DESC"))
+        }
+    conn.close()
+    failures = []
+    for columnar in (False, True):
+        for descending in (False, True):
+            seen, next_key = [], None
+            while True:
+                page, next_key = database.get_table_page("Movie", 50, next_key, "Release_year", descending, columnar)
+                seen += list(page["Movie_id"]) if columnar else [r["Movie_id"] for r in page]
+                if next_key is None:
+                    break
+            if seen != expected[descending]:
+                failures.append(f"{'columnar' if columnar else 'rows'} {'DESC' if descending else 'ASC'}: "
+                                f"{len(seen):,} rows paged, {len(expected[descending]):,} expected")
+    if failures:
+        raise SystemExit("paging by Release_year with NULLs failed: " + "; ".join(failures))
+
+# queries typed into the SQL Query Tool that must not run unbounded:
+# (name, query, limits, expected outcome, tables, rows). A limit is only
+# reached when the product of the tables' row counts is at least rows, so
+# smaller datasets skip the case instead of expecting it to be stopped.
+SANDBOX_QUERIES = [
+    ("cartesian join", "SELECT * FROM Review r1, Review r2", {}, "truncated",
+     ("Review", "Review"), database.CUSTOM_QUERY_MAX_ROWS + 1),
+    ("whole table", "SELECT * FROM Review", {}, "truncated", ("Review",), database.CUSTOM_QUERY_MAX_ROWS + 1),
+    ("cartesian count, time limit", "SELECT COUNT(*) FROM Review r1, Review r2", {"max_steps": None}, "stopped",
+     ("Review", "Review"), 1_000_000_000),
+    ("cartesian sort, time limit", "SELECT r1.Rating FROM Review r1, Movie m ORDER BY random() LIMIT 5",
+     {"max_steps": None}, "stopped", ("Review", "Movie"), 100_000_000),
+    ("cartesian count, step limit", "SELECT COUNT(*) FROM Review r1, Review r2",
+     {"timeout": None, "max_steps": 10_000_000}, "stopped", ("Review", "Review"), 10_000_000),
+    ("point lookup", "SELECT * FROM Movie WHERE Movie_id = 1000005", {}, "ok", (), 0),
+    ("huge value", "SELECT length(randomblob(1000000000)) AS n", {}, "stopped", (), 0),
+]
+
+def _cross_product_size(tables):
+    size = 1
+    for table in tables:
+        size *= database.count_table_rows(table, exact=True)
+    return size
+
+# SQL Query Tool input that must run (True) or be refused (False)
+VALIDATION_CASES = [
+    ("SELECT Title AS Created FROM Movie LIMIT 1", True),
+    ("SELECT 'DELETE FROM Movie; DROP TABLE Movie' AS text", True),
+    ("-- newest first\nSELECT Title FROM Movie ORDER BY Release_year DESC LIMIT 1;", True),
+    ("WITH busy AS (SELECT Movie_Movie_id FROM Review GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 3) "
+     "SELECT m.Title FROM busy JOIN Movie m ON m.Movie_id = busy.Movie_Movie_id", True),
+    ("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n LIMIT 5) SELECT x FROM n", True),
+    ("DELETE FROM Movie", False),
+    ("WITH doomed AS (SELECT 1) DELETE FROM Movie", False),
+    ("WITH x AS (SELECT 1) INSERT INTO Genre VALUES (1, 'x')", False),
+    ("SELECT 1; DROP TABLE Movie", False),
+    ("PRAGMA writable_schema = ON", False),
+    ("ATTACH DATABASE 'other.db' AS other", False),
+    ("SELECT name FROM pragma_table_info('Movie')", True),
+    ("SELECT key, value FROM json_each('{\"a\": 1, \"b\": [2, 3]}')", True),
+    ("SELECT * FROM pragma_writable_schema", False),
+]
+
+# full-text reads through the FTS5 virtual table, checked when the index exists
+FTS_VALIDATION_CASES = [
+    ("SELECT rowid, Title FROM Movie_fts WHERE Movie_fts MATCH 'dark*' LIMIT 5", True),
+]
+
+def _legacy_keyword_check(sql_query):
+    """the SQL Query Tool's old validation: substring search for forbidden keywords"""
+    query_upper = sql_query.strip().upper()
+    if not query_upper.startswith('SELECT'):
+        return "Only SELECT queries are allowed for security reasons"
+    for keyword in ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'CREATE', 'TRUNCATE']:
+        if keyword in query_upper:
+            return f"Query contains forbidden keyword: {keyword}"
+    return None
+
+def bench_sandbox(iterations, rows=1_000_000, timeout=2.0):
+    """execute_custom_query limits on pathological queries, and their cost on normal ones"""
+    use_generated_database(rows)
+    print(f"## sandbox (~{rows:,} rows, {timeout:g}s timeout)")
+    failures = []
+    for name, query, limits, expected, tables, size in SANDBOX_QUERIES:
+        if _cross_product_size(tables) < size:
+            print(f"{name}: skipped, too few rows to reach the limit")
+            continue
+        limits = {"timeout": timeout, **limits}
+        tracemalloc.start()
+        start = time.perf_counter()
+        results, error, info = database.run_custom_query(query, **limits)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        outcome = "stopped" if error else "truncated" if info["truncated"] else "ok"
+        report(f"{name} time", elapsed * 1000, "ms")
+        report(f"{name} peak memory", peak / 1024, "KiB")
+        if outcome != expected or elapsed > timeout + 1:
+            failures.append(f"{name}: {outcome} after {elapsed:.1f}s ({error}), expected {expected}")
+
+    # the SQL Query Tool's download streams the whole result, under the same time limit
+    if _cross_product_size(("Review", "Review")) >= 100_000_000:
+        start = time.perf_counter()
+        try:
+            for _ in database.stream_custom_query("SELECT * FROM Review r1, Review r2", timeout=timeout):
+                pass
+            failures.append("stream_custom_query ran a cartesian join to completion")
+        except sqlite3.OperationalError:
+            pass
+        elapsed = time.perf_counter() - start
+        report("stream_custom_query cartesian join time", elapsed * 1000, "ms")
+        if elapsed > timeout + 1:
+            failures.append(f"stream_custom_query stopped after {elapsed:.1f}s")
+
+    # two layers refuse writes: the authorizer, and the mode=ro connection under it
+    with database._readonly_connection() as conn:
+        try:
+            conn.execute("DELETE FROM Review")
+            failures.append("the sandbox authorizer accepted a DELETE")
+        except sqlite3.DatabaseError:
+            pass
+    conn = database._open_readonly_connection()
+    try:
+        conn.execute("DELETE FROM Review")
+        failures.append("the read-only connection accepted a DELETE")
+    except sqlite3.OperationalError:
+        pass
+    finally:
+        conn.close()
+
+    # the limit checks run every PROGRESS_INTERVAL VM steps, price them on a full scan
+    query = "SELECT Movie_Movie_id, AVG(Rating) AS Average FROM Review GROUP BY Movie_Movie_id"
+    runs = max(3, iterations // 1000)
+    scans = [
+        ("execute_query", lambda: database.execute_query(query)),
+        ("run_custom_query, no limits", lambda: database.run_custom_query(
+            query, max_rows=None, timeout=None, max_steps=None)),
+        ("run_custom_query, limits", lambda: database.run_custom_query(query, max_rows=None)),
+    ]
+    for name, func in scans:
+        report(f"full scan {name} time", 1000 / ops_per_second(func, runs), "ms")
+
+    fts_cases = FTS_VALIDATION_CASES if database.fulltext_search_available() else []
+    for query, allowed in VALIDATION_CASES + fts_cases:
+        error = database.run_custom_query(query)[1]
+        if allowed and error and error != "Query returned no results":
+            failures.append(f"refused {query!r}: {error}")
+        elif not allowed and not error:
+            failures.append(f"ran {query!r}")
+
+    # validation cost: statement classification, and the authorizer on a point lookup
+    query = VALIDATION_CASES[3][0]
+    report("keyword check (old) time", 1e6 / ops_per_second(lambda: _legacy_keyword_check(query), iterations), "us")
+    report("statement classification time",
+           1e6 / ops_per_second(lambda: database._validate_custom_query(query), iterations), "us")
+    query = "SELECT * FROM Movie WHERE Movie_id = 1000005"
+    report("point lookup, execute_query time", 1e6 / ops_per_second(lambda: database.execute_query(query), iterations), "us")
+    report("point lookup, run_custom_query time",
+           1e6 / ops_per_second(lambda: database.run_custom_query(query), iterations), "us")
+
+    if failures:
+        raise SystemExit("sandbox limits failed: " + "; ".join(failures))
+
+# ad-hoc queries for the SQL Query Tool's plan panel and the table it should flag,
+# once that table has FULL_SCAN_WARNING_ROWS rows
+EXPLAIN_CASES = [
+    ("email prefix", "SELECT * FROM User WHERE email LIKE 'user1000%'", "User"),
+    ("exact title", "SELECT * FROM Movie m JOIN Review r ON r.Movie_Movie_id = m.Movie_id "
+                    "WHERE m.Title = 'Dark River'", "Movie"),
+    ("cast by first name", """SELECT m.Title FROM Movie m
+        JOIN Acts_in ai ON m.Movie_id = ai.Movie_Movie_id
+        JOIN Actor a ON ai.Actor_Actor_id = a.Actor_id
+        WHERE a.First_name = 'Akira'""", "Actor"),
+    ("users sharing an email", """SELECT COUNT(*) FROM User u
+        JOIN User u2 ON u2.email = u.email WHERE u.User_id LIKE 'user100%'""", "User"),
+    ("actors by exact last name", "SELECT COUNT(*) FROM Actor WHERE Last_name = 'Tanaka'", "Actor"),
+    ("top ratings", "SELECT * FROM Review WHERE Rating > 99", None),
+    ("reviews of a movie", "SELECT * FROM Review WHERE Movie_Movie_id = 1000005", None),
+]
+
+def bench_explain(iterations, rows=1_000_000):
+    """SQL Query Tool plan panel: hints on slow ad-hoc queries, their suggested indexes applied, and its cost"""
+    use_generated_database(rows)
+    print(f"## explain (~{rows:,} rows)")
+    failures = []
+    runs = max(3, iterations // 1000)
+    for name, query, table in EXPLAIN_CASES:
+        flagged = table is not None and database.count_table_rows(table) >= database.FULL_SCAN_WARNING_ROWS
+        plan, error = database.explain_custom_query(query)
+        if error:
+            failures.append(f"{name}: {error}")
+            continue
+        hints = database.query_plan_hints(query, plan)
+        suggestions = [h["suggestion"] for h in hints if h["suggestion"]]
+        report(f"{name} panel time", 1e6 / ops_per_second(
+            lambda: database.query_plan_hints(query, database.explain_custom_query(query)[0]), runs * 10), "us")
+        if bool(hints) != flagged:
+            failures.append(f"{name}: {len(hints)} hints, {'expected' if flagged else 'expected none'}")
+        if not flagged:
+            continue
+        if not suggestions:
+            failures.append(f"{name}: no index suggested for {[h['warning'] for h in hints]}")
+            continue
+
+        before = 1000 / ops_per_second(lambda: database.run_custom_query(query, max_rows=None), runs)
+        for suggestion in suggestions:
+            database.execute_query(suggestion)
+        after = 1000 / ops_per_second(lambda: database.run_custom_query(query, max_rows=None), runs)
+        report(f"{name} before suggested index", before, "ms")
+        report(f"{name} after suggested index", after, "ms")
+        remaining = database.query_plan_hints(query, database.explain_custom_query(query)[0])
+        if remaining:
+            failures.append(f"{name}: still flagged after {suggestions}: {[h['warning'] for h in remaining]}")
+
+    if failures:
+        raise SystemExit("explain hints failed: " + "; ".join(failures))
+
+@contextlib.contextmanager
+def _switching_often(interval=1e-6):
+    """make the interpreter switch threads as often as it can, to surface races"""
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(interval)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(previous)
+
+def bench_cache(iterations, rows=100_000):
+    """read cache hit rate and speed-up on rerun-style reads, and a stale-read check under random writes"""
+    import data_generator
+    use_generated_database(rows)
+    counts = data_generator.plan_counts(rows)
+    base = data_generator.ID_BASE
+    movies = counts["movies"]
+    print(f"## read cache (~{rows:,} rows)")
+
+    # a Streamlit rerun repeats the same handful of reads
+    rerun = [
+        lambda: database.get_database_stats(),
+        lambda: database.get_genre_breakdown(),
+        lambda: database.get_table_page("Movie", 50),
+        lambda: database.search_movies_by_title("Storm"),
+        lambda: database.search_movies_by_genre("Western"),
+    ]
+    runs = max(5, iterations // 100)
+    for enabled in (False, True):
+        database.READ_CACHE_ENABLED = enabled
+        database.clear_read_cache()
+        start = time.perf_counter()
+        for _ in range(runs):
+            for read in rerun:
+                read()
+        label = "cached" if enabled else "uncached"
+        report(f"rerun reads ({label}) per rerun", (time.perf_counter() - start) / runs * 1e6, "us")
+    stats = database.cache_stats()
+    report("rerun reads hit rate", stats["hit_rate"] * 100, "%")
+
+    # the forms pass IDs typed as text: a string ID finds the row, before and after it is cached
+    for entity_id in (str(base), base, f" {base} ", str(base)):
+        if database.fetch_movie(entity_id) is None or base not in database.fetch_by_ids("Movie", [entity_id]):
+            raise SystemExit(f"fetch_movie({entity_id!r}) missed movie {base}")
+
+    # every read must match an uncached read right after any write
+    rng = random.Random(7)
+    reads = [
+        (database.get_database_stats, ()),
+        (database.get_genre_breakdown, ()),
+        (database.get_movie_review_stats, (base,)),
+        (database.get_table_page, ("Actor", 20)),
+        (database.search_movies_by_actor, ("Bench",)),
+        (database.search_movies_by_genre, ("Bench",)),
+        (database.search_movies_by_title, ("Bench",)),
+        (database.count_table_rows, ("Review",)),
+    ]
+    writes = [
+        lambda i: database.insert_actor(94_000_000 + i, "Bench", f"Actor{i}"),
+        lambda i: database.update_actor(94_000_000 + rng.randrange(i + 1), "Bench", f"Renamed{i}"),
+        lambda i: database.delete_actor(94_000_000 + rng.randrange(i + 1)),
+        lambda i: database.insert_acts_in(94_000_000 + rng.randrange(i + 1), base + rng.randrange(movies)),
+        lambda i: database.insert_movie(94_000_000 + i, f"Bench Movie {i}", 2000),
+        lambda i: database.delete_movie(94_000_000 + rng.randrange(i + 1)),
+        lambda i: database.insert_genre(94_000_000 + i, f"Bench {i}"),
+        lambda i: database.insert_belongs_to(94_000_000 + rng.randrange(i + 1), base + rng.randrange(movies)),
+        lambda i: database.insert_review(94_000_000 + i, rng.randint(1, 100), base),
+        lambda i: database.update_review(94_000_000 + rng.randrange(i + 1), rng.randint(1, 100), base + 1),
+        lambda i: database.delete_review(94_000_000 + rng.randrange(i + 1)),
+        lambda i: database.bulk_insert("Review", [(95_000_000 + i, 50, base)]),
+    ]
+    database.clear_read_cache()
+    stale = []
+    checks = max(200, iterations // 10)
+    for i in range(checks):
+        rng.choice(writes)(i)
+        for func, args in reads:
+            cached = func(*args)
+            fresh = func.__wrapped__(*args)
+            if cached != fresh:
+                stale.append((i, func.__name__, args))
+    report(f"stale reads in {checks:,} write/read rounds", len(stale), "reads")
+    report("stale check hit rate", database.cache_stats()["hit_rate"] * 100, "%")
+    if stale:
+        raise SystemExit(f"read cache served stale results: {stale[:5]}")
+
+    # concurrent writers on one table: every version bump must land, or a read
+    # stamped between two of them stays cached under a version that never moves
+    threads, bumps = 8, 20_000
+    before = database._tables_key(["Review"])[2][0]
+    workers = [threading.Thread(target=lambda: [database.invalidate_tables("Review") for _ in range(bumps)])
+               for _ in range(threads)]
+    with _switching_often():
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    lost = before + threads * bumps - database._tables_key(["Review"])[2][0]
+    report(f"lost version bumps from {threads} threads", lost, "bumps")
+    if lost:
+        raise SystemExit(f"{lost} concurrent table version bumps were lost")
+
+# reads every process checks against an uncached read after each write
+COHERENCE_READS = [
+    ("get_database_stats", ()),
+    ("get_genre_breakdown", ()),
+    ("get_table_page", ("Actor", 20)),
+    ("search_movies_by_actor", ("Shared",)),
+    ("search_movies_by_title", ("Shared",)),
+    ("count_table_rows", ("Review",)),
+]
+
+def _coherence_write(i, worker):
+    """one random write from any process; IDs are disjoint per process"""
+    rng = random.Random(i)
+    base = 96_000_000 + worker * 1_000_000
+    writes = [
+        lambda: database.insert_actor(base + i, "Shared", f"Actor{i}"),
+        lambda: database.update_actor(base + rng.randrange(i + 1), "Shared", f"Renamed{i}"),
+        lambda: database.delete_actor(base + rng.randrange(i + 1)),
+        lambda: database.insert_movie(base + i, f"Shared Movie {i}", 2001),
+        lambda: database.insert_acts_in(base + rng.randrange(i + 1), base + rng.randrange(i + 1)),
+        lambda: database.insert_genre(base + i, f"Shared {i}"),
+        lambda: database.insert_belongs_to(base + rng.randrange(i + 1), base + i),
+        lambda: database.insert_review(base + i, rng.randint(1, 100), 585388),
+        lambda: database.delete_review(base + rng.randrange(i + 1)),
+    ]
+    rng.choice(writes)()
+
+def _coherence_check():
+    """number of cached reads that differ from a fresh read in this process"""
+    stale = 0
+    for name, args in COHERENCE_READS:
+        func = getattr(database, name)
+        if func(*args) != func.__wrapped__(*args):
+            stale += 1
+    return stale
+
+def _coherence_worker(db_path, worker, commands, results):
+    """child process: run write / check commands against its own cached database.py"""
+    database.DB_PATH = Path(db_path)
+    _coherence_check()  # warm this process's cache
+    for command, i in iter(commands.get, None):
+        if command == "write":
+            _coherence_write(i, worker)
+            results.put(0)
+        else:
+            results.put(_coherence_check())
+
+def bench_processes(iterations, rows=None, workers=3):
+    """cache coherence across processes sharing one database file"""
+    db_path = use_scratch_database()
+    context = multiprocessing.get_context("spawn")
+    children = []
+    for worker in range(1, workers + 1):
+        commands, results = context.Queue(), context.Queue()
+        child = context.Process(target=_coherence_worker, args=(str(db_path), worker, commands, results))
+        child.start()
+        children.append((child, commands, results))
+    print(f"## processes ({workers + 1} processes sharing one file)")
+
+    def run_rounds(first, rounds):
+        stale = 0
+        for i in range(first, first + rounds):
+            writer = random.Random(i).randrange(workers + 1)
+            if writer == 0:
+                _coherence_write(i, 0)
+            else:
+                children[writer - 1][1].put(("write", i))
+                children[writer - 1][2].get()
+            # every process, including the writer, must see the write at once
+            stale += _coherence_check()
+            for _, commands, results in children:
+                commands.put(("check", i))
+            stale += sum(results.get() for _, _, results in children)
+        return stale
+
+    rounds = max(100, iterations // 50)
+    try:
+        _coherence_check()
+        stale = run_rounds(0, rounds)
+        report(f"stale reads in {rounds:,} cross-process rounds", stale, "reads")
+
+        def timed_reads(label):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                database.get_database_stats()
+            report(f"cached get_database_stats ({label})", iterations / (time.perf_counter() - start))
+
+        timed_reads("polling data_version")
+        poll_interval = database.CHANGE_POLL_INTERVAL
+        database.CHANGE_POLL_INTERVAL = None
+        timed_reads("no polling")
+        # without polling, other processes' writes go unnoticed; shown for contrast
+        report(f"stale reads in {rounds:,} rounds without polling", run_rounds(rounds, rounds), "reads")
+        database.CHANGE_POLL_INTERVAL = poll_interval
+    finally:
+        for child, commands, _ in children:
+            commands.put(None)
+            child.join()
+    if stale:
+        raise SystemExit("a process served stale cached reads after another process wrote")
+
+# what each summary read would cost without the summary tables
+SUMMARY_EQUIVALENTS = {
+    "get_most_reviewed_movies": """
+        SELECT m.Movie_id, m.Title, COUNT(*) AS Review_count, ROUND(AVG(r.Rating), 1) AS Avg_rating
+        FROM Review r JOIN Movie m ON m.Movie_id = r.Movie_Movie_id
+        GROUP BY m.Movie_id ORDER BY Review_count DESC LIMIT 10""",
+    "get_top_actors": """
+        SELECT a.Actor_id, a.First_name, a.Last_name, COUNT(*) AS Movie_count
+        FROM Acts_in ai JOIN Actor a ON a.Actor_id = ai.Actor_Actor_id
+        GROUP BY a.Actor_id ORDER BY Movie_count DESC LIMIT 10""",
+    "get_genre_breakdown": """
+        SELECT g.Category, COUNT(bt.Movie_Movie_id) AS Movie_count
+        FROM Genre g LEFT JOIN Belongs_to bt ON bt.Genre_Genre_id = g.Genre_id
+        GROUP BY g.Genre_id ORDER BY Movie_count DESC, g.Category""",
+}
+
+def bench_summaries(iterations, rows=1_000_000):
+    """summary table reads versus the aggregates they replace, and the write cost of the triggers"""
+    import data_generator
+    use_generated_database(rows)
+    counts = data_generator.plan_counts(rows)
+    base = data_generator.ID_BASE
+    movies = counts["movies"]
+    heavy = max(5, iterations // 500)
+    print(f"## summaries (~{rows:,} rows)")
+    database.READ_CACHE_ENABLED = False
+
+    measure("get_movie_review_stats", lambda i: database.get_movie_review_stats(base + i % movies), iterations)
+    measure("get_most_reviewed_movies", lambda i: database.get_most_reviewed_movies(10), iterations)
+    measure("get_top_actors", lambda i: database.get_top_actors(10), iterations)
+    measure("get_genre_breakdown", lambda i: database.get_genre_breakdown(), iterations)
+    for name, query in SUMMARY_EQUIVALENTS.items():
+        measure(f"{name} (aggregate)", lambda i: database.execute_query(query), heavy)
+
+    def writes(label):
+        measure(f"insert_review {label}", lambda i: database.insert_review(
+            92_000_000 + i, 1 + i % 100, base + i % movies), iterations)
+        measure(f"update_review {label}", lambda i: database.update_review(
+            92_000_000 + i, 50, base + (i + 1) % movies), iterations)
+        measure(f"delete_review {label}", lambda i: database.delete_review(92_000_000 + i), iterations)
+        measure(f"insert_acts_in {label}", lambda i: database.insert_acts_in(
+            base + i % counts["actors"], 93_000_000 + i), iterations)
+        database.execute_query("DELETE FROM Acts_in WHERE Movie_Movie_id >= 93000000")
+
+    writes("with summaries")
+    mismatches = database.check_summaries()
+    if any(mismatches.values()):
+        raise SystemExit(f"summary tables drifted from the base tables: {mismatches}")
+
+    start = time.perf_counter()
+    database.rebuild_summaries()
+    report("rebuild_summaries", (time.perf_counter() - start) * 1000, "ms")
+
+    triggers = database.execute_query("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name GLOB 'Summary_*'")
+    for trigger in triggers:
+        database.execute_query(f"DROP TRIGGER {trigger['name']}")
+    writes("without summaries")
+
+def _legacy_delete_movie(movie_id):
+    """the previous delete_movie: five statements, each its own transaction"""
+    for query in ["DELETE FROM Acts_in WHERE Movie_Movie_id = ?", "DELETE FROM Belongs_to WHERE Movie_Movie_id = ?",
+                  "DELETE FROM Directed_by WHERE Movie_Movie_id = ?", "DELETE FROM Review WHERE Movie_Movie_id = ?",
+                  "DELETE FROM Movie WHERE Movie_id = ?"]:
+        database.execute_query(query, (movie_id,))
+
+ORPHAN_CHECKS = {
+    "Acts_in": "SELECT COUNT(*) AS n FROM Acts_in WHERE Movie_Movie_id NOT IN (SELECT Movie_id FROM Movie)",
+    "Belongs_to": "SELECT COUNT(*) AS n FROM Belongs_to WHERE Movie_Movie_id NOT IN (SELECT Movie_id FROM Movie)",
+    "Directed_by": "SELECT COUNT(*) AS n FROM Directed_by WHERE Movie_Movie_id NOT IN (SELECT Movie_id FROM Movie)",
+    "Review": "SELECT COUNT(*) AS n FROM Review WHERE Movie_Movie_id NOT IN (SELECT Movie_id FROM Movie)",
+    "User": "SELECT COUNT(*) AS n FROM User WHERE Review_Review_id NOT IN (SELECT Review_id FROM Review)",
+}
+
+def bench_delete(iterations, rows=2_100_000):
+    """cascade delete throughput: per-statement commits, one transaction per movie, bulk delete_movies"""
+    import data_generator
+    use_generated_database(rows)
+    database.READ_CACHE_ENABLED = False
+    movies = data_generator.plan_counts(rows)["movies"]
+    ids = [data_generator.ID_BASE + i for i in range(movies)]
+    single = min(iterations, movies // 10)
+    bulk = ids[2 * single:2 * single + 100_000]
+    print(f"## cascade delete (~{rows:,} rows, {movies:,} movies)")
+
+    start = time.perf_counter()
+    for movie_id in ids[:single]:
+        _legacy_delete_movie(movie_id)
+    report(f"delete_movie x {single:,} (5 commits each)", single / (time.perf_counter() - start), "rows/sec")
+    # the old path left the users of deleted reviews behind; the new paths must not add any
+    legacy_orphans = {table: database.execute_query(query)[0]["n"] for table, query in ORPHAN_CHECKS.items()}
+
+    start = time.perf_counter()
+    for movie_id in ids[single:2 * single]:
+        database.delete_movie(movie_id)
+    report(f"delete_movie x {single:,} (1 transaction each)", single / (time.perf_counter() - start), "rows/sec")
+
+    start = time.perf_counter()
+    deleted, error = database.delete_movies(bulk)
+    elapsed = time.perf_counter() - start
+    if error:
+        raise SystemExit(f"delete_movies failed: {error}")
+    report(f"delete_movies {deleted:,} movies", deleted / elapsed, "rows/sec")
+    report(f"delete_movies {deleted:,} movies time", elapsed * 1000, "ms")
+
+    orphans = {table: database.execute_query(query)[0]["n"] - legacy_orphans[table]
+               for table, query in ORPHAN_CHECKS.items()}
+    report("orphaned rows after cascade deletes", sum(orphans.values()), "rows")
+    if any(orphans.values()):
+        raise SystemExit(f"cascade deletes left orphaned rows: {orphans}")
+
+def _separate_commits(movie_id, genre_ids, actor_ids, director_ids):
+    """the composite insert as the app did it before transaction(): one commit per row"""
+    database.insert_movie(movie_id, "Benchmark Movie", 2024)
+    for genre_id in genre_ids:
+        database.insert_belongs_to(genre_id, movie_id)
+    for actor_id in actor_ids:
+        database.insert_acts_in(actor_id, movie_id)
+    for director_id in director_ids:
+        database.insert_directed_by(movie_id, director_id)
+
+def bench_transaction(iterations, rows=100_000):
+    """movie + credits inserts: one commit per row vs one transaction() per movie"""
+    import data_generator
+    use_generated_database(rows)
+    database.READ_CACHE_ENABLED = False
+    counts = data_generator.plan_counts(rows)
+    base = data_generator.ID_BASE
+    genres = [base + i for i in range(2)]
+    actors = [base + i for i in range(3)]
+    directors = [base]
+    count = min(iterations, 2000)
+    first = 2 * base + counts["movies"]
+    print(f"## transaction (~{rows:,} rows, {count:,} movies with 6 credits)")
+
+    start = time.perf_counter()
+    for movie_id in range(first, first + count):
+        _separate_commits(movie_id, genres, actors, directors)
+    report("movie + credits, 7 commits", count / (time.perf_counter() - start))
+
+    first += count
+    start = time.perf_counter()
+    for movie_id in range(first, first + count):
+        success, error = database.add_movie_with_credits(movie_id, "Benchmark Movie", 2024, genres, actors, directors)
+        if not success:
+            raise SystemExit(f"add_movie_with_credits failed: {error}")
+    report("add_movie_with_credits, 1 transaction", count / (time.perf_counter() - start))
+
+    # a missing credit must leave neither the movie nor any of its relationships behind
+    movie_id = first + count
+    success, _ = database.add_movie_with_credits(movie_id, "Benchmark Movie", 2024, genres, actors + [0], directors)
+    leftovers = database.execute_query(
+        "SELECT (SELECT COUNT(*) FROM Movie WHERE Movie_id = ?) + "
+        "(SELECT COUNT(*) FROM Belongs_to WHERE Movie_Movie_id = ?) AS n", (movie_id, movie_id)
+    )[0]["n"]
+    if success or leftovers:
+        raise SystemExit(f"failed add_movie_with_credits left {leftovers} rows behind")
+
+# pages of app.py rendered headless: (label, selectbox choices applied in order)
+def _browse_session():
+    """the reads of a browsing session: first and second View Data page of every
+    table, sort column and direction, the pickers' lookups and each search"""
+    for table in database.get_table_names():
+        columns, _ = database.get_table_columns(table)
+        for sort_by in [None] + columns:
+            for descending in (False, True):
+                _, next_key = database.get_table_page(table, 50, None, sort_by, descending)
+                if next_key:
+                    database.get_table_page(table, 50, next_key, sort_by, descending)
+    for table in database.LOOKUP_SPECS:
+        for text in ("", "Da", "1000005"):
+            database.lookup_entities(table, text)
+    for search in (database.search_movies_by_title, database.search_movies_by_actor,
+                   database.search_movies_by_genre, database.search_movies_by_director):
+        search("Dark")
+
+def bench_statements(iterations, rows=100_000):
+    """per-call overhead of point lookups and inserts with a cold, evicted and warm statement cache"""
+    db_path = use_generated_database(rows)
+    print(f"## statements (~{rows:,} rows, cache of {database.STATEMENT_CACHE_SIZE})")
+    lookup = "SELECT * FROM Movie WHERE Movie_id = ?"
+    next_id = iter(range(20_000_000, 30_000_000))
+
+    def insert():
+        database.insert_review(next(next_id), 50, 1000005)
+
+    # the parse on its own: one connection, statement cache off and on
+    for size in (0, database.STATEMENT_CACHE_SIZE):
+        conn = sqlite3.connect(db_path, cached_statements=size)
+        state = "cold" if size == 0 else "warm"
+        report(f"point lookup, sqlite3 {state} time",
+               1e6 / ops_per_second(lambda: conn.execute(lookup, (1000005,)).fetchall(), iterations), "us")
+        conn.close()
+
+    # the same through execute_query / insert_review, pool and commit included
+    size = database.STATEMENT_CACHE_SIZE
+    database.READ_CACHE_ENABLED = False
+    try:
+        for cache_size, state in ((0, "cold"), (size, "warm")):
+            database.STATEMENT_CACHE_SIZE = cache_size
+            database.close_connections()
+            report(f"point lookup, execute_query {state} time",
+                   1e6 / ops_per_second(lambda: database.execute_query(lookup, (1000005,)), iterations), "us")
+            report(f"insert_review {state} time", 1e6 / ops_per_second(insert, iterations // 5 or 1), "us")
+
+        # the first write after browsing, which runs more distinct statements
+        # than sqlite3's default cache of 128 holds
+        for cache_size in (128, size):
+            database.STATEMENT_CACHE_SIZE = cache_size
+            database.close_connections()
+            insert()
+            timings = []
+            for _ in range(max(5, iterations // 500)):
+                _browse_session()
+                start = time.perf_counter()
+                insert()
+                database.execute_query(lookup, (1000005,))
+                timings.append(time.perf_counter() - start)
+            report(f"insert + lookup after browsing, cache {cache_size} p50", percentile(timings, 50) * 1e6, "us")
+    finally:
+        database.STATEMENT_CACHE_SIZE = size
+        database.close_connections()
+
+# page renders as (name, [(selectbox label, option to choose), ...])
+NAV = "Choose an option:"
+PAGE_RENDERS = [
+    ("show_home", [(NAV, "🏠 Home")]),
+    ("show_add_data", [(NAV, "➕ Add Data")]),
+    ("show_movie_with_credits_form", [(NAV, "➕ Add Data"), ("Select Table to Add Data:", "🎬 Movie with Credits")]),
+    ("show_import_data", [(NAV, "📥 Import Data")]),
+    ("show_update_actor_form", [(NAV, "📝 Update Data"), ("Select Table to Update:", "🎭 Actor")]),
+    ("show_update_movie_form", [(NAV, "📝 Update Data"), ("Select Table to Update:", "🎪 Movie")]),
+    ("show_update_review_form", [(NAV, "📝 Update Data"), ("Select Table to Update:", "⭐ Review")]),
+    ("show_delete_data", [(NAV, "🗑️ Delete Data")]),
+    ("show_search_movies", [(NAV, "🔍 Search Movies")]),
+    ("show_view_data", [(NAV, "📊 View Data")]),
+    ("show_sql_query_tool", [(NAV, "⚡ SQL Query Tool")]),
+]
+
+# independent reads made by one page render, as (function, *args)
+FAN_OUT_PAGES = [
+    ("home page breakdowns", [("get_genre_breakdown",), ("get_year_breakdown",)]),
+    ("four searches", [("search_movies_by_title", "Dark"), ("search_movies_by_actor", "Smith"),
+                       ("search_movies_by_genre", "Drama"), ("search_movies_by_director", "Lee")]),
+]
+
+def _evict_os_cache(db_path):
+    """drop the database files from the OS page cache, as after a restart; False where unsupported"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    database.close_connections()  # mapped pages of open connections would stay
+    for path in (db_path, Path(f"{db_path}-wal")):
+        if path.exists():
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return True
+
+def bench_async(iterations, rows=1_000_000):
+    """wall-clock time of multi-query pages: serial database.py calls vs a database_async fan-out,
+    with the read cache off (every call queries) and on (as the app runs)"""
+    import database_async
+    db_path = use_generated_database(rows)
+    runs = max(5, iterations // 500)
+    print(f"## async (~{rows:,} rows, {os.cpu_count()} CPUs, {database_async.WORKERS} workers)")
+    failures = []
+    for cache in (False, True):
+        database.READ_CACHE_ENABLED = cache
+        database.clear_read_cache()
+        label = "cache on" if cache else "cache off"
+        for page, calls in FAN_OUT_PAGES:
+            calls = [(getattr(database, name), *args) for name, *args in calls]
+
+            def serial():
+                return [func(*args) for func, *args in calls]
+
+            def fan_out():
+                return database_async.run_concurrently(*(database_async.run(*call) for call in calls))
+
+            def read_concurrently():
+                return database_async.read_concurrently(*calls)
+
+            if fan_out() != serial() or read_concurrently() != serial():
+                failures.append(f"{page}: fan-out results differ from serial ones ({label})")
+            for mode, func in (("serial", serial), ("fan-out", fan_out), ("read_concurrently", read_concurrently)):
+                timings = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    func()
+                    timings.append(time.perf_counter() - start)
+                report(f"{page} {mode} {label} p50", percentile(timings, 50) * 1e6, "us")
+                # first render after a restart, pages read from disk: I/O waits overlap even on one CPU
+                timings = []
+                for _ in range(runs if not cache and _evict_os_cache(db_path) else 0):
+                    _evict_os_cache(db_path)
+                    start = time.perf_counter()
+                    func()
+                    timings.append(time.perf_counter() - start)
+                if timings:
+                    report(f"{page} {mode} {label} cold p50", percentile(timings, 50) * 1e6, "us")
+    if failures:
+        raise SystemExit("async benchmark failed: " + "; ".join(failures))
+
+def bench_pages(iterations, rows=100_000):
+    """wall-clock time of full app.py reruns per page via Streamlit's AppTest"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("## pages skipped: streamlit is not installed")
+        return
+    use_generated_database(rows)
+    runs = max(3, iterations // 1000)
+    print(f"## pages (~{rows:,} rows, {runs} renders each)")
+    app_path = str(Path(__file__).parent / "app.py")
+    for name, choices in PAGE_RENDERS:
+        timings = []
+        for _ in range(runs):
+            app = AppTest.from_file(app_path, default_timeout=120)
+            app.run()
+            start = time.perf_counter()
+            for label, value in choices:
+                # sidebar and main-area widgets share one element tree, so go by label
+                widgets = [s for s in app.selectbox if s.label == label]
+                if not widgets:
+                    raise SystemExit(f"{name}: no selectbox labelled {label!r}")
+                widgets[0].set_value(value).run()
+                if app.exception:
+                    raise SystemExit(f"{name} raised: {app.exception[0].value}")
+            timings.append((time.perf_counter() - start) / len(choices))
+        report(f"{name} render p50", percentile(timings, 50) * 1000, "ms")
+        report(f"{name} render max", max(timings) * 1000, "ms")
+
+BENCHMARKS = {
+    "connection": bench_connection,
+    "concurrency": bench_concurrency,
+    "plans": bench_query_plans,
+    "export": bench_export,
+    "bulk": bench_bulk_insert,
+    "operations": bench_operations,
+    "streaming": bench_streaming,
+    "frames": bench_frames,
+    "sandbox": bench_sandbox,
+    "explain": bench_explain,
+    "summaries": bench_summaries,
+    "cache": bench_cache,
+    "processes": bench_processes,
+    "delete": bench_delete,
+    "transaction": bench_transaction,
+    "statements": bench_statements,
+    "async": bench_async,
+    "pages": bench_pages,
+}
+
+# benchmarks that run against a dataset and repeat for every --rows size
+SCALE_BENCHMARKS = {"plans", "export", "bulk", "operations", "streaming", "frames", "sandbox", "explain", "summaries", "cache", "delete", "transaction", "statements", "async", "pages"}
+
+def compare_results(baseline_path, threshold):
+    """print results that got worse than the baseline file by more than threshold"""
+    with open(baseline_path) as f:
+        baseline = {
+            (r["benchmark"], r["rows"], r["name"]): r for r in json.load(f)["results"]
+        }
+    regressions = []
+    for result in RESULTS:
+        old = baseline.get((result["benchmark"], result["rows"], result["name"]))
+        if not old or not old["value"]:
+            continue
+        change = (result["value"] - old["value"]) / old["value"]
+        worse = -change if result["unit"] in HIGHER_IS_BETTER else change
+        if worse > threshold:
+            regressions.append((result, old, worse))
+
+    print(f"## comparison with {baseline_path}")
+    for result, old, worse in regressions:
+        rows = f" @ {result['rows']:,} rows" if result["rows"] else ""
+        print(f"REGRESSION {result['benchmark']}{rows}: {result['name']} "
+              f"{old['value']:,.1f} -> {result['value']:,.1f} {result['unit']} ({worse:+.0%})")
+    if not regressions:
+        print(f"no regressions above {threshold:.0%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database.py operations")
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=5000, help="iterations per measurement")
+    parser.add_argument("--rows", help="comma-separated dataset sizes for the scale benchmarks, e.g. 10k,100k,1m "
+                                       "(default: 1m)")
+    parser.add_argument("--json", help="write all results to this JSON file")
+    parser.add_argument("--compare", help="JSON results from an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    import data_generator
+    sizes = [data_generator.parse_scale(size) for size in args.rows.split(",")] if args.rows else [None]
+
+    read_cache = database.READ_CACHE_ENABLED
+    for name in args.benchmarks or BENCHMARKS:
+        for rows in sizes if name in SCALE_BENCHMARKS else [None]:
+            _current.update(benchmark=name, rows=rows)
+            database.READ_CACHE_ENABLED = read_cache
+            if rows:
+                BENCHMARKS[name](args.iterations, rows=rows)
+            else:
+                BENCHMARKS[name](args.iterations)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "iterations": args.iterations,
+                "results": RESULTS,
+            }, f, indent=2)
+        print(f"results written to {args.json}")
+
+    if args.compare and compare_results(args.compare, args.threshold):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
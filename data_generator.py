@@ -0,0 +1,222 @@
+# synthetic dataset generator for scale testing
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import database
+import database_creation
+
+# generated IDs start above the sample data IDs so both can live in one file
+ID_BASE = 1_000_000
+
+# approximate rows per movie across all tables, used to size a dataset:
+# movie 1 + cast 4 + genres 2 + directors 1.1 + reviews 6 + users 6
+# + actors 0.5 + directors 0.1
+ROWS_PER_MOVIE = 20.7
+
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "50m": 50_000_000,
+}
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Biography", "Comedy", "Crime",
+    "Documentary", "Drama", "Family", "Fantasy", "Film Noir", "History",
+    "Horror", "Musical", "Mystery", "Romance", "Science Fiction", "Sport",
+    "Thriller", "War", "Western", "Superhero", "Martial Arts", "Disaster",
+]
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Nancy", "Matthew", "Lisa",
+    "Anthony", "Betty", "Mark", "Margaret", "Paul", "Sandra", "Steven", "Ashley",
+    "Akira", "Yuki", "Carlos", "Sofia", "Amara", "Kwame", "Priya", "Arjun",
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White",
+    "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young",
+    "Tanaka", "Kurosawa", "Okafor", "Mensah", "Sharma", "Patel", "Rossi", "Novak",
+]
+
+TITLE_WORDS = [
+    ["The", "A", "Last", "Dark", "Silent", "Golden", "Broken", "Hidden", "Lost", "Red",
+     "Eternal", "Midnight", "Wild", "Crimson", "Frozen", "Electric", "Distant", "Iron"],
+    ["Night", "River", "Storm", "Kingdom", "Garden", "Empire", "Shadow", "Journey", "Code",
+     "Horizon", "Dream", "Harbor", "Frontier", "Signal", "Island", "Legacy", "Mirror", "Planet"],
+    ["", "", "", "", " Returns", " Rising", " II", " III", ": Origins", " Reborn"],
+]
+
+def parse_scale(value):
+    """row count from a number or a preset such as 10k, 1m, 50m"""
+    value = str(value).strip().lower().replace("_", "").replace(",", "")
+    if value in SCALES:
+        return SCALES[value]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier > 1 else value
+    return int(float(number) * multiplier)
+
+def plan_counts(total_rows):
+    """entity counts that add up to roughly total_rows across all tables"""
+    movies = max(10, int(total_rows / ROWS_PER_MOVIE))
+    return {
+        "movies": movies,
+        "actors": max(10, movies // 2),
+        "directors": max(5, movies // 10),
+        "genres": len(GENRES),
+        "reviews": movies * 6,
+    }
+
+def zipf_rank(rng, n):
+    """0-based rank drawn from a Zipf(s=1)-like distribution over n items.
+
+    Inverse CDF of the continuous 1/x density on [1, n + 1]: constant
+    memory, so it works for tens of millions of items.
+    """
+    return min(n - 1, int(math.exp(rng.random() * math.log(n + 1))) - 1)
+
+def popular(rank, n):
+    """scatter popularity ranks over IDs so popular rows are not clustered"""
+    return (rank * 2654435761) % n if n % 2654435761 else rank
+
+def movie_quality(index):
+    """deterministic per-movie average rating between 40 and 89"""
+    return 40 + (index * 2654435761) % 50
+
+def generate_movies(counts, seed):
+    rng = random.Random(seed * 31 + 1)
+    for i in range(counts["movies"]):
+        first, second, suffix = (rng.choice(words) for words in TITLE_WORDS)
+        title = f"{first} {second}{suffix}"
+        year = max(1920, 2025 - int(abs(rng.gauss(0, 25))))
+        yield ID_BASE + i, title, year
+
+def _people(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield ID_BASE + i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+def generate_actors(counts, seed):
+    yield from _people(counts["actors"], seed * 31 + 2)
+
+def generate_directors(counts, seed):
+    yield from _people(counts["directors"], seed * 31 + 3)
+
+def generate_genres(counts, seed):
+    for i, category in enumerate(GENRES[:counts["genres"]]):
+        yield ID_BASE + i, category
+
+def generate_acts_in(counts, seed):
+    """1-7 actors per movie, actor appearances follow a Zipf distribution"""
+    rng = random.Random(seed * 31 + 4)
+    actors = counts["actors"]
+    for movie in range(counts["movies"]):
+        cast = {popular(zipf_rank(rng, actors), actors) for _ in range(rng.randint(1, 7))}
+        for actor in sorted(cast):
+            yield ID_BASE + actor, ID_BASE + movie
+
+def generate_belongs_to(counts, seed):
+    """1-3 genres per movie, a few genres far more common than others"""
+    rng = random.Random(seed * 31 + 5)
+    genres = counts["genres"]
+    for movie in range(counts["movies"]):
+        picked = {zipf_rank(rng, genres) for _ in range(rng.choice((1, 2, 2, 3)))}
+        for genre in sorted(picked):
+            yield ID_BASE + genre, ID_BASE + movie
+
+def generate_directed_by(counts, seed):
+    """one director per movie, one in ten co-directed"""
+    rng = random.Random(seed * 31 + 6)
+    directors = counts["directors"]
+    for movie in range(counts["movies"]):
+        picked = {popular(zipf_rank(rng, directors), directors) for _ in range(2 if rng.random() < 0.1 else 1)}
+        for director in sorted(picked):
+            yield ID_BASE + movie, ID_BASE + director
+
+def generate_reviews(counts, seed):
+    """reviews skewed towards popular movies, ratings around each movie's quality"""
+    rng = random.Random(seed * 31 + 7)
+    movies = counts["movies"]
+    for i in range(counts["reviews"]):
+        movie = popular(zipf_rank(rng, movies), movies)
+        rating = min(100, max(1, int(rng.gauss(movie_quality(movie), 12))))
+        yield ID_BASE + i, rating, ID_BASE + movie
+
+def generate_users(counts, seed):
+    """one user account per review"""
+    for i in range(counts["reviews"]):
+        yield f"user{ID_BASE + i}", f"user{ID_BASE + i}@example.com", ID_BASE + i
+
+# tables in dependency order with their row generators
+GENERATORS = [
+    ("Movie", generate_movies),
+    ("Actor", generate_actors),
+    ("Director", generate_directors),
+    ("Genre", generate_genres),
+    ("Acts_in", generate_acts_in),
+    ("Belongs_to", generate_belongs_to),
+    ("Directed_by", generate_directed_by),
+    ("Review", generate_reviews),
+    ("User", generate_users),
+]
+
+def generate_database(db_path, total_rows, seed=42, with_sample_data=False, batch_size=50_000, progress=None):
+    """create db_path and fill it with about total_rows generated rows.
+
+    The same (total_rows, seed) always produces the same data. progress,
+    if given, is called as progress(table, inserted, seconds) per table.
+    Returns {table: inserted rows}.
+    """
+    counts = plan_counts(total_rows)
+    database_creation.create_sqlite_database(db_path, with_sample_data=with_sample_data)
+
+    previous_path = database.DB_PATH
+    database.DB_PATH = Path(db_path)
+    inserted = {}
+    try:
+        for table, generator in GENERATORS:
+            start = time.perf_counter()
+            count, failures = database.bulk_insert(table, generator(counts, seed), batch_size=batch_size)
+            if failures:
+                raise RuntimeError(f"Generated {table} rows were rejected: {failures[:5]}")
+            inserted[table] = count
+            if progress:
+                progress(table, count, time.perf_counter() - start)
+        database.execute_query("ANALYZE")
+    finally:
+        database.close_connections()
+        database.DB_PATH = previous_path
+    return inserted
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic movie database for scale testing")
+    parser.add_argument("output", help="database file to create (must not exist)")
+    parser.add_argument("--rows", default="100k", help=f"approximate total rows, a number or one of {', '.join(SCALES)}")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, same seed gives the same data")
+    parser.add_argument("--with-sample-data", action="store_true", help="also insert the 10-row sample data")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per bulk insert transaction")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    if output.exists():
+        parser.error(f"{output} already exists")
+
+    def progress(table, count, seconds):
+        print(f"{table:<12} {count:>12,} rows {seconds:8.1f}s", file=sys.stderr)
+
+    inserted = generate_database(output, parse_scale(args.rows), args.seed, args.with_sample_data,
+                                 args.batch_size, progress)
+    print(f"Generated {sum(inserted.values()):,} rows in {output}")
+
+if __name__ == "__main__":
+    main()
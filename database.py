@@ -2,316 +2,1594 @@
 
 import sqlite3
 import os
+import atexit
+import functools
+import queue
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 
+import database_creation
+from database_creation import apply_migrations
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # columnar arrays and DataFrame results are optional
+    np = None
+    pd = None
+
 # Use SQLite database file
 DB_PATH = Path(__file__).parent / 'MovieDatabase.db'
 
+# Connection pool settings - idle connections kept around between calls
+POOL_SIZE = 5
+
+# Prepared statements kept per pooled connection (sqlite3 cached_statements),
+# keyed on the exact SQL text. Browsing View Data alone produces over a
+# hundred keyset page variants, which with the default of 128 pushed the
+# QUERIES and INSERT_SPECS statements out and made every write re-parse.
+STATEMENT_CACHE_SIZE = 512
+
+# Storage profiles - PRAGMAs applied once when a pooled connection is opened.
+# WAL lets readers keep going while a writer commits; synchronous=NORMAL is
+# safe under WAL (a power loss can only drop the last transactions).
+STORAGE_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,       # KiB, ~64 MB page cache
+        "mmap_size": 268435456,     # 256 MB memory-mapped I/O
+        "busy_timeout": 5000,       # ms to wait on a locked database
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "busy_timeout": 10000,
+        "temp_store": "DEFAULT",
+    },
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+STORAGE_PROFILE = os.environ.get("MOVIEDB_STORAGE_PROFILE", "default")
+
+# Retry policy for SQLITE_BUSY / "database is locked" beyond busy_timeout
+BUSY_RETRIES = 5
+BUSY_BACKOFF_BASE = 0.05   # seconds, doubled on every attempt
+BUSY_BACKOFF_MAX = 1.0
+
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_readonly_pool = queue.LifoQueue(maxsize=POOL_SIZE)  # see _readonly_connection
+_pool_lock = threading.Lock()
+_pool_path = None
+_fts_enabled = False
+
+# Read cache invalidation - every cached read is keyed on the versions of the
+# tables it depends on; writes bump the versions of the tables they touch.
+# _write_generation is bumped for writes whose tables are not known. Bumps
+# from concurrent writers (session threads, database_async workers) must not
+# be lost, so they happen under _version_lock.
+_write_generation = 0
+_table_versions = {}
+_version_lock = threading.Lock()
+_pending_writes = {}  # id(connection) -> tables written in the current block
+
+def _open_connection():
+    """open a new connection and apply the connection pragmas"""
+    # IMMEDIATE takes the write lock when a write transaction starts, so two
+    # writers queue on busy_timeout instead of deadlocking on a lock upgrade
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level="IMMEDIATE",
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma, value in STORAGE_PROFILES[STORAGE_PROFILE].items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+def _is_healthy(conn):
+    """cheap liveness check before handing a pooled connection out"""
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+def _ensure_schema():
+    """apply pending schema migrations the first time a database file is used"""
+    global _fts_enabled
+    conn = _open_connection()
+    try:
+        apply_migrations(conn)
+    except sqlite3.Error as e:
+        print(f"Database migration error: {e}")
+    finally:
+        _fts_enabled = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Movie_fts'"
+        ).fetchone() is not None
+        conn.close()
+
+def _acquire_connection():
+    """take an idle connection from the pool or open a new one"""
+    global _pool_path
+    with _pool_lock:
+        # DB_PATH can be repointed (e.g. to a scratch copy), drop stale connections
+        if _pool_path != DB_PATH:
+            _drain_pool()
+            _pool_path = DB_PATH
+            _ensure_schema()
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            return _open_connection()
+        if _is_healthy(conn):
+            return conn
+        conn.close()
+
+def _release_connection(conn):
+    """return a connection to the pool, closing it if the pool is full"""
+    if conn.in_transaction:
+        conn.rollback()
+    if _pool_path != DB_PATH:
+        conn.close()
+        return
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+def _drain_pool():
+    for pool in (_pool, _readonly_pool):
+        while True:
+            try:
+                conn = pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+def close_connections():
+    """close every idle pooled connection and the change watcher"""
+    with _pool_lock:
+        _drain_pool()
+    with _watch_lock:
+        if _watch["conn"] is not None:
+            _watch["conn"].close()
+        _watch.update(conn=None, path=None)
+
+atexit.register(close_connections)
+
+# the connection of the transaction() open in this thread, if any
+_local = threading.local()
+
+def _current_transaction():
+    return getattr(_local, "conn", None)
+
+@contextmanager
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """borrow a pooled connection for one transaction (commit on success, rollback on error).
 
-def execute_query(query, params=None):
+    Inside transaction() this is the unit of work's connection, which only
+    the outermost transaction() commits.
+    """
+    outer = _current_transaction()
+    if outer is not None:
+        yield outer
+        return
+    conn = _acquire_connection()
+    changes = conn.total_changes
     try:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            if query.strip().upper().startswith('SELECT'):
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                rows = cursor.fetchall()
-                return [dict(zip(columns, row)) for row in rows]
+        with conn:
+            yield conn
+    finally:
+        tables = _pending_writes.pop(id(conn), set())
+        if conn.total_changes != changes and not tables:
+            tables = {None}  # rows changed outside _run_query / bulk_insert
+        _invalidate(tables)
+        _release_connection(conn)
+
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:INSERT|REPLACE|UPDATE|DELETE)(?:\s+OR\s+\w+)?(?:\s+INTO|\s+FROM)?\s+[\"`\[]?(\w+)", re.IGNORECASE
+)
+
+def _written_table(query):
+    """table an INSERT / UPDATE / DELETE writes to, None for anything else"""
+    match = _WRITE_TABLE.match(query)
+    return match.group(1) if match else None
+
+def _note_write(conn, query):
+    """remember the table a statement on conn writes to, see _flush_writes"""
+    _pending_writes.setdefault(id(conn), set()).add(_written_table(query))
+
+def _flush_writes(conn):
+    """invalidate cached reads of the tables written on conn so far (call after commit)"""
+    if conn.in_transaction:
+        return  # still inside a unit of work, invalidated when it commits
+    _invalidate(_pending_writes.pop(id(conn), set()))
+
+@contextmanager
+def _atomic(conn):
+    """BEGIN IMMEDIATE ... COMMIT, or a savepoint when conn is already in a transaction"""
+    if conn.in_transaction:
+        # savepoints nest LIFO, so ROLLBACK TO / RELEASE always hit the innermost one
+        conn.execute("SAVEPOINT unit_of_work")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK TO unit_of_work")
+            conn.execute("RELEASE unit_of_work")
+            raise
+        conn.execute("RELEASE unit_of_work")
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+@contextmanager
+def transaction():
+    """run several database.py operations on one connection with one commit.
+
+        with transaction():
+            insert_movie(...)
+            insert_acts_in(...)
+
+    An exception rolls everything back. Nested transaction() blocks become
+    savepoints, so an inner failure can be caught without losing the outer
+    work. Cached reads are bypassed inside, as they may see uncommitted rows.
+    """
+    outer = _current_transaction()
+    if outer is not None:
+        with _atomic(outer):
+            yield outer
+        return
+    with get_connection() as conn:
+        _local.conn = conn
+        try:
+            with _atomic(conn):
+                yield conn
+        finally:
+            _local.conn = None
+
+def _invalidate(tables):
+    """bump table versions; None in tables means an unknown table, so everything"""
+    global _write_generation
+    with _version_lock:
+        for table in tables:
+            if table is None:
+                _write_generation += 1
+            else:
+                _table_versions[table] = _table_versions.get(table, 0) + 1
+
+def invalidate_tables(*table_names):
+    """drop cached reads of the given tables, or of everything when none are given"""
+    _invalidate(table_names or [None])
+
+def _is_busy_error(error):
+    """true for SQLITE_BUSY / SQLITE_LOCKED errors that are worth retrying"""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+def _backoff_delay(attempt):
+    """exponential backoff with full jitter"""
+    return random.uniform(0, min(BUSY_BACKOFF_MAX, BUSY_BACKOFF_BASE * 2 ** attempt))
+
+def _run_query(query, params):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params or ())
+        # any statement producing a result set (SELECT, WITH ... SELECT)
+        if cursor.description is not None:
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+        _note_write(conn, query)
+        if _current_transaction() is None:
             conn.commit()
-            return True, None
+        return True, None
+
+def _with_busy_retry(func, *args):
+    """call func, retrying with backoff while the database is busy"""
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except sqlite3.OperationalError as e:
+            # the failed transaction was rolled back, so retrying is safe
+            if _is_busy_error(e) and attempt < BUSY_RETRIES:
+                time.sleep(_backoff_delay(attempt))
+                attempt += 1
+                continue
+            raise
+
+def _error_result(e):
+    print(f"Database error: {e}")
+    if isinstance(e, sqlite3.OperationalError) and _is_busy_error(e):
+        return False, "Database is busy, please try again in a moment"
+    return False, str(e)
+
+def execute_query(query, params=None):
+    try:
+        return _with_busy_retry(_run_query, query, params)
     except Exception as e:
-        print(f"Database error: {e}")
-        return False, str(e)
+        return _error_result(e)
+
+# rows fetched per fetchmany() call by the streaming readers below
+STREAM_ARRAYSIZE = 1000
+
+def stream_query(query, params=None, chunk_size=STREAM_ARRAYSIZE):
+    """yield (columns, rows) chunks of a query without building the whole result.
+
+    rows is a list of at most chunk_size tuples; the first chunk is always
+    yielded (possibly empty) so callers see the columns. The pooled
+    connection is held until the generator is exhausted or closed.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = chunk_size
+        cursor.execute(query, params or ())
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        rows = cursor.fetchmany()
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany()
+            if rows:
+                yield columns, rows
 
+def iter_query(query, params=None, arraysize=STREAM_ARRAYSIZE, as_tuples=False):
+    """yield the rows of a query one at a time, fetched arraysize at a time.
+
+    Rows are dicts like execute_query's, or with as_tuples=True the tuples
+    sqlite3 returns, which skips building a dict per row. Errors are raised
+    rather than returned as (False, error).
+    """
+    chunks = stream_query(query, params, arraysize)
+    try:
+        for columns, rows in chunks:
+            if as_tuples:
+                yield from rows
+            else:
+                for row in rows:
+                    yield dict(zip(columns, row))
+    finally:
+        chunks.close()
+
+def query_columns(query, params=None, arraysize=STREAM_ARRAYSIZE):
+    """the result of a query as {column: list of values}, without per-row dicts"""
+    chunks = stream_query(query, params, arraysize)
+    try:
+        columns, rows = next(chunks)
+        values = [[] for _ in columns]
+        while rows:
+            for column_values, chunk_values in zip(values, zip(*rows)):
+                column_values.extend(chunk_values)
+            rows = next(chunks, (columns, []))[1]
+    finally:
+        chunks.close()
+    return dict(zip(columns, values))
+
+def _column_array(values):
+    """one result column as an array: int64 when every value is an integer,
+    pandas' nullable Int64 for integers with NULLs, float64 for other numbers
+    (NULL as NaN), object for anything else"""
+    kinds = set(map(type, values))
+    array = None
+    try:
+        if kinds == {int}:
+            array = np.array(values, dtype=np.int64)
+        elif kinds == {int, type(None)} and pd is not None:
+            data = np.array([0 if v is None else v for v in values], dtype=np.int64)
+            mask = np.array([v is None for v in values])
+            data.flags.writeable = mask.flags.writeable = False
+            return pd.arrays.IntegerArray(data, mask)
+    except OverflowError:
+        pass  # beyond 64 bits, leave it to the object fallback
+    if array is None and kinds and kinds <= {int, float, type(None)} and kinds != {type(None)}:
+        array = np.array(values, dtype=np.float64)
+    if array is None:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+    array.flags.writeable = False  # results may be shared through the read cache
+    return array
+
+def query_arrays(query, params=None, arraysize=STREAM_ARRAYSIZE):
+    """the result of a query as {column: array} with int64 / Int64 / float64 / object dtypes.
+
+    Falls back to query_columns' lists when NumPy is not installed.
+    """
+    return _as_arrays(query_columns(query, params, arraysize))
+
+def _as_arrays(columns):
+    """{column: list of values} -> {column: NumPy array}, unchanged without NumPy"""
+    if np is None:
+        return columns
+    return {column: _column_array(values) for column, values in columns.items()}
+
+def execute_columnar(query, params=None):
+    """like execute_query, but a result set comes back columnar (see query_arrays)"""
+    try:
+        return _with_busy_retry(query_arrays, query, params)
+    except Exception as e:
+        return _error_result(e)
+
+def _select(query, params, columnar):
+    return execute_columnar(query, params) if columnar else execute_query(query, params)
+
+def query_dataframe(query, params=None, arraysize=STREAM_ARRAYSIZE):
+    """the result of a query as a pandas DataFrame, built from columns instead of row dicts"""
+    if pd is None:
+        raise RuntimeError("DataFrame results require pandas (pip install pandas)")
+    return pd.DataFrame(query_arrays(query, params, arraysize))
+
+# Read cache - results of the read functions below, shared by every session
+# in the process. Entries are keyed by function, arguments and the versions
+# of the tables the read depends on, so a write never leaves a stale entry
+# reachable; the LRU size and TTL only bound memory and age.
+READ_CACHE_ENABLED = os.environ.get("MOVIEDB_READ_CACHE", "1") != "0"
+READ_CACHE_SIZE = 512
+READ_CACHE_TTL = 300  # seconds
+
+_read_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+def _cache_get(cache, key, ttl=None):
+    """LRU read, returns (True, value) on a hit"""
+    with _cache_lock:
+        if key in cache:
+            stored_at, value = cache[key]
+            if ttl is None or time.monotonic() - stored_at < ttl:
+                cache.move_to_end(key)
+                return True, value
+            del cache[key]
+            _cache_stats["expired"] += 1
+    return False, None
+
+def _cache_put(cache, key, value, max_size):
+    with _cache_lock:
+        cache[key] = (time.monotonic(), value)
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+            _cache_stats["evictions"] += 1
+
+# Cross-process invalidation - a commit by any other connection (another
+# Streamlit worker, the importer, a pooled connection of this process)
+# changes PRAGMA data_version on a dedicated watcher connection. Only then is
+# the trigger-maintained Change_log read to see which tables were written.
+# None disables polling; a positive interval trades staleness for fewer
+# checks (this process's own writes are still seen immediately).
+CHANGE_POLL_INTERVAL = 0.0  # seconds, 0 polls before every cached read
+
+_watch_lock = threading.Lock()
+_watch = {"conn": None, "path": None, "data_version": None, "polled_at": 0.0}
+_shared_versions = {}
+
+def _poll_changes():
+    """pick up writes committed by other connections and processes"""
+    global _write_generation, _shared_versions
+    if CHANGE_POLL_INTERVAL is None:
+        return
+    with _watch_lock:
+        now = time.monotonic()
+        if _watch["path"] != DB_PATH:
+            if _watch["conn"] is not None:
+                _watch["conn"].close()
+            with get_connection():
+                pass  # make sure migrations ran, Change_log may be new
+            _watch.update(conn=sqlite3.connect(DB_PATH, check_same_thread=False), path=DB_PATH,
+                          data_version=None, polled_at=0.0)
+        elif CHANGE_POLL_INTERVAL and now - _watch["polled_at"] < CHANGE_POLL_INTERVAL:
+            return
+        _watch["polled_at"] = now
+        conn = _watch["conn"]
+        try:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == _watch["data_version"]:
+                return
+            _watch["data_version"] = data_version
+            _shared_versions = dict(conn.execute("SELECT name, version FROM Change_log").fetchall())
+        except sqlite3.Error as e:
+            # no change log (or a locked file), fall back to dropping everything
+            print(f"Database error: {e}")
+            with _version_lock:
+                _write_generation += 1
+
+def _tables_key(tables):
+    """the version stamp a cache entry depending on tables is stored under"""
+    _poll_changes()
+    with _version_lock:
+        return (DB_PATH, _write_generation) + tuple(
+            (_table_versions.get(t, 0), _shared_versions.get(t, 0)) for t in tables
+        )
+
+def cached_read(*tables):
+    """cache a read function's results until one of tables is written.
+
+    A table name may be given as a function of the call's arguments, e.g.
+    lambda table_name, *args, **kwargs: table_name. Error results
+    ((False, message) tuples) are not cached. The wrapped function's
+    is_cached(*args, **kwargs) tells whether a call would be a cache hit.
+    """
+    def decorator(func):
+        def cache_key(args, kwargs):
+            names = [t(*args, **kwargs) if callable(t) else t for t in tables]
+            return (func.__name__, args, tuple(sorted(kwargs.items()))) + _tables_key(names)
+
+        def is_cached(*args, **kwargs):
+            if not READ_CACHE_ENABLED or _current_transaction() is not None:
+                return False
+            key = cache_key(args, kwargs)
+            with _cache_lock:
+                entry = _read_cache.get(key)
+            return entry is not None and time.monotonic() - entry[0] < READ_CACHE_TTL
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not READ_CACHE_ENABLED or _current_transaction() is not None:
+                return func(*args, **kwargs)
+            # stamp before reading: a write racing with the read bumps a
+            # version, so whatever this call stores is never served after it
+            key = cache_key(args, kwargs)
+            hit, result = _cache_get(_read_cache, key, READ_CACHE_TTL)
+            with _cache_lock:
+                _cache_stats["hits" if hit else "misses"] += 1
+            if hit:
+                return result
+            result = func(*args, **kwargs)
+            if not (isinstance(result, tuple) and result and result[0] is False):
+                _cache_put(_read_cache, key, result, READ_CACHE_SIZE)
+            return result
+        wrapper.is_cached = is_cached
+        return wrapper
+    return decorator
+
+def cache_stats():
+    """read cache hit / miss counts, hit rate and current size"""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats["size"] = len(_read_cache)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+    return stats
+
+def clear_read_cache():
+    """empty the read caches and reset their statistics"""
+    with _cache_lock:
+        _read_cache.clear()
+        _lookup_cache.clear()
+        _fetch_cache.clear()
+        for name in _cache_stats:
+            _cache_stats[name] = 0
+
+def _table_argument(table_name, *args, **kwargs):
+    return table_name
+
+@cached_read(_table_argument)
 def get_table_data(table_name):
     """get all data from a table"""
     query = f"SELECT * FROM {table_name}"
     return execute_query(query)
 
-def insert_actor(actor_id, first_name, last_name):
-    """insert new actor"""
-    # Validate inputs
+def get_table_names():
+    """names of the user tables in the database"""
+    rows = execute_query(
+        "SELECT name FROM sqlite_master WHERE type = 'table' "
+        "AND name NOT GLOB 'sqlite_*' AND name NOT GLOB '*_fts*' "
+        "ORDER BY name"
+    )
+    return [r['name'] for r in rows] if isinstance(rows, list) else []
+
+def get_table_columns(table_name):
+    """column names and primary key columns (in key order) of a table"""
+    if table_name not in get_table_names():
+        raise ValueError(f"Unknown table: {table_name}")
+    info = execute_query(f"PRAGMA table_info({table_name})")
+    columns = [c['name'] for c in info]
+    primary_key = [c['name'] for c in sorted(info, key=lambda c: c['pk']) if c['pk']]
+    return columns, primary_key or ['rowid']
+
+def _keyset_condition(key_columns, after, descending):
+    """WHERE clause selecting rows strictly after the `after` key in sort order.
+
+    The first key column may be a nullable sort column; SQLite sorts NULLs
+    first, so they need explicit handling (row values never compare to NULL).
+    """
+    op = '<' if descending else '>'
+    sort_col, rest = key_columns[0], key_columns[1:]
+    if after[0] is not None or not rest:
+        cols = ", ".join(key_columns)
+        marks = ", ".join("?" for _ in key_columns)
+        condition = f"({cols}) {op} ({marks})"
+        if not rest:
+            return condition, list(after)
+        if descending:
+            return f"({sort_col} IS NULL OR {condition})", list(after)
+        return f"({sort_col} IS NOT NULL AND {condition})", list(after)
+
+    # positioned among the NULL sort values, continue on the rest of the key
+    cols = ", ".join(rest)
+    marks = ", ".join("?" for _ in rest)
+    condition = f"{sort_col} IS NULL AND ({cols}) {op} ({marks})"
+    if not descending:
+        condition = f"(({condition}) OR {sort_col} IS NOT NULL)"
+    return condition, list(after[1:])
+
+def _key_value(value):
+    """an array element as a value sqlite3 can bind; NaN and pd.NA (NULL in the
+    database) back to None, NumPy scalars to Python ones"""
+    if pd is not None and pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+@cached_read(_table_argument)
+def get_table_page(table_name, page_size=50, after=None, sort_by=None, descending=False, columnar=False):
+    """one page of a table using keyset (seek) pagination.
+
+    Returns (rows, next_key); pass next_key back as `after` to fetch the
+    following page, next_key is None on the last page. With columnar=True
+    rows is {column: array} (see query_arrays) instead of a list of dicts.
+    """
+    columns, primary_key = get_table_columns(table_name)
+    if sort_by is not None and sort_by not in columns:
+        raise ValueError(f"Unknown column for {table_name}: {sort_by}")
+    page_size = max(1, int(page_size))
+
+    key_columns = list(primary_key)
+    if sort_by and sort_by not in primary_key:
+        key_columns = [sort_by] + key_columns
+
+    direction = "DESC" if descending else "ASC"
+    query = f"SELECT * FROM {table_name}"
+    params = []
+    if after is not None:
+        condition, params = _keyset_condition(key_columns, after, descending)
+        query += f" WHERE {condition}"
+    query += " ORDER BY " + ", ".join(f"{c} {direction}" for c in key_columns)
+    query += " LIMIT ?"
+    params.append(page_size + 1)
+
+    if primary_key == ['rowid']:
+        query = query.replace("SELECT *", "SELECT rowid, *", 1)
+    rows = _select(query, params, columnar)
+    if columnar:
+        if not isinstance(rows, dict):
+            return {}, None
+        next_key = None
+        if rows and len(rows[key_columns[0]]) > page_size:
+            rows = {c: values[:page_size] for c, values in rows.items()}
+            next_key = tuple(_key_value(rows[c][page_size - 1]) for c in key_columns)
+        return rows, next_key
+    if not isinstance(rows, list):
+        return [], None
+
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_key = tuple(rows[-1][c] for c in key_columns)
+    return rows, next_key
+
+@cached_read(_table_argument)
+def count_table_rows(table_name, exact=False):
+    """row count of a table; trigger-maintained counter, else ANALYZE estimate or COUNT(*)"""
+    if table_name not in get_table_names():
+        raise ValueError(f"Unknown table: {table_name}")
+    counter = execute_query("SELECT value FROM Stats_counter WHERE name = ?", (table_name,))
+    if isinstance(counter, list) and counter:
+        return counter[0]['value']
+    if not exact:
+        stats = execute_query(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table_name,)
+        ) if "sqlite_stat1" in _stat_tables() else None
+        if isinstance(stats, list) and stats and stats[0]['stat']:
+            return int(stats[0]['stat'].split()[0])
+    result = execute_query(f"SELECT COUNT(*) AS n FROM {table_name}")
+    return result[0]['n'] if isinstance(result, list) else 0
+
+def _stat_tables():
+    rows = execute_query("SELECT name FROM sqlite_master WHERE name LIKE 'sqlite_stat%'")
+    return {r['name'] for r in rows} if isinstance(rows, list) else set()
+
+@cached_read("Movie", "Actor", "Director", "Genre", "Review", "User")
+def get_database_stats():
+    """row counts and rating summary in constant time.
+
+    Counts and the rating total come from the trigger-maintained
+    Stats_counter table, MIN/MAX(Rating) are single seeks on
+    idx_review_rating. Falls back to aggregates on older schemas.
+    """
+    query = """
+    SELECT
+        (SELECT value FROM Stats_counter WHERE name = 'Movie') AS movies,
+        (SELECT value FROM Stats_counter WHERE name = 'Actor') AS actors,
+        (SELECT value FROM Stats_counter WHERE name = 'Director') AS directors,
+        (SELECT value FROM Stats_counter WHERE name = 'Genre') AS genres,
+        (SELECT value FROM Stats_counter WHERE name = 'Review') AS reviews,
+        (SELECT value FROM Stats_counter WHERE name = 'User') AS users,
+        (SELECT value FROM Stats_counter WHERE name = 'rating_sum') AS rating_sum,
+        (SELECT MIN(Rating) FROM Review) AS min_rating,
+        (SELECT MAX(Rating) FROM Review) AS max_rating
+    """
+    rows = execute_query(query)
+    if not isinstance(rows, list):
+        query = """
+        SELECT
+            (SELECT COUNT(*) FROM Movie) AS movies,
+            (SELECT COUNT(*) FROM Actor) AS actors,
+            (SELECT COUNT(*) FROM Director) AS directors,
+            (SELECT COUNT(*) FROM Genre) AS genres,
+            (SELECT COUNT(*) FROM Review) AS reviews,
+            (SELECT COUNT(*) FROM User) AS users,
+            (SELECT COALESCE(SUM(Rating), 0) FROM Review) AS rating_sum,
+            (SELECT MIN(Rating) FROM Review) AS min_rating,
+            (SELECT MAX(Rating) FROM Review) AS max_rating
+        """
+        rows = execute_query(query)
+    if not isinstance(rows, list):
+        return {'movies': 0, 'actors': 0, 'directors': 0, 'genres': 0, 'reviews': 0, 'users': 0,
+                'min_rating': None, 'max_rating': None, 'avg_rating': None}
+    stats = rows[0]
+    rating_sum = stats.pop('rating_sum')
+    stats['avg_rating'] = rating_sum / stats['reviews'] if stats['reviews'] else None
+    return stats
+
+@cached_read("Genre", "Belongs_to")
+def get_genre_breakdown():
+    """number of movies per genre, most common first (from Genre_summary)"""
+    query = """
+    SELECT g.Category, COALESCE(gs.Movie_count, 0) AS Movie_count
+    FROM Genre g
+    LEFT JOIN Genre_summary gs ON gs.Genre_id = g.Genre_id
+    ORDER BY Movie_count DESC, g.Category
+    """
+    rows = execute_query(query)
+    if isinstance(rows, list):
+        return rows
+    query = """
+    SELECT g.Category, COUNT(bt.Movie_Movie_id) AS Movie_count
+    FROM Genre g
+    LEFT JOIN Belongs_to bt ON bt.Genre_Genre_id = g.Genre_id
+    GROUP BY g.Genre_id
+    ORDER BY Movie_count DESC, g.Category
+    """
+    return execute_query(query)
+
+@cached_read("Movie", "Review")
+def get_movie_review_stats(movie_id):
+    """review count and average rating of one movie"""
+    query = """
+    SELECT m.Movie_id, m.Title, COALESCE(ms.Review_count, 0) AS Review_count,
+           CAST(ms.Rating_sum AS REAL) / ms.Review_count AS Avg_rating
+    FROM Movie m
+    LEFT JOIN Movie_summary ms ON ms.Movie_id = m.Movie_id
+    WHERE m.Movie_id = ?
+    """
+    rows = execute_query(query, (movie_id,))
+    return rows[0] if isinstance(rows, list) and rows else None
+
+@cached_read("Movie", "Review")
+def get_most_reviewed_movies(limit=10):
+    """movies with the most reviews and their average rating"""
+    query = """
+    SELECT m.Movie_id, m.Title, ms.Review_count,
+           ROUND(CAST(ms.Rating_sum AS REAL) / ms.Review_count, 1) AS Avg_rating
+    FROM Movie_summary ms
+    JOIN Movie m ON m.Movie_id = ms.Movie_id
+    ORDER BY ms.Review_count DESC
+    LIMIT ?
+    """
+    return execute_query(query, (limit,))
+
+@cached_read("Actor", "Acts_in")
+def get_top_actors(limit=10):
+    """actors appearing in the most movies"""
+    query = """
+    SELECT a.Actor_id, a.First_name, a.Last_name, s.Movie_count
+    FROM Actor_summary s
+    JOIN Actor a ON a.Actor_id = s.Actor_id
+    ORDER BY s.Movie_count DESC
+    LIMIT ?
+    """
+    return execute_query(query, (limit,))
+
+def rebuild_summaries():
+    """recompute the summary tables from the base tables"""
+    try:
+        with get_connection() as conn:
+            database_creation.rebuild_summaries(conn)
+        return True, None
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return False, str(e)
+
+def check_summaries():
+    """{summary table: rows that disagree with the base tables}, all zero when consistent"""
+    try:
+        with get_connection() as conn:
+            return database_creation.check_summaries(conn)
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return None
+
+@cached_read("Movie")
+def get_year_breakdown():
+    """number of movies per release year (index-only scan of idx_movie_release_year)"""
+    query = """
+    SELECT Release_year, COUNT(*) AS Movie_count
+    FROM Movie
+    WHERE Release_year IS NOT NULL
+    GROUP BY Release_year
+    ORDER BY Release_year
+    """
+    return execute_query(query)
+
+def validate_actor(actor_id, first_name, last_name):
+    """validate actor fields, returns (values, None) or (None, error)"""
     try:
         actor_id = int(actor_id)
         if actor_id <= 0:
-            return False, "Actor ID must be a positive integer"
+            return None, "Actor ID must be a positive integer"
         if not first_name.strip() or not last_name.strip():
-            return False, "First name and last name cannot be empty"
+            return None, "First name and last name cannot be empty"
         if len(first_name.strip()) > 45 or len(last_name.strip()) > 45:
-            return False, "Names cannot exceed 45 characters"
+            return None, "Names cannot exceed 45 characters"
     except ValueError:
-        return False, "Actor ID must be a valid integer"
+        return None, "Actor ID must be a valid integer"
+    return (actor_id, first_name.strip(), last_name.strip()), None
 
-    query = "INSERT INTO Actor (Actor_id, First_name, Last_name) VALUES (?, ?, ?)"
-    result = execute_query(query, (actor_id, first_name.strip(), last_name.strip()))
-    return result
-
-def insert_director(director_id, first_name, last_name):
-    """insert new director"""
-    # Validate inputs
+def validate_director(director_id, first_name, last_name):
+    """validate director fields, returns (values, None) or (None, error)"""
     try:
         director_id = int(director_id)
         if director_id <= 0:
-            return False, "Director ID must be a positive integer"
+            return None, "Director ID must be a positive integer"
         if not first_name.strip() or not last_name.strip():
-            return False, "First name and last name cannot be empty"
+            return None, "First name and last name cannot be empty"
         if len(first_name.strip()) > 45 or len(last_name.strip()) > 45:
-            return False, "Names cannot exceed 45 characters"
+            return None, "Names cannot exceed 45 characters"
     except ValueError:
-        return False, "Director ID must be a valid integer"
+        return None, "Director ID must be a valid integer"
+    return (director_id, first_name.strip(), last_name.strip()), None
 
-    query = "INSERT INTO Director (Director_id, First_name, Last_name) VALUES (?, ?, ?)"
-    result = execute_query(query, (director_id, first_name.strip(), last_name.strip()))
-    return result
-
-def insert_genre(genre_id, category):
-    """insert new genre"""
-    # Validate inputs
+def validate_genre(genre_id, category):
+    """validate genre fields, returns (values, None) or (None, error)"""
     try:
         genre_id = int(genre_id)
         if genre_id <= 0:
-            return False, "Genre ID must be a positive integer"
+            return None, "Genre ID must be a positive integer"
         if not category.strip():
-            return False, "Category cannot be empty"
+            return None, "Category cannot be empty"
         if len(category.strip()) > 45:
-            return False, "Category cannot exceed 45 characters"
+            return None, "Category cannot exceed 45 characters"
     except ValueError:
-        return False, "Genre ID must be a valid integer"
-
-    query = "INSERT INTO Genre (Genre_id, Category) VALUES (?, ?)"
-    result = execute_query(query, (genre_id, category.strip()))
-    return result
+        return None, "Genre ID must be a valid integer"
+    return (genre_id, category.strip()), None
 
-def insert_movie(movie_id, title, release_year):
-    """insert new movie"""
-    # Validate inputs
+def validate_movie(movie_id, title, release_year):
+    """validate movie fields, returns (values, None) or (None, error)"""
     try:
         movie_id = int(movie_id)
         release_year = int(release_year)
         if movie_id <= 0:
-            return False, "Movie ID must be a positive integer"
+            return None, "Movie ID must be a positive integer"
         if not title.strip():
-            return False, "Title cannot be empty"
+            return None, "Title cannot be empty"
         if len(title.strip()) > 45:
-            return False, "Title cannot exceed 45 characters"
+            return None, "Title cannot exceed 45 characters"
         if release_year < 1900 or release_year > 2030:
-            return False, "Release year must be between 1900 and 2030"
+            return None, "Release year must be between 1900 and 2030"
     except ValueError:
-        return False, "Movie ID and Release Year must be valid integers"
+        return None, "Movie ID and Release Year must be valid integers"
+    return (movie_id, title.strip(), release_year), None
 
-    query = "INSERT INTO Movie (Movie_id, Title, Release_year) VALUES (?, ?, ?)"
-    result = execute_query(query, (movie_id, title.strip(), release_year))
-    return result
-
-def insert_review(review_id, rating, movie_id):
-    """insert new review"""
-    # Validate inputs
+def validate_review(review_id, rating, movie_id):
+    """validate review fields, returns (values, None) or (None, error)"""
     try:
         review_id = int(review_id)
         rating = int(rating)
         movie_id = int(movie_id)
         if review_id <= 0:
-            return False, "Review ID must be a positive integer"
+            return None, "Review ID must be a positive integer"
         if rating < 1 or rating > 100:
-            return False, "Rating must be between 1 and 100"
+            return None, "Rating must be between 1 and 100"
         if movie_id <= 0:
-            return False, "Movie ID must be a positive integer"
+            return None, "Movie ID must be a positive integer"
     except ValueError:
-        return False, "Review ID, Rating, and Movie ID must be valid integers"
+        return None, "Review ID, Rating, and Movie ID must be valid integers"
+    return (review_id, rating, movie_id), None
 
-    query = "INSERT INTO Review (Review_id, Rating, Movie_Movie_id) VALUES (?, ?, ?)"
-    result = execute_query(query, (review_id, rating, movie_id))
-    return result
-
-def insert_user(user_id, email, review_id):
-    """insert new user"""
-    # Validate inputs
+def validate_user(user_id, email, review_id):
+    """validate user fields, returns (values, None) or (None, error)"""
     try:
         review_id = int(review_id)
         if not user_id.strip():
-            return False, "User ID cannot be empty"
+            return None, "User ID cannot be empty"
         if not email.strip():
-            return False, "Email cannot be empty"
+            return None, "Email cannot be empty"
         if len(user_id.strip()) > 25:
-            return False, "User ID cannot exceed 25 characters"
+            return None, "User ID cannot exceed 25 characters"
         if len(email.strip()) > 45:
-            return False, "Email cannot exceed 45 characters"
+            return None, "Email cannot exceed 45 characters"
         if '@' not in email or '.' not in email:
-            return False, "Email must be in valid format (contain @ and .)"
+            return None, "Email must be in valid format (contain @ and .)"
     except ValueError:
-        return False, "Review ID must be a valid integer"
-
-    query = "INSERT INTO User (User_id, email, Review_Review_id) VALUES (?, ?, ?)"
-    result = execute_query(query, (user_id.strip(), email.strip(), review_id))
-    return result
+        return None, "Review ID must be a valid integer"
+    return (user_id.strip(), email.strip(), review_id), None
 
-def insert_acts_in(actor_id, movie_id):
-    """insert actor-movie relationship"""
-    # Validate inputs
+def validate_acts_in(actor_id, movie_id):
+    """validate actor-movie relationship, returns (values, None) or (None, error)"""
     try:
         actor_id = int(actor_id)
         movie_id = int(movie_id)
         if actor_id <= 0 or movie_id <= 0:
-            return False, "Actor ID and Movie ID must be positive integers"
+            return None, "Actor ID and Movie ID must be positive integers"
     except ValueError:
-        return False, "Actor ID and Movie ID must be valid integers"
+        return None, "Actor ID and Movie ID must be valid integers"
+    return (actor_id, movie_id), None
 
-    query = "INSERT INTO Acts_in (Actor_Actor_id, Movie_Movie_id) VALUES (?, ?)"
-    result = execute_query(query, (actor_id, movie_id))
-    return result
-
-def insert_belongs_to(genre_id, movie_id):
-    """insert genre-movie relationship"""
-    # Validate inputs
+def validate_belongs_to(genre_id, movie_id):
+    """validate genre-movie relationship, returns (values, None) or (None, error)"""
     try:
         genre_id = int(genre_id)
         movie_id = int(movie_id)
         if genre_id <= 0 or movie_id <= 0:
-            return False, "Genre ID and Movie ID must be positive integers"
+            return None, "Genre ID and Movie ID must be positive integers"
     except ValueError:
-        return False, "Genre ID and Movie ID must be valid integers"
-
-    query = "INSERT INTO Belongs_to (Genre_Genre_id, Movie_Movie_id) VALUES (?, ?)"
-    result = execute_query(query, (genre_id, movie_id))
-    return result
+        return None, "Genre ID and Movie ID must be valid integers"
+    return (genre_id, movie_id), None
 
-def insert_directed_by(movie_id, director_id):
-    """insert director-movie relationship"""
-    # Validate inputs
+def validate_directed_by(movie_id, director_id):
+    """validate director-movie relationship, returns (values, None) or (None, error)"""
     try:
         movie_id = int(movie_id)
         director_id = int(director_id)
         if movie_id <= 0 or director_id <= 0:
-            return False, "Movie ID and Director ID must be positive integers"
+            return None, "Movie ID and Director ID must be positive integers"
     except ValueError:
-        return False, "Movie ID and Director ID must be valid integers"
+        return None, "Movie ID and Director ID must be valid integers"
+    return (movie_id, director_id), None
 
-    query = "INSERT INTO Directed_by (Movie_Movie_id, Director_Director_id) VALUES (?, ?)"
-    result = execute_query(query, (movie_id, director_id))
-    return result
+# Insertable tables - validator, INSERT statement and the column order rows use
+INSERT_SPECS = {
+    "Actor": (validate_actor, "INSERT INTO Actor (Actor_id, First_name, Last_name) VALUES (?, ?, ?)",
+              ["Actor_id", "First_name", "Last_name"]),
+    "Director": (validate_director, "INSERT INTO Director (Director_id, First_name, Last_name) VALUES (?, ?, ?)",
+                 ["Director_id", "First_name", "Last_name"]),
+    "Genre": (validate_genre, "INSERT INTO Genre (Genre_id, Category) VALUES (?, ?)",
+              ["Genre_id", "Category"]),
+    "Movie": (validate_movie, "INSERT INTO Movie (Movie_id, Title, Release_year) VALUES (?, ?, ?)",
+              ["Movie_id", "Title", "Release_year"]),
+    "Review": (validate_review, "INSERT INTO Review (Review_id, Rating, Movie_Movie_id) VALUES (?, ?, ?)",
+               ["Review_id", "Rating", "Movie_Movie_id"]),
+    "User": (validate_user, "INSERT INTO User (User_id, email, Review_Review_id) VALUES (?, ?, ?)",
+             ["User_id", "email", "Review_Review_id"]),
+    "Acts_in": (validate_acts_in, "INSERT INTO Acts_in (Actor_Actor_id, Movie_Movie_id) VALUES (?, ?)",
+                ["Actor_Actor_id", "Movie_Movie_id"]),
+    "Belongs_to": (validate_belongs_to, "INSERT INTO Belongs_to (Genre_Genre_id, Movie_Movie_id) VALUES (?, ?)",
+                   ["Genre_Genre_id", "Movie_Movie_id"]),
+    "Directed_by": (validate_directed_by, "INSERT INTO Directed_by (Movie_Movie_id, Director_Director_id) VALUES (?, ?)",
+                    ["Movie_Movie_id", "Director_Director_id"]),
+}
+
+# Named queries - the fixed statements behind the search, update and delete
+# functions. Every call of a function runs the same text, so each pooled
+# connection parses it once and then reuses it from its statement cache.
+QUERIES = {
+    "movies_by_title": "SELECT * FROM Movie WHERE Title LIKE ?",
+    "movies_by_year": "SELECT * FROM Movie WHERE Release_year = ?",
+    # a '%name%' filter cannot use an index, so the filtered table has to be
+    # scanned; CROSS JOIN makes SQLite scan it rather than the larger Movie
+    "movies_by_actor": """
+    SELECT m.* FROM Actor a
+    CROSS JOIN Acts_in ai ON ai.Actor_Actor_id = a.Actor_id
+    CROSS JOIN Movie m ON m.Movie_id = ai.Movie_Movie_id
+    WHERE (a.First_name || ' ' || a.Last_name) LIKE ?
+    """,
+    "movies_by_genre": """
+    SELECT m.* FROM Genre g
+    CROSS JOIN Belongs_to bt ON bt.Genre_Genre_id = g.Genre_id
+    CROSS JOIN Movie m ON m.Movie_id = bt.Movie_Movie_id
+    WHERE g.Category LIKE ?
+    """,
+    "movies_by_director": """
+    SELECT m.* FROM Movie m
+    JOIN Directed_by db ON m.Movie_id = db.Movie_Movie_id
+    JOIN Director d ON db.Director_Director_id = d.Director_id
+    WHERE (d.First_name || ' ' || d.Last_name) LIKE ?
+    """,
+    "update_actor": "UPDATE Actor SET First_name = ?, Last_name = ? WHERE Actor_id = ?",
+    "update_director": "UPDATE Director SET First_name = ?, Last_name = ? WHERE Director_id = ?",
+    "update_genre": "UPDATE Genre SET Category = ? WHERE Genre_id = ?",
+    "update_movie": "UPDATE Movie SET Title = ?, Release_year = ? WHERE Movie_id = ?",
+    "update_review": "UPDATE Review SET Rating = ?, Movie_Movie_id = ? WHERE Review_id = ?",
+    "update_user": "UPDATE User SET email = ? WHERE User_id = ?",
+    "delete_acts_in": "DELETE FROM Acts_in WHERE Actor_Actor_id = ? AND Movie_Movie_id = ?",
+    "delete_belongs_to": "DELETE FROM Belongs_to WHERE Genre_Genre_id = ? AND Movie_Movie_id = ?",
+    "delete_directed_by": "DELETE FROM Directed_by WHERE Movie_Movie_id = ? AND Director_Director_id = ?",
+}
+
+def _insert(table_name, *fields):
+    """validate and insert one row"""
+    validate, query, _ = INSERT_SPECS[table_name]
+    values, error = validate(*fields)
+    if error:
+        return False, error
+    return execute_query(query, values)
+
+def insert_actor(actor_id, first_name, last_name):
+    """insert new actor"""
+    return _insert("Actor", actor_id, first_name, last_name)
+
+def insert_director(director_id, first_name, last_name):
+    """insert new director"""
+    return _insert("Director", director_id, first_name, last_name)
+
+def insert_genre(genre_id, category):
+    """insert new genre"""
+    return _insert("Genre", genre_id, category)
+
+def insert_movie(movie_id, title, release_year):
+    """insert new movie"""
+    return _insert("Movie", movie_id, title, release_year)
+
+def insert_review(review_id, rating, movie_id):
+    """insert new review"""
+    return _insert("Review", review_id, rating, movie_id)
+
+def insert_user(user_id, email, review_id):
+    """insert new user"""
+    return _insert("User", user_id, email, review_id)
+
+def insert_acts_in(actor_id, movie_id):
+    """insert actor-movie relationship"""
+    return _insert("Acts_in", actor_id, movie_id)
+
+def insert_belongs_to(genre_id, movie_id):
+    """insert genre-movie relationship"""
+    return _insert("Belongs_to", genre_id, movie_id)
+
+def insert_directed_by(movie_id, director_id):
+    """insert director-movie relationship"""
+    return _insert("Directed_by", movie_id, director_id)
 
-def search_movies_by_title(title):
+def _succeeded(result):
+    """raise ValueError for a failed (False, error) result so transaction() rolls back"""
+    if isinstance(result, tuple) and result and result[0] is False:
+        raise ValueError(result[1])
+
+def add_movie_with_credits(movie_id, title, release_year, genre_ids=(), actor_ids=(), director_ids=()):
+    """insert a movie with its genres, cast and directors as one unit - all or nothing"""
+    credits = {}
+    for table_name, ids in [("Genre", genre_ids), ("Actor", actor_ids), ("Director", director_ids)]:
+        credits[table_name] = []
+        for entity_id in ids:
+            entity_id, error = _validate_id(entity_id, f"{table_name} ID")
+            if error:
+                return False, error
+            credits[table_name].append(entity_id)
+        credits[table_name] = list(dict.fromkeys(credits[table_name]))
+    try:
+        with transaction():
+            _succeeded(insert_movie(movie_id, title, release_year))
+            for table_name, ids in credits.items():
+                found = fetch_by_ids(table_name, ids)
+                missing = [i for i in ids if i not in found]
+                if missing:
+                    raise ValueError(f"{table_name} ID {missing[0]} does not exist")
+            movie_id = int(movie_id)
+            for genre_id in credits["Genre"]:
+                _succeeded(insert_belongs_to(genre_id, movie_id))
+            for actor_id in credits["Actor"]:
+                _succeeded(insert_acts_in(actor_id, movie_id))
+            for director_id in credits["Director"]:
+                _succeeded(insert_directed_by(movie_id, director_id))
+    except ValueError as e:
+        return False, str(e)
+    except sqlite3.Error as e:
+        return _error_result(e)
+    return True, None
+
+# Rows per executemany batch (and per transaction) in bulk_insert
+BULK_BATCH_SIZE = 10000
+
+def _insert_batch(conn, query, batch):
+    """insert one validated batch in its own transaction.
+
+    executemany stops at the first constraint violation, so on failure the
+    batch is rolled back and replayed row by row to isolate the bad rows.
+    Returns (inserted, [(index, error), ...]).
+    """
+    _note_write(conn, query)
+    try:
+        with _atomic(conn):
+            conn.executemany(query, [values for _, values in batch])
+        _flush_writes(conn)
+        return len(batch), []
+    except sqlite3.IntegrityError:
+        pass
+
+    failures = []
+    with _atomic(conn):
+        for index, values in batch:
+            try:
+                conn.execute(query, values)
+            except sqlite3.IntegrityError as e:
+                failures.append((index, str(e)))
+    _flush_writes(conn)
+    return len(batch) - len(failures), failures
+
+def bulk_insert(table_name, rows, batch_size=BULK_BATCH_SIZE):
+    """insert many rows with executemany, one transaction per batch.
+
+    rows is any iterable of sequences (in the same order as the matching
+    insert_* arguments) or dicts keyed by column name. Every row goes
+    through the same validation as the single-row insert; rows that fail
+    validation or a constraint are reported and skipped, the rest of the
+    batch is kept. Returns (inserted_count, [(row_index, error), ...]).
+    """
+    if table_name not in INSERT_SPECS:
+        return 0, [(None, f"Bulk insert is not supported for table: {table_name}")]
+    validate, query, columns = INSERT_SPECS[table_name]
+    batch_size = max(1, int(batch_size))
+
+    inserted = 0
+    failures = []
+    batch = []
+    try:
+        with get_connection() as conn:
+            for index, row in enumerate(rows):
+                try:
+                    fields = [row[c] for c in columns] if isinstance(row, dict) else list(row)
+                    values, error = validate(*fields)
+                except (KeyError, TypeError, AttributeError) as e:
+                    values, error = None, f"Malformed row: {e}"
+                if error:
+                    failures.append((index, error))
+                    continue
+                batch.append((index, values))
+                if len(batch) >= batch_size:
+                    count, batch_failures = _insert_batch(conn, query, batch)
+                    inserted += count
+                    failures.extend(batch_failures)
+                    batch = []
+            if batch:
+                count, batch_failures = _insert_batch(conn, query, batch)
+                inserted += count
+                failures.extend(batch_failures)
+    except sqlite3.Error as e:
+        # batches committed before the error are kept
+        print(f"Database error: {e}")
+        failures.append((None, str(e)))
+    return inserted, failures
+
+def bulk_insert_actors(rows, batch_size=BULK_BATCH_SIZE):
+    """bulk insert actors, see bulk_insert"""
+    return bulk_insert("Actor", rows, batch_size)
+
+def bulk_insert_directors(rows, batch_size=BULK_BATCH_SIZE):
+    """bulk insert directors, see bulk_insert"""
+    return bulk_insert("Director", rows, batch_size)
+
+def bulk_insert_genres(rows, batch_size=BULK_BATCH_SIZE):
+    """bulk insert genres, see bulk_insert"""
+    return bulk_insert("Genre", rows, batch_size)
+
+def bulk_insert_movies(rows, batch_size=BULK_BATCH_SIZE):
+    """bulk insert movies, see bulk_insert"""
+    return bulk_insert("Movie", rows, batch_size)
+
+def bulk_insert_reviews(rows, batch_size=BULK_BATCH_SIZE):
+    """bulk insert reviews, see bulk_insert"""
+    return bulk_insert("Review", rows, batch_size)
+
+def bulk_insert_users(rows, batch_size=BULK_BATCH_SIZE):
+    """bulk insert users, see bulk_insert"""
+    return bulk_insert("User", rows, batch_size)
+
+# Typeahead lookups - (FROM clause, key column, label expression, prefix
+# columns). Every prefix column has a NOCASE index, so a prefix becomes an
+# index range scan that stops after LOOKUP_LIMIT rows.
+LOOKUP_SPECS = {
+    "Actor": ("Actor", "Actor_id", "First_name || ' ' || Last_name", ["First_name", "Last_name"]),
+    "Director": ("Director", "Director_id", "First_name || ' ' || Last_name", ["First_name", "Last_name"]),
+    "Genre": ("Genre", "Genre_id", "Category", ["Category"]),
+    "Movie": ("Movie", "Movie_id", "Title || COALESCE(' (' || Release_year || ')', '')", ["Title"]),
+    "Review": ("Review LEFT JOIN Movie ON Movie.Movie_id = Review.Movie_Movie_id", "Review_id",
+               "COALESCE(Movie.Title, 'Movie ' || Review.Movie_Movie_id) || ' - Rating: ' || Review.Rating",
+               ["Movie.Title"]),
+    "User": ("User", "User_id", "User_id || COALESCE(' - ' || email, '')", ["User_id"]),
+}
+LOOKUP_LIMIT = 20
+LOOKUP_CACHE_SIZE = 256
+
+_lookup_cache = OrderedDict()
+
+def _prefix_range(column):
+    """index-friendly "column starts with ?" (case-insensitive), takes the prefix and prefix + U+10FFFF"""
+    return f"{column} >= ? COLLATE NOCASE AND {column} < ? COLLATE NOCASE"
+
+def _lookup_branches(table_name, text):
+    """(WHERE clause, params, ORDER BY) per way the text can match, each one index range"""
+    source, key, label, columns = LOOKUP_SPECS[table_name]
+    if not text:
+        return [("1", [], f"{table_name}.{key}")]
+    branches = []
+    if text.isdigit() and table_name != "User":
+        branches.append((f"{table_name}.{key} = ?", [int(text)], f"{table_name}.{key}"))
+    for column in columns:
+        branches.append((_prefix_range(column), [text, text + "\U0010ffff"], f"{column} COLLATE NOCASE"))
+    # "first last" - exact first name, then a prefix of the last name (idx_*_name)
+    first, _, rest = text.partition(" ")
+    if len(columns) == 2 and rest.strip():
+        branches.append((f"{columns[0]} = ? COLLATE NOCASE AND {_prefix_range(columns[1])}",
+                         [first, rest.strip(), rest.strip() + "\U0010ffff"], f"{columns[1]} COLLATE NOCASE"))
+    return branches
+
+def _run_lookup(table_name, text, limit):
+    source, key, label, columns = LOOKUP_SPECS[table_name]
+    selects = []
+    params = []
+    for where, branch_params, order_by in _lookup_branches(table_name, text):
+        selects.append(f"""SELECT * FROM (
+            SELECT {table_name}.*, {label} AS Label FROM {source}
+            WHERE {where} ORDER BY {order_by} LIMIT ?)""")
+        params += branch_params + [limit]
+    query = " UNION ".join(selects) + " ORDER BY Label COLLATE NOCASE LIMIT ?"
+    return execute_query(query, params + [limit])
+
+def lookup_entities(table_name, text="", limit=LOOKUP_LIMIT):
+    """rows of a table whose name (or ID) starts with text, for typeahead pickers.
+
+    At most limit rows, each with the table's columns plus a display Label.
+    Results are cached until the table is written to.
+    """
+    if table_name not in LOOKUP_SPECS:
+        raise ValueError(f"Lookup is not supported for table: {table_name}")
+    text = " ".join(str(text or "").split())
+    if _current_transaction() is not None:
+        rows = _run_lookup(table_name, text, limit)
+        return rows if isinstance(rows, list) else []
+    source_tables = ["Review", "Movie"] if table_name == "Review" else [table_name]
+    cache_key = (table_name, text.lower(), limit) + _tables_key(source_tables)
+    hit, rows = _cache_get(_lookup_cache, cache_key, READ_CACHE_TTL)
+    if hit:
+        return list(rows)
+
+    rows = _run_lookup(table_name, text, limit)
+    if not isinstance(rows, list):
+        return []
+    _cache_put(_lookup_cache, cache_key, rows, LOOKUP_CACHE_SIZE)
+    return list(rows)
+
+# Point lookups by primary key - single rows and batches, read through a
+# cache that is dropped whenever the table is written to
+ENTITY_KEYS = {
+    "Actor": "Actor_id",
+    "Director": "Director_id",
+    "Genre": "Genre_id",
+    "Movie": "Movie_id",
+    "Review": "Review_id",
+    "User": "User_id",
+}
+FETCH_CACHE_SIZE = 2048
+FETCH_BATCH_SIZE = 512  # IDs per IN (...), well under SQLite's variable limit
+
+_fetch_cache = OrderedDict()
+
+def _padded_ids(chunk):
+    """chunk padded to a power-of-two length by repeating its last ID, so the
+    IN (...) lists come in a handful of lengths that stay in the statement cache"""
+    size = 1 << (len(chunk) - 1).bit_length()
+    return chunk + chunk[-1:] * (size - len(chunk))
+
+def _stored_id(table_name, entity_id):
+    """entity_id as it is stored - a positive int for integer keys, which may be
+    given as strings (form input); None when it cannot be a valid ID"""
+    if table_name == "User":
+        return entity_id.strip() if isinstance(entity_id, str) else entity_id
+    entity_id, error = _validate_id(entity_id, f"{table_name} ID")
+    return None if error else entity_id
+
+def fetch_by_ids(table_name, ids):
+    """rows of a table by primary key, {id: row} for the IDs that exist.
+    Integer IDs given as strings are looked up (and keyed) as ints."""
+    if table_name not in ENTITY_KEYS:
+        raise ValueError(f"Fetch by ID is not supported for table: {table_name}")
+    key = ENTITY_KEYS[table_name]
+    ids = [_stored_id(table_name, entity_id) for entity_id in ids]
+    # inside a transaction() rows may be uncommitted, so the cache is skipped
+    stamp = _tables_key([table_name]) if _current_transaction() is None else None
+    found = {}
+    missing = []
+    for entity_id in dict.fromkeys(i for i in ids if i is not None):
+        hit, row = _cache_get(_fetch_cache, (table_name, entity_id) + stamp, READ_CACHE_TTL) if stamp else (False, None)
+        if not hit:
+            missing.append(entity_id)
+        elif row is not None:
+            found[entity_id] = row
+
+    for start in range(0, len(missing), FETCH_BATCH_SIZE):
+        chunk = missing[start:start + FETCH_BATCH_SIZE]
+        padded = _padded_ids(chunk)
+        marks = ", ".join("?" for _ in padded)
+        rows = execute_query(f"SELECT * FROM {table_name} WHERE {key} IN ({marks})", padded)
+        if not isinstance(rows, list):
+            continue  # not cached, the next call retries
+        by_id = {row[key]: row for row in rows}
+        for entity_id in chunk:
+            # misses are cached too, so a bad ID is not looked up on every rerun
+            row = by_id.get(entity_id)
+            if stamp:
+                _cache_put(_fetch_cache, (table_name, entity_id) + stamp, row, FETCH_CACHE_SIZE)
+            if row is not None:
+                found[entity_id] = row
+    return found
+
+def fetch_by_id(table_name, entity_id):
+    """one row of a table by primary key, or None"""
+    return fetch_by_ids(table_name, [entity_id]).get(_stored_id(table_name, entity_id))
+
+def fetch_actor(actor_id):
+    """actor by ID, or None"""
+    return fetch_by_id("Actor", actor_id)
+
+def fetch_director(director_id):
+    """director by ID, or None"""
+    return fetch_by_id("Director", director_id)
+
+def fetch_genre(genre_id):
+    """genre by ID, or None"""
+    return fetch_by_id("Genre", genre_id)
+
+def fetch_movie(movie_id):
+    """movie by ID, or None"""
+    return fetch_by_id("Movie", movie_id)
+
+def fetch_review(review_id):
+    """review by ID, or None"""
+    return fetch_by_id("Review", review_id)
+
+def fetch_user(user_id):
+    """user by ID, or None"""
+    return fetch_by_id("User", user_id)
+
+def fetch_actors(actor_ids):
+    """actors by ID, {id: row}"""
+    return fetch_by_ids("Actor", actor_ids)
+
+def fetch_directors(director_ids):
+    """directors by ID, {id: row}"""
+    return fetch_by_ids("Director", director_ids)
+
+def fetch_genres(genre_ids):
+    """genres by ID, {id: row}"""
+    return fetch_by_ids("Genre", genre_ids)
+
+def fetch_movies(movie_ids):
+    """movies by ID, {id: row}"""
+    return fetch_by_ids("Movie", movie_ids)
+
+def fetch_reviews(review_ids):
+    """reviews by ID, {id: row}"""
+    return fetch_by_ids("Review", review_ids)
+
+def fetch_users(user_ids):
+    """users by ID, {id: row}"""
+    return fetch_by_ids("User", user_ids)
+
+@cached_read("Movie")
+def search_movies_by_title(title, columnar=False):
     """search movies by title"""
-    query = "SELECT * FROM Movie WHERE Title LIKE ?"
-    return execute_query(query, (f"%{title}%",))
+    query = QUERIES["movies_by_title"]
+    return _select(query, (f"%{title}%",), columnar)
 
-def search_movies_by_year(year):
+@cached_read("Movie")
+def search_movies_by_year(year, columnar=False):
     """search movies by release year"""
-    query = "SELECT * FROM Movie WHERE Release_year = ?"
-    return execute_query(query, (year,))
+    query = QUERIES["movies_by_year"]
+    return _select(query, (year,), columnar)
 
-def search_movies_by_actor(actor_name):
+@cached_read("Movie", "Acts_in", "Actor")
+def search_movies_by_actor(actor_name, columnar=False):
     """search movies by actor name"""
-    query = """
-    SELECT m.* FROM Movie m
-    JOIN Acts_in ai ON m.Movie_id = ai.Movie_Movie_id
-    JOIN Actor a ON ai.Actor_Actor_id = a.Actor_id
-    WHERE (a.First_name || ' ' || a.Last_name) LIKE ?
-    """
-    return execute_query(query, (f"%{actor_name}%",))
+    query = QUERIES["movies_by_actor"]
+    return _select(query, (f"%{actor_name}%",), columnar)
 
-def search_movies_by_genre(genre):
+@cached_read("Movie", "Belongs_to", "Genre")
+def search_movies_by_genre(genre, columnar=False):
     """search movies by genre"""
-    query = """
-    SELECT m.* FROM Movie m
-    JOIN Belongs_to bt ON m.Movie_id = bt.Movie_Movie_id
-    JOIN Genre g ON bt.Genre_Genre_id = g.Genre_id
-    WHERE g.Category LIKE ?
+    query = QUERIES["movies_by_genre"]
+    return _select(query, (f"%{genre}%",), columnar)
+
+@cached_read("Movie", "Directed_by", "Director")
+def search_movies_by_director(director_name, columnar=False):
+    """search movies by director name"""
+    query = QUERIES["movies_by_director"]
+    return _select(query, (f"%{director_name}%",), columnar)
+
+def fulltext_search_available():
+    """true when the FTS5 search index exists in the current database"""
+    with get_connection():
+        pass  # makes sure migrations have run for DB_PATH
+    return _fts_enabled
+
+def _fts_match_expression(text):
+    """turn user input into an FTS5 query: every word must match as a prefix"""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+def _fulltext_movies(fts_table, join_sql, text, limit, columnar=False):
+    """movies linked to the best bm25 matches in fts_table, best first"""
+    match = _fts_match_expression(text)
+    if not match:
+        return {} if columnar else []
+    query = f"""
+    WITH hits AS (
+        SELECT rowid AS hit_id, bm25({fts_table}) AS score FROM {fts_table}
+        WHERE {fts_table} MATCH ? ORDER BY score LIMIT ?
+    )
+    SELECT m.* FROM hits
+    {join_sql}
+    GROUP BY m.Movie_id
+    ORDER BY MIN(hits.score), m.Title
+    LIMIT ?
     """
-    return execute_query(query, (f"%{genre}%",))
+    return _select(query, (match, limit, limit), columnar)
 
-def delete_actor(actor_id):
-    """delete actor by id"""
-    # Validate input
-    try:
-        actor_id = int(actor_id)
-        if actor_id <= 0:
-            return False, "Actor ID must be a positive integer"
-    except ValueError:
-        return False, "Actor ID must be a valid integer"
+@cached_read("Movie")
+def search_movies_fulltext(title, limit=100, columnar=False):
+    """ranked prefix search on movie titles, falls back to LIKE without FTS5"""
+    if not fulltext_search_available():
+        return search_movies_by_title(title, columnar)
+    return _fulltext_movies("Movie_fts", "JOIN Movie m ON m.Movie_id = hits.hit_id", title, limit, columnar)
 
-    # First delete related records from junction tables
-    query1 = "DELETE FROM Acts_in WHERE Actor_Actor_id = ?"
-    execute_query(query1, (actor_id,))
-    # Then delete the actor
-    query2 = "DELETE FROM Actor WHERE Actor_id = ?"
-    return execute_query(query2, (actor_id,))
+@cached_read("Movie", "Acts_in", "Actor")
+def search_movies_by_actor_fulltext(actor_name, limit=100, columnar=False):
+    """ranked prefix search on actor names, falls back to LIKE without FTS5"""
+    if not fulltext_search_available():
+        return search_movies_by_actor(actor_name, columnar)
+    join_sql = """
+    JOIN Acts_in ai ON ai.Actor_Actor_id = hits.hit_id
+    JOIN Movie m ON m.Movie_id = ai.Movie_Movie_id
+    """
+    return _fulltext_movies("Actor_fts", join_sql, actor_name, limit, columnar)
 
-def delete_director(director_id):
-    """delete director by id"""
-    # Validate input
-    try:
-        director_id = int(director_id)
-        if director_id <= 0:
-            return False, "Director ID must be a positive integer"
-    except ValueError:
-        return False, "Director ID must be a valid integer"
+@cached_read("Movie", "Directed_by", "Director")
+def search_movies_by_director_fulltext(director_name, limit=100, columnar=False):
+    """ranked prefix search on director names, falls back to LIKE without FTS5"""
+    if not fulltext_search_available():
+        return search_movies_by_director(director_name, columnar)
+    join_sql = """
+    JOIN Directed_by db ON db.Director_Director_id = hits.hit_id
+    JOIN Movie m ON m.Movie_id = db.Movie_Movie_id
+    """
+    return _fulltext_movies("Director_fts", join_sql, director_name, limit, columnar)
 
-    # First delete related records from junction tables
-    query1 = "DELETE FROM Directed_by WHERE Director_Director_id = ?"
-    execute_query(query1, (director_id,))
-    # Then delete the director
-    query2 = "DELETE FROM Director WHERE Director_id = ?"
-    return execute_query(query2, (director_id,))
+@cached_read("Movie", "Belongs_to", "Genre")
+def search_movies_by_genre_fulltext(genre, limit=100, columnar=False):
+    """ranked prefix search on genre categories, falls back to LIKE without FTS5"""
+    if not fulltext_search_available():
+        return search_movies_by_genre(genre, columnar)
+    join_sql = """
+    JOIN Belongs_to bt ON bt.Genre_Genre_id = hits.hit_id
+    JOIN Movie m ON m.Movie_id = bt.Movie_Movie_id
+    """
+    return _fulltext_movies("Genre_fts", join_sql, genre, limit, columnar)
 
-def delete_genre(genre_id):
-    """delete genre by id"""
-    # Validate input
-    try:
-        genre_id = int(genre_id)
-        if genre_id <= 0:
-            return False, "Genre ID must be a positive integer"
-    except ValueError:
-        return False, "Genre ID must be a valid integer"
+# Cascade deletes - rows referencing the deleted rows, removed in this order
+# before the rows themselves, all in one transaction. {ids} is a subquery
+# over the IDs being deleted.
+DELETE_CASCADES = {
+    "Actor": ["DELETE FROM Acts_in WHERE Actor_Actor_id IN ({ids})"],
+    "Director": ["DELETE FROM Directed_by WHERE Director_Director_id IN ({ids})"],
+    "Genre": ["DELETE FROM Belongs_to WHERE Genre_Genre_id IN ({ids})"],
+    "Movie": [
+        "DELETE FROM Acts_in WHERE Movie_Movie_id IN ({ids})",
+        "DELETE FROM Belongs_to WHERE Movie_Movie_id IN ({ids})",
+        "DELETE FROM Directed_by WHERE Movie_Movie_id IN ({ids})",
+        # users point at reviews, so they go with the movie's reviews (as in delete_review)
+        "DELETE FROM User WHERE Review_Review_id IN (SELECT Review_id FROM Review WHERE Movie_Movie_id IN ({ids}))",
+        "DELETE FROM Review WHERE Movie_Movie_id IN ({ids})",
+    ],
+    "Review": ["DELETE FROM User WHERE Review_Review_id IN ({ids})"],
+}
+DELETE_BATCH_SIZE = 10000
 
-    # First delete related records from junction tables
-    query1 = "DELETE FROM Belongs_to WHERE Genre_Genre_id = ?"
-    execute_query(query1, (genre_id,))
-    # Then delete the genre
-    query2 = "DELETE FROM Genre WHERE Genre_id = ?"
-    return execute_query(query2, (genre_id,))
+def _cascade_delete_batch(table_name, ids):
+    """delete one batch of rows and everything referencing them in one transaction"""
+    key = ENTITY_KEYS[table_name]
+    with get_connection() as conn, _atomic(conn):
+        if len(ids) == 1:
+            id_source, params = "?", ids
+        else:
+            # a batch is joined through a temp table, one index probe per ID
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS cascade_ids (id INTEGER PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO temp.cascade_ids VALUES (?)", [(i,) for i in ids])
+            id_source, params = "SELECT id FROM temp.cascade_ids", ()
+        for query in DELETE_CASCADES[table_name] + [f"DELETE FROM {table_name} WHERE {key} IN ({{ids}})"]:
+            _note_write(conn, query)
+            cursor = conn.execute(query.format(ids=id_source), params)
+        if not params:
+            conn.execute("DELETE FROM temp.cascade_ids")  # empty for the next batch on this connection
+        return cursor.rowcount
 
-def delete_movie(movie_id):
-    """delete movie by id"""
-    # Validate input
+def bulk_delete(table_name, ids, batch_size=DELETE_BATCH_SIZE):
+    """delete many rows by ID together with the rows referencing them.
+
+    Each batch (rows plus their links, reviews and users) is one
+    transaction, so a failure never leaves half-deleted rows behind.
+    Returns (deleted, None) or (deleted so far, error).
+    """
+    if table_name not in DELETE_CASCADES:
+        raise ValueError(f"Bulk delete is not supported for table: {table_name}")
+    ids = list(ids)
+    deleted = 0
     try:
-        movie_id = int(movie_id)
-        if movie_id <= 0:
-            return False, "Movie ID must be a positive integer"
-    except ValueError:
-        return False, "Movie ID must be a valid integer"
-
-    # First delete related records from junction tables
-    query1 = "DELETE FROM Acts_in WHERE Movie_Movie_id = ?"
-    execute_query(query1, (movie_id,))
-    query2 = "DELETE FROM Belongs_to WHERE Movie_Movie_id = ?"
-    execute_query(query2, (movie_id,))
-    query3 = "DELETE FROM Directed_by WHERE Movie_Movie_id = ?"
-    execute_query(query3, (movie_id,))
-    query4 = "DELETE FROM Review WHERE Movie_Movie_id = ?"
-    execute_query(query4, (movie_id,))
-    # Then delete the movie
-    query5 = "DELETE FROM Movie WHERE Movie_id = ?"
-    return execute_query(query5, (movie_id,))
+        for start in range(0, len(ids), batch_size):
+            deleted += _with_busy_retry(_cascade_delete_batch, table_name, ids[start:start + batch_size])
+    except Exception as e:
+        return deleted, _error_result(e)[1]
+    return deleted, None
 
-def delete_review(review_id):
-    """delete review by id"""
-    # Validate input
+def _validate_id(value, label):
+    """positive integer ID, returns (id, None) or (None, error)"""
     try:
-        review_id = int(review_id)
-        if review_id <= 0:
-            return False, "Review ID must be a positive integer"
-    except ValueError:
-        return False, "Review ID must be a valid integer"
+        value = int(value)
+        if value <= 0:
+            return None, f"{label} must be a positive integer"
+    except (TypeError, ValueError):
+        return None, f"{label} must be a valid integer"
+    return value, None
+
+def _delete_one(table_name, entity_id, label):
+    entity_id, error = _validate_id(entity_id, label)
+    if error:
+        return False, error
+    deleted, error = bulk_delete(table_name, [entity_id])
+    return (False, error) if error else (True, None)
+
+def delete_actor(actor_id):
+    """delete actor by id, with its movie links"""
+    return _delete_one("Actor", actor_id, "Actor ID")
+
+def delete_director(director_id):
+    """delete director by id, with its movie links"""
+    return _delete_one("Director", director_id, "Director ID")
+
+def delete_genre(genre_id):
+    """delete genre by id, with its movie links"""
+    return _delete_one("Genre", genre_id, "Genre ID")
+
+def delete_movie(movie_id):
+    """delete movie by id, with its links, reviews and the reviews' users"""
+    return _delete_one("Movie", movie_id, "Movie ID")
 
-    # First delete related records from User table
-    query1 = "DELETE FROM User WHERE Review_Review_id = ?"
-    execute_query(query1, (review_id,))
-    # Then delete the review
-    query2 = "DELETE FROM Review WHERE Review_id = ?"
-    return execute_query(query2, (review_id,))
+def delete_movies(movie_ids, batch_size=DELETE_BATCH_SIZE):
+    """delete many movies with their links, reviews and users, see bulk_delete"""
+    ids = []
+    for movie_id in movie_ids:
+        movie_id, error = _validate_id(movie_id, "Movie ID")
+        if error:
+            return 0, error
+        ids.append(movie_id)
+    return bulk_delete("Movie", ids, batch_size)
+
+def delete_review(review_id):
+    """delete review by id, with its users"""
+    return _delete_one("Review", review_id, "Review ID")
 
 def delete_user(user_id):
     """delete user by id"""
@@ -333,7 +1611,7 @@ def delete_acts_in(actor_id, movie_id):
     except ValueError:
         return False, "Actor ID and Movie ID must be valid integers"
 
-    query = "DELETE FROM Acts_in WHERE Actor_Actor_id = ? AND Movie_Movie_id = ?"
+    query = QUERIES["delete_acts_in"]
     return execute_query(query, (actor_id, movie_id))
 
 def delete_belongs_to(genre_id, movie_id):
@@ -347,7 +1625,7 @@ def delete_belongs_to(genre_id, movie_id):
     except ValueError:
         return False, "Genre ID and Movie ID must be valid integers"
 
-    query = "DELETE FROM Belongs_to WHERE Genre_Genre_id = ? AND Movie_Movie_id = ?"
+    query = QUERIES["delete_belongs_to"]
     return execute_query(query, (genre_id, movie_id))
 
 def delete_directed_by(movie_id, director_id):
@@ -361,7 +1639,7 @@ def delete_directed_by(movie_id, director_id):
     except ValueError:
         return False, "Movie ID and Director ID must be valid integers"
 
-    query = "DELETE FROM Directed_by WHERE Movie_Movie_id = ? AND Director_Director_id = ?"
+    query = QUERIES["delete_directed_by"]
     return execute_query(query, (movie_id, director_id))
 
 def update_actor(actor_id, first_name, last_name):
@@ -378,7 +1656,7 @@ def update_actor(actor_id, first_name, last_name):
     except ValueError:
         return False, "Actor ID must be a valid integer"
 
-    query = "UPDATE Actor SET First_name = ?, Last_name = ? WHERE Actor_id = ?"
+    query = QUERIES["update_actor"]
     result = execute_query(query, (first_name.strip(), last_name.strip(), actor_id))
     return result
 
@@ -396,7 +1674,7 @@ def update_director(director_id, first_name, last_name):
     except ValueError:
         return False, "Director ID must be a valid integer"
 
-    query = "UPDATE Director SET First_name = ?, Last_name = ? WHERE Director_id = ?"
+    query = QUERIES["update_director"]
     result = execute_query(query, (first_name.strip(), last_name.strip(), director_id))
     return result
 
@@ -414,7 +1692,7 @@ def update_genre(genre_id, category):
     except ValueError:
         return False, "Genre ID must be a valid integer"
 
-    query = "UPDATE Genre SET Category = ? WHERE Genre_id = ?"
+    query = QUERIES["update_genre"]
     result = execute_query(query, (category.strip(), genre_id))
     return result
 
@@ -435,7 +1713,7 @@ def update_movie(movie_id, title, release_year):
     except ValueError:
         return False, "Movie ID and Release Year must be valid integers"
 
-    query = "UPDATE Movie SET Title = ?, Release_year = ? WHERE Movie_id = ?"
+    query = QUERIES["update_movie"]
     result = execute_query(query, (title.strip(), release_year, movie_id))
     return result
 
@@ -455,7 +1733,7 @@ def update_review(review_id, rating, movie_id):
     except ValueError:
         return False, "Review ID, Rating, and Movie ID must be valid integers"
 
-    query = "UPDATE Review SET Rating = ?, Movie_Movie_id = ? WHERE Review_id = ?"
+    query = QUERIES["update_review"]
     result = execute_query(query, (rating, movie_id, review_id))
     return result
 
@@ -471,31 +1749,375 @@ def update_user(user_id, email):
     if '@' not in email or '.' not in email:
         return False, "Email must be in valid format (contain @ and .)"
 
-    query = "UPDATE User SET email = ? WHERE User_id = ?"
+    query = QUERIES["update_user"]
     result = execute_query(query, (email.strip(), user_id.strip()))
     return result
 
-def execute_custom_query(sql_query):
-    """execute custom sql query and return dataframe"""
-    # basic validation - reject dangerous keywords
-    dangerous_keywords = ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'CREATE', 'TRUNCATE']
-    query_upper = sql_query.strip().upper()
+# Custom query sandbox - limits for the queries typed into the SQL Query Tool.
+# They run on read-only connections; None turns a limit off.
+CUSTOM_QUERY_TIMEOUT = 10.0           # seconds of wall-clock time
+CUSTOM_QUERY_MAX_ROWS = 10_000        # rows returned, anything past this is reported as truncated
+CUSTOM_QUERY_MAX_STEPS = 200_000_000  # SQLite virtual machine instructions
+CUSTOM_QUERY_MAX_LENGTH = 10_000_000  # bytes in one string, blob or row (SQLITE_LIMIT_LENGTH)
+PROGRESS_INTERVAL = 10_000            # VM instructions between two limit checks
+
+# connection settings for sandboxed queries: sorts and temp b-trees spill to
+# disk instead of growing in memory
+READONLY_PRAGMAS = {
+    "busy_timeout": 5000,
+    "cache_size": -16000,
+    "temp_store": "FILE",
+}
 
-    # allow only SELECT queries for safety
-    if not query_upper.startswith('SELECT'):
-        return None, "Only SELECT queries are allowed for security reasons"
+def _open_readonly_connection():
+    """connection that cannot write to the database (mode=ro URI)"""
+    uri = f"{Path(DB_PATH).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    for pragma, value in READONLY_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    # a single value (randomblob(1e9), a huge group_concat) is bounded too
+    conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, CUSTOM_QUERY_MAX_LENGTH)
+    return conn
 
-    # check for dangerous keywords
-    for keyword in dangerous_keywords:
-        if keyword in query_upper:
-            return None, f"Query contains forbidden keyword: {keyword}"
+# authorizer actions a custom query may perform; everything else (writes,
+# schema changes, ATTACH, transactions) is refused while the statement is prepared
+READ_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+_ACTION_NAMES = {getattr(sqlite3, f"SQLITE_{name}"): name.replace("_", " ") for name in (
+    "INSERT", "UPDATE", "DELETE", "CREATE_TABLE", "CREATE_INDEX", "CREATE_VIEW", "CREATE_TRIGGER",
+    "CREATE_TEMP_TABLE", "CREATE_TEMP_INDEX", "CREATE_TEMP_VIEW", "CREATE_TEMP_TRIGGER", "CREATE_VTABLE",
+    "DROP_TABLE", "DROP_INDEX", "DROP_VIEW", "DROP_TRIGGER", "DROP_TEMP_TABLE", "DROP_TEMP_INDEX",
+    "DROP_TEMP_VIEW", "DROP_TEMP_TRIGGER", "DROP_VTABLE", "ALTER_TABLE", "ATTACH", "DETACH", "ANALYZE",
+    "PRAGMA", "REINDEX", "TRANSACTION", "SAVEPOINT",
+)}
+
+# pragmas that only report, allowed as table-valued functions (pragma_table_info(...));
+# FTS5 reads data_version itself when a full-text table is queried
+READ_PRAGMAS = {"table_info", "table_xinfo", "index_list", "index_info", "index_xinfo",
+                "foreign_key_list", "data_version"}
+
+def _authorize_read(denied, action, target, *args):
+    """sqlite3 authorizer that only lets reads through, refused actions are noted in denied"""
+    if action in READ_ACTIONS:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_UPDATE and target == "sqlite_master":
+        # checked whenever a virtual table (FTS5, json_each, pragma_*) is
+        # connected; a real write to sqlite_master still fails on mode=ro
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_PRAGMA and target in READ_PRAGMAS:
+        return sqlite3.SQLITE_OK
+    name = _ACTION_NAMES.get(action, "This statement")
+    denied.append(f"{name} on {target}" if target else name)
+    return sqlite3.SQLITE_DENY
+
+@contextmanager
+def _readonly_connection():
+    """borrow a pooled read-only connection that only authorizes reads"""
+    if _pool_path != DB_PATH:
+        with get_connection():
+            pass  # makes sure migrations have run for DB_PATH before opening it read-only
+    try:
+        conn = _readonly_pool.get_nowait()
+    except queue.Empty:
+        conn = _open_readonly_connection()
+    denied = []
+    conn.set_authorizer(functools.partial(_authorize_read, denied))
+    try:
+        yield conn
+    except sqlite3.DatabaseError as e:
+        if denied:
+            raise sqlite3.DatabaseError(f"{denied[0]} is not allowed, only read-only queries can run here") from e
+        raise
+    finally:
+        conn.set_authorizer(None)
+        conn.set_progress_handler(None, 0)
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            if _pool_path != DB_PATH:
+                raise queue.Full
+            _readonly_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
 
-    # execute the query
-    results = execute_query(sql_query)
-    if results is None:
-        return None, "Query execution failed"
+# first keyword of a statement, after any whitespace and comments
+_LEADING_KEYWORD = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?(?:\*/|$))*(\w+)", re.DOTALL)
 
-    if not results:
-        return None, "Query returned no results"
+def _split_statements(sql_query):
+    """split SQL text into statements, using SQLite's own tokenizer to find the
+    semicolons that are not inside strings, identifiers or comments"""
+    statements = []
+    current = ""
+    for part in sql_query.split(";"):
+        current += part
+        if sqlite3.complete_statement(current + ";"):
+            statements.append(current)
+            current = ""
+        else:
+            current += ";"
+    if current.strip():
+        statements.append(current)
+    return statements
+
+def _validate_custom_query(sql_query):
+    """error message for a query the SQL Query Tool must not run, else None.
+
+    This only classifies the statement (one SELECT, WITH ... SELECT or
+    VALUES); the read-only connection and its authorizer refuse anything
+    that would write when the statement is prepared.
+    """
+    keywords = []
+    for statement in _split_statements(sql_query):
+        match = _LEADING_KEYWORD.match(statement)
+        if match:
+            keywords.append(match.group(1).upper())
+    if not keywords:
+        return "Please enter a SQL query"
+    if len(keywords) > 1:
+        return "Only one statement can run at a time"
+    if keywords[0] not in ("SELECT", "WITH", "VALUES"):
+        return "Only SELECT queries are allowed for security reasons"
+    return None
+
+@contextmanager
+def _query_limits(conn, timeout, max_steps, info):
+    """interrupt statements on conn running past timeout seconds or max_steps VM steps.
+
+    info["steps"] counts the steps used; a stopped statement raises
+    sqlite3.OperationalError saying which limit it hit.
+    """
+    stopped = []
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def check_limits():
+        # a non-zero return interrupts the statement
+        info["steps"] += PROGRESS_INTERVAL
+        if max_steps is not None and info["steps"] > max_steps:
+            stopped.append(f"Query stopped after {max_steps:,} steps, add filters or a LIMIT")
+        elif deadline is not None and time.monotonic() > deadline:
+            stopped.append(f"Query stopped after {timeout:g} seconds, add filters or a LIMIT")
+        return 1 if stopped else 0
+
+    conn.set_progress_handler(check_limits, PROGRESS_INTERVAL)
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if stopped:
+            raise sqlite3.OperationalError(stopped[0]) from e
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+def run_custom_query(sql_query, columnar=False, max_rows=CUSTOM_QUERY_MAX_ROWS,
+                     timeout=CUSTOM_QUERY_TIMEOUT, max_steps=CUSTOM_QUERY_MAX_STEPS):
+    """run a user-typed SELECT read-only, within a time, step and row budget.
+
+    Returns (results, error, info); info holds the rows returned, whether
+    they were truncated at max_rows, the seconds taken and the VM steps
+    used (counted in PROGRESS_INTERVAL increments).
+    """
+    info = {"rows": 0, "truncated": False, "seconds": 0.0, "steps": 0}
+    error = _validate_custom_query(sql_query)
+    if error:
+        return None, error, info
 
-    return results, None
\ No newline at end of file
+    start = time.perf_counter()
+    try:
+        with _readonly_connection() as conn, _query_limits(conn, timeout, max_steps, info):
+            cursor = conn.execute(sql_query)
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            rows = cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows + 1)
+            cursor.close()
+    except sqlite3.Error as e:
+        info["seconds"] = time.perf_counter() - start
+        return None, _error_result(e)[1], info
+    info["seconds"] = time.perf_counter() - start
+
+    if max_rows is not None and len(rows) > max_rows:
+        rows = rows[:max_rows]
+        info["truncated"] = True
+    info["rows"] = len(rows)
+    if not rows:
+        return None, "Query returned no results", info
+
+    if columnar:
+        return _as_arrays(dict(zip(columns, map(list, zip(*rows))))), None, info
+    return [dict(zip(columns, row)) for row in rows], None, info
+
+def stream_custom_query(sql_query, chunk_size=STREAM_ARRAYSIZE, timeout=CUSTOM_QUERY_TIMEOUT,
+                        max_steps=CUSTOM_QUERY_MAX_STEPS):
+    """stream_query for a user-typed SELECT: validated, read-only and time / step limited, no row cap.
+
+    Raises ValueError for a rejected query and sqlite3.OperationalError
+    when a limit stops it.
+    """
+    error = _validate_custom_query(sql_query)
+    if error:
+        raise ValueError(error)
+    info = {"steps": 0}
+    with _readonly_connection() as conn, _query_limits(conn, timeout, max_steps, info):
+        cursor = conn.cursor()
+        cursor.arraysize = chunk_size
+        cursor.execute(sql_query)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        rows = cursor.fetchmany()
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany()
+            if rows:
+                yield columns, rows
+
+def explain_custom_query(sql_query):
+    """EXPLAIN QUERY PLAN of a user-typed SELECT: (plan, error).
+
+    plan is a list of {"id", "parent", "detail"} dicts in SQLite's order;
+    parent is the id of the step a row is nested under, 0 at the top.
+    """
+    error = _validate_custom_query(sql_query)
+    if error:
+        return None, error
+    try:
+        with _readonly_connection() as conn:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql_query}").fetchall()
+    except sqlite3.Error as e:
+        return None, _error_result(e)[1]
+    return [{"id": r[0], "parent": r[1], "detail": r[3]} for r in rows], None
+
+def format_query_plan(plan):
+    """plan rows as the tree the sqlite3 shell prints for EXPLAIN QUERY PLAN"""
+    children = {}
+    for row in plan:
+        children.setdefault(row["parent"], []).append(row)
+    lines = ["QUERY PLAN"]
+
+    def add(parent, indent):
+        steps = children.get(parent, [])
+        for i, row in enumerate(steps):
+            last = i == len(steps) - 1
+            lines.append(f"{indent}{'`--' if last else '|--'}{row['detail']}")
+            if row["id"] != parent:
+                add(row["id"], indent + ("   " if last else "|  "))
+
+    add(0, "")
+    return "\n".join(lines)
+
+# plan steps that scan a table with at least this many rows are flagged
+FULL_SCAN_WARNING_ROWS = 10_000
+
+# a full scan reads every row, whether from the table or through an index
+_PLAN_SCAN = re.compile(r"SCAN (?:TABLE )?(\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+_PLAN_AUTOMATIC_INDEX = re.compile(r"SEARCH (\w+) USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \((\w+)=")
+_PLAN_TEMP_BTREE = re.compile(r"USE TEMP B-TREE FOR (.+)$")
+_TABLE_REFERENCE = re.compile(r"(?:\bFROM|\bJOIN|,)\s+[\"`\[]?(\w+)[\"`\]]?(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_COMPARED_COLUMN = re.compile(r"(?:(\w+)\.)?(\w+)\s*(==|=|!=|<>|<=|>=|<|>|\bIN\b|\bLIKE\b|\bGLOB\b|\bBETWEEN\b)",
+                              re.IGNORECASE)
+
+# words that can follow a table name without being its alias
+_CLAUSE_KEYWORDS = {
+    "WHERE", "ON", "USING", "JOIN", "LEFT", "RIGHT", "FULL", "INNER", "OUTER", "CROSS", "NATURAL",
+    "GROUP", "ORDER", "HAVING", "LIMIT", "WINDOW", "UNION", "INTERSECT", "EXCEPT", "INDEXED", "NOT",
+}
+
+def _table_aliases(sql_query, tables):
+    """{name or alias as it appears in a plan: table} for the tables a query reads"""
+    by_lower = {t.lower(): t for t in tables}
+    aliases = {}
+    for name, alias in _TABLE_REFERENCE.findall(sql_query):
+        table = by_lower.get(name.lower())
+        if table:
+            aliases[table.lower()] = table
+            if alias and alias.upper() not in _CLAUSE_KEYWORDS:
+                aliases[alias.lower()] = table
+    return aliases
+
+def _table_indexes(table_name):
+    """index names of table_name and the (column, collation) pairs, lower-cased,
+    that lead one of them; rowid and the primary key count as BINARY indexes"""
+    _, primary_key = get_table_columns(table_name)
+    names = set()
+    leading = {(primary_key[0].lower(), "binary"), ("rowid", "binary")}
+    indexes = execute_query(f"PRAGMA index_list({table_name})")
+    for index in indexes if isinstance(indexes, list) else []:
+        names.add(index['name'].lower())
+        info = execute_query(f"PRAGMA index_xinfo({index['name']})")
+        if isinstance(info, list) and info and info[0]['name']:
+            leading.add((info[0]['name'].lower(), info[0]['coll'].lower()))
+    return names, leading
+
+def _suggest_index(sql_query, table_name, aliases):
+    """CREATE INDEX for the first column of table_name the query filters or joins on
+    that no usable index starts with, else None"""
+    columns = {c.lower(): c for c in get_table_columns(table_name)[0]}
+    names = {a for a, t in aliases.items() if t == table_name}
+    index_names, indexed = _table_indexes(table_name)
+    for qualifier, column, operator in _COMPARED_COLUMN.findall(sql_query):
+        if qualifier and qualifier.lower() not in names or column.lower() not in columns:
+            continue
+        # LIKE is case-insensitive, so only a NOCASE index can serve it;
+        # the other operators compare with the column's BINARY collation
+        collation = "nocase" if operator.upper() == "LIKE" else "binary"
+        if (column.lower(), collation) in indexed:
+            continue
+        column = columns[column.lower()]
+        name = f"idx_{table_name.lower()}_{column.lower()}"
+        if collation == "nocase":
+            name += "_nocase"
+        elif name in index_names:
+            name += "_binary"
+        collate = " COLLATE NOCASE" if collation == "nocase" else ""
+        return f"CREATE INDEX {name} ON {table_name} ({column}{collate});"
+    return None
+
+def query_plan_hints(sql_query, plan):
+    """index-use warnings for a plan from explain_custom_query.
+
+    Returns a list of {"table", "rows", "warning", "suggestion"} dicts: one
+    per full scan of a table with FULL_SCAN_WARNING_ROWS or more rows, with
+    a CREATE INDEX suggestion when a filtered or joined column has no
+    index, one per automatic index SQLite builds on such a table, and one
+    per temporary b-tree sort when the query reads such a table.
+    """
+    tables = get_table_names()
+    aliases = _table_aliases(sql_query, tables)
+    large = any(count_table_rows(t) >= FULL_SCAN_WARNING_ROWS for t in set(aliases.values()))
+    hints = []
+    for row in plan:
+        scan = _PLAN_SCAN.match(row["detail"])
+        if scan and scan.group(1).lower() in aliases:
+            table = aliases[scan.group(1).lower()]
+            rows = count_table_rows(table)
+            if rows >= FULL_SCAN_WARNING_ROWS:
+                hints.append({
+                    "table": table,
+                    "rows": rows,
+                    "warning": f"Full scan of {table}: every one of its {rows:,} rows is read",
+                    "suggestion": _suggest_index(sql_query, table, aliases),
+                })
+        automatic = _PLAN_AUTOMATIC_INDEX.match(row["detail"])
+        if automatic and automatic.group(1).lower() in aliases:
+            table = aliases[automatic.group(1).lower()]
+            column = automatic.group(2)
+            rows = count_table_rows(table)
+            if rows >= FULL_SCAN_WARNING_ROWS:
+                hints.append({
+                    "table": table,
+                    "rows": rows,
+                    "warning": f"SQLite reads all {rows:,} rows of {table} to build a temporary index "
+                               f"on {column} every time this query runs",
+                    "suggestion": f"CREATE INDEX idx_{table.lower()}_{column.lower()} ON {table} ({column});",
+                })
+        sort = _PLAN_TEMP_BTREE.match(row["detail"])
+        if sort and large:
+            hints.append({
+                "table": None,
+                "rows": None,
+                "warning": f"{sort.group(1)} sorts its rows in a temporary b-tree, an index with "
+                           "the same columns and collation would return them in order",
+                "suggestion": None,
+            })
+    return hints
+
+def execute_custom_query(sql_query, columnar=False):
+    """execute custom sql query and return dataframe"""
+    results, error, _ = run_custom_query(sql_query, columnar)
+    return results, error
\ No newline at end of file
@@ -0,0 +1,119 @@
+# asyncio interface to database.py - every call runs on a worker thread
+
+import asyncio
+import functools
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+# one worker per pooled connection, so concurrent calls reuse idle
+# connections instead of opening (and closing) extra ones
+WORKERS = database.POOL_SIZE
+
+# queries only overlap on more than one core; on one, a fan-out is pure overhead
+PARALLEL = (os.cpu_count() or 1) > 1
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="moviedb")
+
+async def run(func, *args, **kwargs):
+    """await func(*args, **kwargs) run on a database worker thread.
+
+    sqlite3 releases the GIL while SQLite works, so calls awaited together
+    (asyncio.gather) overlap. transaction() is per thread: put a unit of
+    work in one function and run that, e.g. run(add_movie_with_credits, ...).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def _offloaded(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+# database.py reads and writes offered here as coroutines with the same
+# arguments and results
+FUNCTIONS = [
+    "execute_query", "query_columns", "query_arrays", "execute_columnar", "query_dataframe",
+    "get_table_data", "get_table_names", "get_table_columns", "get_table_page", "count_table_rows",
+    "get_database_stats", "get_genre_breakdown", "get_year_breakdown", "get_movie_review_stats",
+    "get_most_reviewed_movies", "get_top_actors", "rebuild_summaries", "check_summaries",
+    "insert_actor", "insert_director", "insert_genre", "insert_movie", "insert_review", "insert_user",
+    "insert_acts_in", "insert_belongs_to", "insert_directed_by", "add_movie_with_credits",
+    "bulk_insert", "bulk_insert_actors", "bulk_insert_directors", "bulk_insert_genres",
+    "bulk_insert_movies", "bulk_insert_reviews", "bulk_insert_users",
+    "lookup_entities", "fetch_by_ids", "fetch_by_id", "fetch_actor", "fetch_director", "fetch_genre",
+    "fetch_movie", "fetch_review", "fetch_user", "fetch_actors", "fetch_directors", "fetch_genres",
+    "fetch_movies", "fetch_reviews", "fetch_users",
+    "search_movies_by_title", "search_movies_by_year", "search_movies_by_actor", "search_movies_by_genre",
+    "search_movies_by_director", "fulltext_search_available", "search_movies_fulltext",
+    "search_movies_by_actor_fulltext", "search_movies_by_director_fulltext", "search_movies_by_genre_fulltext",
+    "bulk_delete", "delete_actor", "delete_director", "delete_genre", "delete_movie", "delete_movies",
+    "delete_review", "delete_user", "delete_acts_in", "delete_belongs_to", "delete_directed_by",
+    "update_actor", "update_director", "update_genre", "update_movie", "update_review", "update_user",
+    "run_custom_query", "explain_custom_query", "query_plan_hints", "execute_custom_query",
+]
+
+for _name in FUNCTIONS:
+    globals()[_name] = _offloaded(getattr(database, _name))
+del _name
+
+async def _iterate(generator, batch=1):
+    """async iterator over a database.py generator, batch items taken per worker thread hop"""
+    try:
+        while True:
+            items = await run(lambda: list(itertools.islice(generator, batch)))
+            if not items:
+                return
+            for item in items:
+                yield item
+    finally:
+        await run(generator.close)
+
+def stream_query(query, params=None, chunk_size=database.STREAM_ARRAYSIZE):
+    """async iterator version of database.stream_query"""
+    return _iterate(database.stream_query(query, params, chunk_size))
+
+def iter_query(query, params=None, arraysize=database.STREAM_ARRAYSIZE, as_tuples=False):
+    """async iterator version of database.iter_query"""
+    return _iterate(database.iter_query(query, params, arraysize, as_tuples), arraysize)
+
+def stream_custom_query(sql_query, chunk_size=database.STREAM_ARRAYSIZE,
+                        timeout=database.CUSTOM_QUERY_TIMEOUT, max_steps=database.CUSTOM_QUERY_MAX_STEPS):
+    """async iterator version of database.stream_custom_query"""
+    return _iterate(database.stream_custom_query(sql_query, chunk_size, timeout, max_steps))
+
+def read_concurrently(*calls):
+    """results of independent database.py reads, given as (function, *args) tuples.
+
+    Reads the read cache can answer run directly, and so do the others
+    unless there are two or more of them and PARALLEL is set - only then is
+    the thread hand-off worth it, and they run at once on worker threads.
+    """
+    if not PARALLEL:
+        return [func(*args) for func, *args in calls]
+    results = [None] * len(calls)
+    slow = []
+    for index, (func, *args) in enumerate(calls):
+        if getattr(func, "is_cached", lambda *a: False)(*args):
+            results[index] = func(*args)
+        else:
+            slow.append(index)
+    if len(slow) < 2:
+        for index in slow:
+            func, *args = calls[index]
+            results[index] = func(*args)
+    else:
+        loaded = run_concurrently(*(run(*calls[index]) for index in slow))
+        for index, result in zip(slow, loaded):
+            results[index] = result
+    return results
+
+def run_concurrently(*coroutines):
+    """run coroutines (e.g. get_database_stats(), get_year_breakdown()) at once from
+    synchronous code such as a Streamlit script and return their results in order"""
+    async def gather():
+        return await asyncio.gather(*coroutines)
+    return asyncio.run(gather())
@@ -6,11 +6,272 @@ from pathlib import Path
 # SQLite database path
 DB_PATH = Path(__file__).parent / 'MovieDatabase.db'
 
-def create_sqlite_database():
+# Full-text indexes - (table, key column, indexed columns). Each is an
+# external-content FTS5 table so the text is stored only once.
+FTS_TABLES = [
+    ("Movie", "Movie_id", ["Title"]),
+    ("Actor", "Actor_id", ["First_name", "Last_name"]),
+    ("Director", "Director_id", ["First_name", "Last_name"]),
+    ("Genre", "Genre_id", ["Category"]),
+]
+
+def fts5_available(conn):
+    """Check whether this SQLite build has the FTS5 extension"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def fts_statements(conn):
+    """FTS5 tables plus the triggers that keep them in sync with their base tables"""
+
+    # Builds without FTS5 keep using the LIKE searches in database.py
+    if not fts5_available(conn):
+        return []
+
+    statements = []
+    for table, key, columns in FTS_TABLES:
+        fts = f"{table}_fts"
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{c}" for c in columns)
+        old_values = ", ".join(f"old.{c}" for c in columns)
+        statements += [
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {column_list}, content='{table}', content_rowid='{key}',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {key}, {column_list} ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+            END""",
+            f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+        ]
+    return statements
+
+# Tables whose row counts are kept in Stats_counter
+COUNTED_TABLES = ["Actor", "Director", "Genre", "Movie", "Review", "User", "Acts_in", "Belongs_to", "Directed_by"]
+
+def stats_counter_statements():
+    """Counter table kept exact by triggers, so dashboard counts never scan a table"""
+    statements = [
+        """CREATE TABLE IF NOT EXISTS Stats_counter (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""",
+        # MIN/MAX(Rating) become a single index seek
+        "CREATE INDEX IF NOT EXISTS idx_review_rating ON Review (Rating)",
+        "INSERT OR REPLACE INTO Stats_counter VALUES ('rating_sum', (SELECT COALESCE(SUM(Rating), 0) FROM Review))",
+        """CREATE TRIGGER IF NOT EXISTS Stats_review_rating_au AFTER UPDATE OF Rating ON Review BEGIN
+            UPDATE Stats_counter SET value = value - COALESCE(old.Rating, 0) + COALESCE(new.Rating, 0) WHERE name = 'rating_sum';
+        END""",
+    ]
+    for table in COUNTED_TABLES:
+        rating_insert = rating_delete = ""
+        if table == "Review":
+            rating_insert = "UPDATE Stats_counter SET value = value + COALESCE(new.Rating, 0) WHERE name = 'rating_sum';"
+            rating_delete = "UPDATE Stats_counter SET value = value - COALESCE(old.Rating, 0) WHERE name = 'rating_sum';"
+        statements += [
+            f"INSERT OR REPLACE INTO Stats_counter VALUES ('{table}', (SELECT COUNT(*) FROM {table}))",
+            f"""CREATE TRIGGER IF NOT EXISTS Stats_{table}_ai AFTER INSERT ON {table} BEGIN
+                UPDATE Stats_counter SET value = value + 1 WHERE name = '{table}';
+                {rating_insert}
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS Stats_{table}_ad AFTER DELETE ON {table} BEGIN
+                UPDATE Stats_counter SET value = value - 1 WHERE name = '{table}';
+                {rating_delete}
+            END""",
+        ]
+    return statements
+
+# Materialized summaries - table, key column, value columns and the query that
+# recomputes it from the base table (used by the rebuild and the checker)
+SUMMARY_TABLES = [
+    ("Movie_summary", "Movie_id", ["Review_count", "Rating_sum"],
+     """SELECT Movie_Movie_id, COUNT(*), COALESCE(SUM(Rating), 0) FROM Review
+        WHERE Movie_Movie_id IS NOT NULL GROUP BY Movie_Movie_id"""),
+    ("Actor_summary", "Actor_id", ["Movie_count"],
+     """SELECT Actor_Actor_id, COUNT(*) FROM Acts_in
+        WHERE Actor_Actor_id IS NOT NULL GROUP BY Actor_Actor_id"""),
+    ("Genre_summary", "Genre_id", ["Movie_count"],
+     """SELECT Genre_Genre_id, COUNT(*) FROM Belongs_to
+        WHERE Genre_Genre_id IS NOT NULL GROUP BY Genre_Genre_id"""),
+]
+
+def _summary_delta_sql(table, key, key_value, deltas):
+    """add deltas to a summary row (creating it), then drop it once it counts nothing"""
+    columns = ", ".join(deltas)
+    values = ", ".join(deltas.values())
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in deltas)
+    count_column = next(iter(deltas))
+    return f"""
+        INSERT INTO {table} ({key}, {columns}) VALUES ({key_value}, {values})
+            ON CONFLICT({key}) DO UPDATE SET {updates};
+        DELETE FROM {table} WHERE {key} = {key_value} AND {count_column} <= 0;"""
+
+def summary_statements():
+    """Summary tables plus the triggers that keep them consistent with the base tables"""
+    statements = [
+        """CREATE TABLE IF NOT EXISTS Movie_summary (
+            Movie_id INTEGER PRIMARY KEY,
+            Review_count INTEGER NOT NULL DEFAULT 0,
+            Rating_sum INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS Actor_summary (
+            Actor_id INTEGER PRIMARY KEY,
+            Movie_count INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS Genre_summary (
+            Genre_id INTEGER PRIMARY KEY,
+            Movie_count INTEGER NOT NULL DEFAULT 0
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_movie_summary_reviews ON Movie_summary (Review_count)",
+        "CREATE INDEX IF NOT EXISTS idx_actor_summary_movies ON Actor_summary (Movie_count)",
+    ]
+
+    # (trigger prefix, base table, summary table, key, base column, {summary column: per-row value})
+    linked = [
+        ("Summary_review", "Review", "Movie_summary", "Movie_id", "Movie_Movie_id",
+         {"Review_count": "1", "Rating_sum": "COALESCE({row}.Rating, 0)"}),
+        ("Summary_acts_in", "Acts_in", "Actor_summary", "Actor_id", "Actor_Actor_id", {"Movie_count": "1"}),
+        ("Summary_belongs_to", "Belongs_to", "Genre_summary", "Genre_id", "Genre_Genre_id", {"Movie_count": "1"}),
+    ]
+    for name, base, summary, key, column, values in linked:
+        add_new = _summary_delta_sql(summary, key, f"new.{column}",
+                                     {c: v.format(row="new") for c, v in values.items()})
+        remove_old = _summary_delta_sql(summary, key, f"old.{column}",
+                                        {c: f"-({v.format(row='old')})" for c, v in values.items()})
+        # an UPDATE is handled as removing the old row and adding the new one
+        statements += [
+            f"""CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {base}
+                WHEN new.{column} IS NOT NULL BEGIN {add_new}
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {base}
+                WHEN old.{column} IS NOT NULL BEGIN {remove_old}
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {name}_au_old AFTER UPDATE ON {base}
+                WHEN old.{column} IS NOT NULL BEGIN {remove_old}
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {name}_au_new AFTER UPDATE ON {base}
+                WHEN new.{column} IS NOT NULL BEGIN {add_new}
+            END""",
+        ]
+
+    for table, key, columns, source in SUMMARY_TABLES:
+        statements.append(f"INSERT OR REPLACE INTO {table} ({key}, {', '.join(columns)}) {source}")
+    return statements
+
+def rebuild_summaries(conn):
+    """Recompute every summary table from its base table in one transaction"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table, key, columns, source in SUMMARY_TABLES:
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"INSERT INTO {table} ({key}, {', '.join(columns)}) {source}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def check_summaries(conn):
+    """Rows where each summary table disagrees with its base table, {table: count}"""
+    mismatches = {}
+    for table, key, columns, source in SUMMARY_TABLES:
+        stored = f"SELECT {key}, {', '.join(columns)} FROM {table}"
+        missing = conn.execute(f"SELECT COUNT(*) FROM ({source} EXCEPT {stored})").fetchone()[0]
+        extra = conn.execute(f"SELECT COUNT(*) FROM ({stored} EXCEPT {source})").fetchone()[0]
+        mismatches[table] = missing + extra
+    return mismatches
+
+def change_log_statements():
+    """Per-table write counters any process can poll to invalidate its caches"""
+    statements = [
+        """CREATE TABLE IF NOT EXISTS Change_log (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""",
+    ]
+    for table in COUNTED_TABLES:
+        statements.append(f"INSERT OR IGNORE INTO Change_log VALUES ('{table}', 0)")
+        for event, suffix in (("INSERT", "ai"), ("UPDATE", "au"), ("DELETE", "ad")):
+            statements.append(f"""CREATE TRIGGER IF NOT EXISTS Change_log_{table}_{suffix} AFTER {event} ON {table} BEGIN
+                UPDATE Change_log SET version = version + 1 WHERE name = '{table}';
+            END""")
+    return statements
+
+# Schema migrations - (version, statements) applied in order on top of the
+# base tables; the applied version is tracked in PRAGMA user_version.
+# statements may be a callable taking the connection for conditional steps.
+MIGRATIONS = [
+    # v1: index pack. The junction tables' primary keys only cover lookups
+    # by their leading column, so add the reverse direction, index the
+    # foreign keys and the searched columns (NOCASE so LIKE 'prefix%' can seek)
+    (1, [
+        "CREATE INDEX IF NOT EXISTS idx_acts_in_movie ON Acts_in (Movie_Movie_id, Actor_Actor_id)",
+        "CREATE INDEX IF NOT EXISTS idx_belongs_to_movie ON Belongs_to (Movie_Movie_id, Genre_Genre_id)",
+        "CREATE INDEX IF NOT EXISTS idx_directed_by_director ON Directed_by (Director_Director_id, Movie_Movie_id)",
+        "CREATE INDEX IF NOT EXISTS idx_review_movie ON Review (Movie_Movie_id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_review ON User (Review_Review_id)",
+        "CREATE INDEX IF NOT EXISTS idx_movie_release_year ON Movie (Release_year)",
+        "CREATE INDEX IF NOT EXISTS idx_movie_title ON Movie (Title COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_actor_name ON Actor (First_name COLLATE NOCASE, Last_name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_actor_last_name ON Actor (Last_name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_director_name ON Director (First_name COLLATE NOCASE, Last_name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_director_last_name ON Director (Last_name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_genre_category ON Genre (Category COLLATE NOCASE)",
+    ]),
+    # v2: full-text search over titles, people names and genre categories
+    (2, fts_statements),
+    # v3: trigger-maintained row counts and rating total for the home page
+    (3, stats_counter_statements()),
+    # v4: per-movie review stats, per-actor filmography and per-genre movie counts
+    (4, summary_statements()),
+    # v5: case-insensitive prefix lookups on user names
+    (5, ["CREATE INDEX IF NOT EXISTS idx_user_id_nocase ON User (User_id COLLATE NOCASE)"]),
+    # v6: change log for cross-process cache invalidation
+    (6, change_log_statements()),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def apply_migrations(conn):
+    """Bring an existing database up to SCHEMA_VERSION, returns the version reached"""
+
+    # Nothing to migrate until the base tables exist
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Movie'").fetchone():
+        return 0
+
+    for version, statements in MIGRATIONS:
+        if version <= conn.execute("PRAGMA user_version").fetchone()[0]:
+            continue
+        # Take the write lock first and re-check, another process may have migrated
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version > conn.execute("PRAGMA user_version").fetchone()[0]:
+                if callable(statements):
+                    statements = statements(conn)
+                for sql in statements:
+                    conn.execute(sql)
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def create_sqlite_database(db_path=None, with_sample_data=True):
     """Create SQLite database from MySQL schema"""
 
     # Connect to SQLite database (creates file if it doesn't exist)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path or DB_PATH)
     cursor = conn.cursor()
 
     # Create tables (SQLite syntax - no ENGINE, CHARSET, etc.)
@@ -211,15 +472,36 @@ def create_sqlite_database():
     ]
 
     # Insert all sample data
-    for sql, data_list in sample_data:
-        for data in data_list:
-            cursor.execute(sql, data)
+    if with_sample_data:
+        for sql, data_list in sample_data:
+            cursor.executemany(sql, data_list)
 
-    # Commit and close
+    # Commit, then add indexes and later schema changes
     conn.commit()
+    apply_migrations(conn)
     conn.close()
 
-    print("SQLite database created successfully with sample data!")
+    print("SQLite database created successfully" + (" with sample data!" if with_sample_data else "!"))
 
 if __name__ == "__main__":
-    create_sqlite_database()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create the movie database or maintain its summary tables")
+    parser.add_argument("--db", help="database file (default: MovieDatabase.db)")
+    parser.add_argument("--rebuild-summaries", action="store_true", help="recompute the summary tables")
+    parser.add_argument("--check-summaries", action="store_true",
+                        help="compare the summary tables with the base tables, exit 1 on drift")
+    args = parser.parse_args()
+
+    if args.rebuild_summaries or args.check_summaries:
+        conn = sqlite3.connect(args.db or DB_PATH)
+        apply_migrations(conn)
+        if args.rebuild_summaries:
+            rebuild_summaries(conn)
+            print("Summary tables rebuilt")
+        mismatches = check_summaries(conn)
+        conn.close()
+        for table, count in mismatches.items():
+            print(f"{table:<14} {'ok' if count == 0 else f'{count} rows out of date'}")
+        raise SystemExit(1 if any(mismatches.values()) else 0)
+    create_sqlite_database(args.db)
\ No newline at end of file
@@ -0,0 +1,196 @@
+# streaming table and query export
+
+import argparse
+import csv
+import functools
+import io
+import json
+import sys
+from pathlib import Path
+
+import database
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet export is optional
+    pa = None
+    pq = None
+
+CHUNK_SIZE = 5000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "jsonl": ("application/x-ndjson", ".jsonl"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+def available_formats():
+    """export formats usable with the installed packages"""
+    return [f for f in EXPORT_FORMATS if f != "parquet" or pa is not None]
+
+def table_query(table_name):
+    """SELECT for a whole table, after checking the name against the schema"""
+    if table_name not in database.get_table_names():
+        raise ValueError(f"Unknown table: {table_name}")
+    return f"SELECT * FROM {table_name}"
+
+def write_csv(chunks, binary_file):
+    """write (columns, rows) chunks as CSV, returns the row count"""
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text_file)
+    count = 0
+    for i, (columns, rows) in enumerate(chunks):
+        if i == 0:
+            writer.writerow(columns)
+        writer.writerows(rows)
+        count += len(rows)
+    text_file.flush()
+    text_file.detach()  # leave the caller's file open
+    return count
+
+def write_jsonl(chunks, binary_file):
+    """write (columns, rows) chunks as JSON Lines, returns the row count"""
+    count = 0
+    for columns, rows in chunks:
+        lines = "".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows)
+        binary_file.write(lines.encode("utf-8"))
+        count += len(rows)
+    return count
+
+def _declared_arrow_type(declared):
+    """Arrow type for a declared SQLite column type, by SQLite's affinity rules"""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(name in declared for name in ("CHAR", "CLOB", "TEXT")) or not declared:
+        return pa.string()
+    if "BLOB" in declared:
+        return pa.binary()
+    return pa.float64()  # REAL, FLOAT, DOUBLE and NUMERIC
+
+def table_parquet_schema(table_name):
+    """Arrow schema of a whole-table export, from the table's declared column types"""
+    table_query(table_name)  # checks the name
+    columns = database.execute_query(f"PRAGMA table_info({table_name})")
+    return pa.schema([pa.field(c["name"], _declared_arrow_type(c["type"])) for c in columns])
+
+def _observed_arrow_type(kinds):
+    """Arrow type that holds every value of a column, given the Python types seen in it"""
+    kinds = kinds - {type(None)}
+    if kinds == {int}:
+        return pa.int64()
+    if kinds and kinds <= {int, float}:
+        return pa.float64()
+    if kinds == {bytes}:
+        return pa.binary()
+    return pa.string()  # text, mixed storage classes, or only NULLs
+
+def scan_parquet_schema(chunks):
+    """Arrow schema for a query result, from every value of a (columns, rows) chunk stream.
+    Streams the whole result once, so a column that is NULL or int at first and text later still fits."""
+    columns, kinds = None, None
+    for columns, rows in chunks:
+        if kinds is None:
+            kinds = [set() for _ in columns]
+        for row in rows:
+            for column_kinds, value in zip(kinds, row):
+                column_kinds.add(type(value))
+    if columns is None:
+        return pa.schema([])
+    return pa.schema([pa.field(name, _observed_arrow_type(k)) for name, k in zip(columns, kinds)])
+
+def _arrow_column(values, field):
+    if pa.types.is_string(field.type):
+        values = [v if v is None or isinstance(v, str)
+                  else v.decode("utf-8", "replace") if isinstance(v, bytes) else str(v) for v in values]
+    try:
+        return pa.array(values, type=field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Column {field.name} holds values that are not {field.type}: {e}") from e
+
+def write_parquet(chunks, binary_file, schema):
+    """write (columns, rows) chunks as Parquet with a fixed schema, one row group per chunk"""
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+    count = 0
+    with pq.ParquetWriter(binary_file, schema) as writer:
+        for columns, rows in chunks:
+            if not rows:
+                continue
+            arrays = [_arrow_column([row[i] for row in rows], field) for i, field in enumerate(schema)]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            count += len(rows)
+    return count
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+}
+
+def _chunks(query, params, chunk_size, sandboxed):
+    if sandboxed:
+        return database.stream_custom_query(query, chunk_size)
+    return database.stream_query(query, params, chunk_size)
+
+def export_query(query, binary_file, fmt="csv", params=None, chunk_size=CHUNK_SIZE, sandboxed=False,
+                 schema=None):
+    """stream the result of a query into an open binary file, returns the row count.
+
+    sandboxed runs a user-typed query under the SQL Query Tool's limits
+    (see database.stream_custom_query). Parquet needs its schema up front:
+    without one, the query is streamed twice, first to find its column types.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    writer = WRITERS[fmt]
+    if fmt == "parquet":
+        if pa is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        if schema is None:
+            chunks = _chunks(query, params, chunk_size, sandboxed)
+            try:
+                schema = scan_parquet_schema(chunks)
+            finally:
+                chunks.close()
+        writer = functools.partial(write_parquet, schema=schema)
+    chunks = _chunks(query, params, chunk_size, sandboxed)
+    try:
+        return writer(chunks, binary_file)
+    finally:
+        chunks.close()
+
+def export_table(table_name, binary_file, fmt="csv", chunk_size=CHUNK_SIZE):
+    """stream a whole table into an open binary file, returns the row count"""
+    schema = table_parquet_schema(table_name) if fmt == "parquet" and pa is not None else None
+    return export_query(table_query(table_name), binary_file, fmt, chunk_size=chunk_size, schema=schema)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a table or SELECT query from the movie database")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--table", help="table to export")
+    source.add_argument("--query", help="SELECT query to export")
+    parser.add_argument("-f", "--format", choices=list(EXPORT_FORMATS), default="csv")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows fetched per chunk")
+    parser.add_argument("--db", help="database file (default: MovieDatabase.db)")
+    args = parser.parse_args()
+
+    if args.db:
+        database.DB_PATH = Path(args.db)
+    def export(binary_file):
+        if args.table:
+            return export_table(args.table, binary_file, args.format, chunk_size=args.chunk_size)
+        return export_query(args.query, binary_file, args.format, chunk_size=args.chunk_size)
+
+    if args.output:
+        with open(args.output, "wb") as out:
+            count = export(out)
+    else:
+        count = export(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    print(f"Exported {count} rows", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
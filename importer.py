@@ -0,0 +1,301 @@
+# streaming CSV / JSON / JSON Lines import
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import database
+
+BATCH_SIZE = database.BULK_BATCH_SIZE
+
+# keep memory bounded on very dirty files, failures past this are only counted
+MAX_REPORTED_FAILURES = 1000
+
+IMPORT_FORMATS = ["csv", "jsonl", "json"]
+
+# bytes that are not valid UTF-8 decode to these with errors="surrogateescape"
+_UNDECODABLE = re.compile("[\udc80-\udcff]")
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+def detect_format(file_name):
+    """import format from a file name, defaults to csv"""
+    suffix = Path(file_name).suffix.lower()
+    if suffix == ".json":
+        return "json"
+    return "jsonl" if suffix in (".jsonl", ".ndjson") else "csv"
+
+def _not_utf8(row_number):
+    """error for a row containing bytes that are not UTF-8"""
+    return ValueError(f"Row {row_number} is not valid UTF-8 text. Save the file as UTF-8 and import it again.")
+
+def iter_csv_rows(binary_file):
+    """yield one dict per CSV record, read incrementally.
+
+    A file that is not UTF-8 or not valid CSV raises ValueError naming the
+    row it stopped at.
+    """
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    row_number = 0
+
+    def lines():
+        for line in text_file:
+            if not line.isascii() and _UNDECODABLE.search(line):
+                raise _not_utf8(row_number + 1)
+            yield line
+
+    try:
+        for row_number, row in enumerate(csv.DictReader(lines()), start=1):
+            yield row
+    except csv.Error as e:
+        raise ValueError(f"Row {row_number + 1} is not valid CSV: {e}") from None
+    finally:
+        text_file.detach()  # leave the caller's file open
+
+def iter_jsonl_rows(binary_file):
+    """yield one dict per JSON Lines record, read incrementally"""
+    for line_number, line in enumerate(binary_file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = {"__error__": f"Invalid JSON on line {line_number}: {e}"}
+        yield record if isinstance(record, dict) else {"__error__": f"Line {line_number} is not a JSON object"}
+
+def iter_json_array_rows(binary_file):
+    """yield one dict per element of a JSON array, read incrementally.
+
+    Invalid JSON or text that is not UTF-8 raises ValueError naming the
+    row it stopped at.
+    """
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8-sig", errors="surrogateescape")
+    decoder = json.JSONDecoder()
+    buffer, position, at_end = "", 0, False
+
+    def next_char():
+        """skip whitespace, reading more of the file as needed; "" at the end"""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer) or at_end:
+                return buffer[position:position + 1]
+            read_more()
+
+    def read_more():
+        nonlocal buffer, position, at_end
+        more = text_file.read(JSON_CHUNK_SIZE)
+        at_end = not more
+        buffer, position = buffer[position:] + more, 0
+
+    try:
+        if next_char() != "[":
+            raise ValueError("The file is not a JSON array")
+        position += 1
+        if next_char() == "]":
+            return
+        row_number = 0
+        while True:
+            row_number += 1
+            next_char()
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    if at_end:
+                        raise ValueError(f"Row {row_number} is not valid JSON: {e.msg}") from None
+                else:
+                    # a value running to the end of the buffer may continue in the next read
+                    if end < len(buffer) or at_end:
+                        break
+                read_more()
+            if _UNDECODABLE.search(buffer, position, end):
+                raise _not_utf8(row_number)
+            position = end
+            yield record if isinstance(record, dict) else {"__error__": f"Row {row_number} is not a JSON object"}
+            separator = next_char()
+            position += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Row {row_number} is not followed by ',' or ']'")
+        if next_char():
+            raise ValueError("Unexpected data after the end of the JSON array")
+    finally:
+        text_file.detach()  # leave the caller's file open
+
+def iter_json_rows(binary_file):
+    """yield records from a JSON array, or from JSON Lines if the file does not start with '['"""
+    start = binary_file.tell()
+    head = b""
+    while True:
+        more = binary_file.read(512)
+        head += more
+        if not more or head.lstrip(b"\xef\xbb\xbf \t\r\n"):
+            break
+    binary_file.seek(start)
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"["):
+        return iter_json_array_rows(binary_file)
+    return iter_jsonl_rows(binary_file)
+
+READERS = {
+    "csv": iter_csv_rows,
+    "jsonl": iter_jsonl_rows,
+    "json": iter_json_rows,
+}
+
+def _normalise_row(row, columns):
+    """map a record's keys onto the table's column names (case-insensitive)"""
+    if "__error__" in row:
+        return row
+    by_name = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    return {c: by_name[c.lower()] for c in columns if c.lower() in by_name}
+
+def _foreign_keys(table_name):
+    """(column, parent table, parent column) for every declared foreign key"""
+    rows = database.execute_query(f"PRAGMA foreign_key_list({table_name})")
+    return [(r['from'], r['table'], r['to']) for r in rows] if isinstance(rows, list) else []
+
+def _existing_keys(parent_table, parent_column, keys):
+    """subset of keys present in parent_table, looked up in IN (...) chunks"""
+    found = set()
+    keys = list(keys)
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        marks = ", ".join("?" for _ in chunk)
+        rows = database.execute_query(
+            f"SELECT {parent_column} AS k FROM {parent_table} WHERE {parent_column} IN ({marks})", chunk
+        )
+        if isinstance(rows, list):
+            found.update(r['k'] for r in rows)
+    return found
+
+def _as_key(value):
+    """referenced IDs are integers; anything else is left for validation to reject"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _resolve_references(chunk, foreign_keys):
+    """split a chunk into rows whose referenced IDs exist and (index, error) failures"""
+    failures = []
+    missing = {}
+    for column, parent_table, parent_column in foreign_keys:
+        keys = {_as_key(row.get(column)) for _, row in chunk} - {None}
+        missing[column] = keys - _existing_keys(parent_table, parent_column, keys)
+
+    resolved = []
+    for index, row in chunk:
+        error = row.get("__error__")
+        if error is None:
+            for column, parent_table, parent_column in foreign_keys:
+                if _as_key(row.get(column)) in missing[column]:
+                    error = f"{column} {row.get(column)} does not exist in {parent_table}"
+                    break
+        if error:
+            failures.append((index, error))
+        else:
+            resolved.append((index, row))
+    return resolved, failures
+
+def import_rows(table_name, rows, batch_size=BATCH_SIZE, progress=None):
+    """validate and bulk insert an iterable of dict records.
+
+    Rows referencing IDs that do not exist (junction tables, reviews,
+    users) are rejected before insert. progress, if given, is called as
+    progress(rows_read, inserted, failed) after every batch. Returns a
+    summary dict with rows, inserted, failed and the first failures; if
+    rows raises ValueError (a file that cannot be read any further), the
+    rows read before it are still imported and the message is returned as
+    error.
+    """
+    if table_name not in database.INSERT_SPECS:
+        raise ValueError(f"Import is not supported for table: {table_name}")
+    columns = database.INSERT_SPECS[table_name][2]
+    foreign_keys = _foreign_keys(table_name)
+    summary = {"rows": 0, "inserted": 0, "failed": 0, "failures": [], "error": None}
+
+    def record(failures):
+        summary["failed"] += len(failures)
+        room = MAX_REPORTED_FAILURES - len(summary["failures"])
+        if room > 0:
+            summary["failures"].extend(failures[:room])
+
+    def flush(chunk):
+        resolved, failures = _resolve_references(chunk, foreign_keys)
+        record(failures)
+        inserted, insert_failures = database.bulk_insert(
+            table_name, [row for _, row in resolved], batch_size=len(resolved) or 1
+        )
+        # bulk_insert indexes are positions within `resolved`
+        record([(resolved[i][0] if i is not None else None, error) for i, error in insert_failures])
+        summary["inserted"] += inserted
+        if progress:
+            progress(summary["rows"], summary["inserted"], summary["failed"])
+
+    def read(rows):
+        try:
+            yield from rows
+        except ValueError as e:
+            summary["error"] = str(e)
+
+    chunk = []
+    for index, row in enumerate(read(rows)):
+        summary["rows"] += 1
+        chunk.append((index, _normalise_row(row, columns)))
+        if len(chunk) >= batch_size:
+            flush(chunk)
+            chunk = []
+    if chunk or summary["rows"] == 0:
+        flush(chunk)
+
+    summary["failures"].sort(key=lambda f: -1 if f[0] is None else f[0])
+    return summary
+
+def import_file(table_name, binary_file, fmt="csv", batch_size=BATCH_SIZE, progress=None):
+    """stream an open binary CSV / JSON / JSON Lines file into a table, see import_rows"""
+    if fmt not in READERS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    return import_rows(table_name, READERS[fmt](binary_file), batch_size, progress)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a CSV, JSON or JSON Lines file into the movie database")
+    parser.add_argument("table", choices=list(database.INSERT_SPECS), help="table to import into")
+    parser.add_argument("file", help="CSV, JSON array or JSON Lines file (column names as headers / keys)")
+    parser.add_argument("-f", "--format", choices=IMPORT_FORMATS, help="file format (default: from the file name)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--db", help="database file (default: MovieDatabase.db)")
+    args = parser.parse_args()
+
+    if args.db:
+        database.DB_PATH = Path(args.db)
+    fmt = args.format or detect_format(args.file)
+    total_bytes = os.path.getsize(args.file)
+
+    with open(args.file, "rb") as source:
+        def progress(rows_read, inserted, failed):
+            done = source.tell() / total_bytes * 100 if total_bytes else 100
+            print(f"\r{done:5.1f}%  read {rows_read:,}  inserted {inserted:,}  failed {failed:,}",
+                  end="", file=sys.stderr, flush=True)
+
+        summary = import_file(args.table, source, fmt, args.batch_size, progress)
+
+    print(file=sys.stderr)
+    for index, error in summary["failures"][:20]:
+        print(f"row {index}: {error}" if index is not None else error, file=sys.stderr)
+    if summary["failed"] > 20:
+        print(f"... {summary['failed'] - 20:,} more failures", file=sys.stderr)
+    print(f"Imported {summary['inserted']:,} of {summary['rows']:,} rows into {args.table}")
+    if summary["error"]:
+        sys.exit(f"Import stopped: {summary['error']}")
+
+if __name__ == "__main__":
+    main()